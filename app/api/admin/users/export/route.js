@@ -0,0 +1,108 @@
+export const dynamic = "force-dynamic";
+
+import { NextResponse } from "next/server";
+import { mongoUserRepo } from "../../../../../lib/repositories/mongodb-user.js";
+import { toNdjsonStream } from "../../../../../lib/ndjson.js";
+import { logger } from "../../../../../lib/logger.js";
+import { withTiming } from "../../../../../lib/request-timing.js";
+
+// Set ADMIN_TOKEN to enable the admin routes; callers send
+// "Authorization: Bearer <token>"
+const ADMIN_TOKEN = process.env.ADMIN_TOKEN;
+
+const EXPORT_BATCH_SIZE = 1000;
+const FIELD_NAME = /^[A-Za-z][\w.]*$/;
+
+// Password hashes stay out of exports unless explicitly asked for
+function exportProjection(searchParams) {
+  const includePasswordHash =
+    searchParams.get("includePasswordHash") === "true";
+  const fields = (searchParams.get("fields") || "")
+    .split(",")
+    .map((field) => field.trim())
+    .filter(Boolean);
+
+  if (fields.length === 0) {
+    return includePasswordHash ? { _id: 0 } : { _id: 0, passwordHash: 0 };
+  }
+
+  if (!fields.every((field) => FIELD_NAME.test(field))) return null;
+
+  const projection = { _id: 0, id: 1 };
+  for (const field of fields) {
+    if (field !== "passwordHash" || includePasswordHash) projection[field] = 1;
+  }
+  return projection;
+}
+
+// Streams every user as NDJSON. Documents are read from a batched cursor
+// only as fast as the client downloads them, so memory stays at about one
+// batch whatever the size of the collection.
+async function exportUsers(request) {
+  try {
+    if (!ADMIN_TOKEN) {
+      return NextResponse.json(
+        { error: "Admin routes are disabled" },
+        { status: 403 },
+      );
+    }
+
+    const authorization = request.headers.get("authorization");
+    if (authorization !== `Bearer ${ADMIN_TOKEN}`) {
+      return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
+    }
+
+    const projection = exportProjection(request.nextUrl.searchParams);
+    if (!projection) {
+      return NextResponse.json(
+        { error: "fields must be a comma-separated list of field names" },
+        { status: 400 },
+      );
+    }
+
+    // Fail with a status code while one can still be sent
+    await mongoUserRepo.getCollection();
+
+    const startedAt = performance.now();
+    const users = mongoUserRepo.iterateUsers({
+      projection,
+      batchSize: EXPORT_BATCH_SIZE,
+    });
+
+    const body = toNdjsonStream(users, {
+      onEnd: ({ count, bytes, error }) => {
+        const durationMs = Math.round(performance.now() - startedAt);
+        const stats = {
+          users: count,
+          bytes,
+          durationMs,
+          usersPerSecond: Math.round((count * 1000) / (durationMs || 1)),
+        };
+
+        if (error) {
+          console.error("MongoDB: Export users error:", error);
+          logger.warn("users export aborted", stats);
+        } else {
+          logger.info("users exported", stats);
+        }
+      },
+    });
+
+    const date = new Date().toISOString().slice(0, 10);
+    return new Response(body, {
+      headers: {
+        "Content-Type": "application/x-ndjson",
+        "Content-Disposition": `attachment; filename="users-${date}.ndjson"`,
+        "Cache-Control": "no-store",
+      },
+    });
+  } catch (error) {
+    console.error("MongoDB: Export users error:", error);
+    return NextResponse.json(
+      { error: "Internal server error" },
+      { status: 500 },
+    );
+  }
+}
+
+export const GET = withTiming("/api/admin/users/export", exportUsers);
@@ -0,0 +1,174 @@
+export const dynamic = "force-dynamic";
+
+import { NextResponse } from "next/server";
+import { mongoUserRepo } from "../../../../../lib/repositories/mongodb-user.js";
+import { readNdjson, NdjsonError } from "../../../../../lib/ndjson.js";
+import { logger } from "../../../../../lib/logger.js";
+import { measure, withTiming } from "../../../../../lib/request-timing.js";
+
+// Set ADMIN_TOKEN to enable the admin routes; callers send
+// "Authorization: Bearer <token>"
+const ADMIN_TOKEN = process.env.ADMIN_TOKEN;
+
+const IMPORT_CHUNK_SIZE = 1000;
+const MAX_REPORTED_ERRORS = 20;
+
+function isPlainObject(value) {
+  return value !== null && typeof value === "object" && !Array.isArray(value);
+}
+
+// The fields every stored user relies on. Anything else is kept as given,
+// so an export can be imported back unchanged.
+function toImportedUser(doc) {
+  if (
+    !isPlainObject(doc) ||
+    typeof doc.id !== "string" ||
+    typeof doc.email !== "string" ||
+    typeof doc.username !== "string"
+  ) {
+    return null;
+  }
+
+  const { _id, ...user } = doc;
+  if (typeof user.displayName === "string") {
+    user.displayNameLower = user.displayName.toLowerCase();
+  }
+  return user;
+}
+
+// Loads users from an NDJSON body (the export route's format). Lines are
+// gathered into chunks of IMPORT_CHUNK_SIZE and each chunk is written with
+// an unordered bulkWrite before more of the body is read, so a large upload
+// is held one chunk at a time and a slow database slows the upload.
+// By default users that already exist are skipped; ?mode=replace updates
+// them by id with the fields in the file, keeping any it leaves out.
+async function importUsers(request) {
+  if (!ADMIN_TOKEN) {
+    return NextResponse.json(
+      { error: "Admin routes are disabled" },
+      { status: 403 },
+    );
+  }
+
+  const authorization = request.headers.get("authorization");
+  if (authorization !== `Bearer ${ADMIN_TOKEN}`) {
+    return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
+  }
+
+  if (!request.body) {
+    return NextResponse.json({ error: "No body provided" }, { status: 400 });
+  }
+
+  const replace = request.nextUrl.searchParams.get("mode") === "replace";
+  const startedAt = performance.now();
+  const totals = {
+    lines: 0,
+    inserted: 0,
+    replaced: 0,
+    skipped: 0,
+    failed: 0,
+    invalid: 0,
+  };
+  const errors = [];
+
+  const report = (line, error) => {
+    if (errors.length < MAX_REPORTED_ERRORS) errors.push({ line, error });
+  };
+
+  const summary = () => {
+    const durationMs = Math.round(performance.now() - startedAt);
+    const imported = totals.inserted + totals.replaced;
+    return {
+      mode: replace ? "replace" : "insert",
+      ...totals,
+      errors,
+      durationMs,
+      usersPerSecond: Math.round((imported * 1000) / (durationMs || 1)),
+    };
+  };
+
+  let chunk = [];
+  let chunkLines = [];
+
+  const flush = async () => {
+    if (chunk.length === 0) return true;
+
+    const result = await measure("mongo", () =>
+      mongoUserRepo.importUsers(chunk, { replace }),
+    );
+    if (!result) return false;
+
+    totals.inserted += result.inserted;
+    totals.replaced += result.replaced;
+    totals.skipped += result.skipped;
+    totals.failed += result.failed;
+    result.errors.forEach((e) => report(chunkLines[e.index], e.error));
+
+    chunk = [];
+    chunkLines = [];
+    return true;
+  };
+
+  try {
+    for await (const entry of readNdjson(request.body)) {
+      totals.lines = entry.lineNumber;
+
+      const user = entry.error ? null : toImportedUser(entry.value);
+      if (!user) {
+        totals.invalid++;
+        report(
+          entry.lineNumber,
+          entry.error || "Expected an object with id, email and username",
+        );
+        continue;
+      }
+
+      chunk.push(user);
+      chunkLines.push(entry.lineNumber);
+
+      if (chunk.length >= IMPORT_CHUNK_SIZE && !(await flush())) {
+        return NextResponse.json(
+          { error: "Failed to write users", ...summary() },
+          { status: 500 },
+        );
+      }
+    }
+
+    if (!(await flush())) {
+      return NextResponse.json(
+        { error: "Failed to write users", ...summary() },
+        { status: 500 },
+      );
+    }
+
+    const result = summary();
+    logger.info("users imported", {
+      mode: result.mode,
+      lines: result.lines,
+      inserted: result.inserted,
+      replaced: result.replaced,
+      skipped: result.skipped,
+      failed: result.failed,
+      invalid: result.invalid,
+      durationMs: result.durationMs,
+      usersPerSecond: result.usersPerSecond,
+    });
+
+    return NextResponse.json({ success: true, ...result });
+  } catch (error) {
+    if (error instanceof NdjsonError) {
+      return NextResponse.json(
+        { error: error.message, ...summary() },
+        { status: error.status },
+      );
+    }
+
+    console.error("MongoDB: Import users error:", error);
+    return NextResponse.json(
+      { error: "Internal server error", ...summary() },
+      { status: 500 },
+    );
+  }
+}
+
+export const POST = withTiming("/api/admin/users/import", importUsers);
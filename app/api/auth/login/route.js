@@ -1,18 +1,31 @@
 export const dynamic = "force-dynamic";
 
 import { NextResponse } from "next/server";
-import bcrypt from "bcryptjs";
 import jwt from "jsonwebtoken";
 import { mongoUserRepo } from "../../../../lib/repositories/mongodb-user.js";
+import {
+  passwordHasher,
+  HashQueueFullError,
+} from "../../../../lib/password-hasher.js";
+import { authAdmission } from "../../../../lib/rate-limit.js";
+import {
+  parseFields,
+  fieldsProjection,
+  FieldsetError,
+} from "../../../../lib/fieldsets.js";
+import { compressedJson } from "../../../../lib/compression.js";
+import { measure, withTiming } from "../../../../lib/request-timing.js";
+import { logger } from "../../../../lib/logger.js";
 
 const JWT_SECRET = process.env.JWT_SECRET || "streamer-house-secret-key";
 
-export async function POST(request) {
+// ?fields= narrows the returned user as on /api/auth/me; the lookup then
+// reads only those fields and the password hash.
+async function login(request) {
   try {
+    const fields = parseFields(request.nextUrl.searchParams.get("fields"));
     const { email, password } = await request.json();
 
-    console.log("MongoDB: Login attempt for:", email);
-
     if (!email || !password) {
       return NextResponse.json(
         { error: "Email and password are required" },
@@ -20,32 +33,49 @@ export async function POST(request) {
       );
     }
 
-    const user = await mongoUserRepo.getUserByEmail(email);
+    const retryAfter = await measure("ratelimit", () =>
+      authAdmission.check("login", request, email),
+    );
+    if (retryAfter > 0) {
+      return NextResponse.json(
+        { error: "Too many attempts, please try again later" },
+        { status: 429, headers: { "Retry-After": String(retryAfter) } },
+      );
+    }
+
+    const user = await measure("mongo", () =>
+      mongoUserRepo.getUserByEmail(email, {
+        projection: fields
+          ? { ...fieldsProjection(fields), passwordHash: 1 }
+          : undefined,
+      }),
+    );
     if (!user) {
-      console.log("MongoDB: User not found:", email);
+      logger.debug("login failed", { reason: "unknown email" });
       return NextResponse.json(
         { error: "Invalid credentials" },
         { status: 401 },
       );
     }
 
-    const isValidPassword = await bcrypt.compare(password, user.passwordHash);
+    const isValidPassword = await passwordHasher.compare(
+      password,
+      user.passwordHash,
+    );
     if (!isValidPassword) {
-      console.log("MongoDB: Invalid password for:", email);
+      logger.debug("login failed", { userId: user.id, reason: "password" });
       return NextResponse.json(
         { error: "Invalid credentials" },
         { status: 401 },
       );
     }
 
-    console.log("MongoDB: Login successful for:", email);
-
-    const token = jwt.sign({ userId: user.id }, JWT_SECRET, {
-      expiresIn: "7d",
-    });
+    const token = measure("jwt", () =>
+      jwt.sign({ userId: user.id }, JWT_SECRET, { expiresIn: "7d" }),
+    );
     const { passwordHash: _, ...userWithoutPassword } = user;
 
-    const response = NextResponse.json({
+    const response = await compressedJson(request, {
       token,
       user: userWithoutPassword,
     });
@@ -60,10 +90,24 @@ export async function POST(request) {
       domain: undefined, // Let browser set the correct domain
     });
 
-    console.log("MongoDB: Login cookie set, token length:", token.length);
+    logger.debug("login", { userId: user.id });
 
     return response;
   } catch (error) {
+    if (error instanceof FieldsetError) {
+      return NextResponse.json(
+        { error: error.message },
+        { status: error.status },
+      );
+    }
+
+    if (error instanceof HashQueueFullError) {
+      return NextResponse.json(
+        { error: "Server is busy, please try again" },
+        { status: 503, headers: { "Retry-After": "1" } },
+      );
+    }
+
     console.error("MongoDB: Login error:", error);
     return NextResponse.json(
       { error: "Internal server error" },
@@ -71,3 +115,5 @@ export async function POST(request) {
     );
   }
 }
+
+export const POST = withTiming("/api/auth/login", authAdmission.limit(login));
@@ -1,6 +1,7 @@
 import { NextResponse } from "next/server";
+import { withTiming } from "../../../../lib/request-timing.js";
 
-export async function POST() {
+async function logout() {
   const response = NextResponse.json({ message: "Logged out successfully" });
 
   response.cookies.set("access_token", "", {
@@ -13,3 +14,5 @@ export async function POST() {
 
   return response;
 }
+
+export const POST = withTiming("/api/auth/logout", logout);
@@ -3,10 +3,19 @@ export const dynamic = "force-dynamic";
 import { NextResponse } from "next/server";
 import jwt from "jsonwebtoken";
 import { mongoUserRepo } from "../../../../lib/repositories/mongodb-user.js";
+import {
+  parseFields,
+  fieldsProjection,
+  FieldsetError,
+} from "../../../../lib/fieldsets.js";
+import { compressedJson } from "../../../../lib/compression.js";
+import { measure, withTiming } from "../../../../lib/request-timing.js";
 
 const JWT_SECRET = process.env.JWT_SECRET || "streamer-house-secret-key";
 
-export async function GET(request) {
+// The signed-in user without passwordHash. ?fields=displayName,avatarUrl
+// returns just those fields (plus id), read with a projection.
+async function getCurrentUser(request) {
   try {
     const token = request.cookies.get("access_token")?.value;
 
@@ -14,19 +23,34 @@ export async function GET(request) {
       return NextResponse.json({ error: "No token provided" }, { status: 401 });
     }
 
-    const decoded = jwt.verify(token, JWT_SECRET);
-    const user = await mongoUserRepo.getUserById(decoded.userId);
+    const decoded = measure("jwt", () => jwt.verify(token, JWT_SECRET));
+
+    const fields = parseFields(request.nextUrl.searchParams.get("fields"));
+    const projection = fields ? fieldsProjection(fields) : undefined;
+
+    const user = await measure("mongo", () =>
+      mongoUserRepo.getUserById(decoded.userId, { projection }),
+    );
 
     if (!user) {
       return NextResponse.json({ error: "User not found" }, { status: 401 });
     }
 
-    console.log("MongoDB: Auth me successful for:", user.email);
+    if (fields) return compressedJson(request, user);
 
     const { passwordHash: _, ...userWithoutPassword } = user;
-    return NextResponse.json(userWithoutPassword);
+    return compressedJson(request, userWithoutPassword);
   } catch (error) {
+    if (error instanceof FieldsetError) {
+      return NextResponse.json(
+        { error: error.message },
+        { status: error.status },
+      );
+    }
+
     console.error("MongoDB: Auth me error:", error);
     return NextResponse.json({ error: "Invalid token" }, { status: 401 });
   }
 }
+
+export const GET = withTiming("/api/auth/me", getCurrentUser);
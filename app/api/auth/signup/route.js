@@ -1,9 +1,22 @@
 export const dynamic = "force-dynamic";
 
 import { NextResponse } from "next/server";
-import bcrypt from "bcryptjs";
 import jwt from "jsonwebtoken";
 import { mongoUserRepo } from "../../../../lib/repositories/mongodb-user.js";
+import {
+  passwordHasher,
+  HashQueueFullError,
+} from "../../../../lib/password-hasher.js";
+import { authAdmission } from "../../../../lib/rate-limit.js";
+import {
+  parseFields,
+  fieldsProjection,
+  applyProjection,
+  FieldsetError,
+} from "../../../../lib/fieldsets.js";
+import { compressedJson } from "../../../../lib/compression.js";
+import { measure, withTiming } from "../../../../lib/request-timing.js";
+import { logger } from "../../../../lib/logger.js";
 
 const JWT_SECRET = process.env.JWT_SECRET || "streamer-house-secret-key";
 
@@ -15,8 +28,10 @@ function sanitizeText(text) {
   );
 }
 
-export async function POST(request) {
+// ?fields= narrows the returned user as on /api/auth/me
+async function signup(request) {
   try {
+    const fields = parseFields(request.nextUrl.searchParams.get("fields"));
     const {
       email,
       password,
@@ -31,8 +46,6 @@ export async function POST(request) {
       bio = "",
     } = await request.json();
 
-    console.log("MongoDB: Signup attempt for:", email);
-
     if (!email || !password || !displayName) {
       return NextResponse.json(
         { error: "Email, password, and display name are required" },
@@ -47,7 +60,19 @@ export async function POST(request) {
       );
     }
 
-    const existingUser = await mongoUserRepo.getUserByEmail(email);
+    const retryAfter = await measure("ratelimit", () =>
+      authAdmission.check("signup", request, email),
+    );
+    if (retryAfter > 0) {
+      return NextResponse.json(
+        { error: "Too many attempts, please try again later" },
+        { status: 429, headers: { "Retry-After": String(retryAfter) } },
+      );
+    }
+
+    const existingUser = await measure("mongo", () =>
+      mongoUserRepo.getUserByEmail(email, { projection: { _id: 0, id: 1 } }),
+    );
     if (existingUser) {
       return NextResponse.json(
         { error: "User already exists" },
@@ -55,31 +80,29 @@ export async function POST(request) {
       );
     }
 
-    const baseUsername = displayName.toLowerCase().replace(/[^a-z0-9]/g, "");
-    let username = baseUsername;
-    let counter = 1;
-
-    while (await mongoUserRepo.getUserByUsername(username)) {
-      username = `${baseUsername}${counter}`;
-      counter++;
-    }
-
-    const passwordHash = await bcrypt.hash(password, 12);
-
-    const user = await mongoUserRepo.createUser({
-      email: sanitizeText(email),
-      passwordHash,
-      displayName: sanitizeText(displayName),
-      username,
-      platforms: platforms.map((p) => sanitizeText(p)),
-      niches: niches.map((n) => sanitizeText(n)),
-      games: games.map((g) => sanitizeText(g)),
-      city: sanitizeText(city),
-      timeZone: sanitizeText(timeZone),
-      hasSchedule: Boolean(hasSchedule),
-      schedule: schedule || {},
-      bio: sanitizeText(bio).slice(0, 500),
-    });
+    const baseUsername =
+      displayName.toLowerCase().replace(/[^a-z0-9]/g, "") || "creator";
+
+    const passwordHash = await passwordHasher.hash(password, 12);
+
+    const user = await measure("mongo", () =>
+      mongoUserRepo.createUserWithUsername(
+        {
+          email: sanitizeText(email),
+          passwordHash,
+          displayName: sanitizeText(displayName),
+          platforms: platforms.map((p) => sanitizeText(p)),
+          niches: niches.map((n) => sanitizeText(n)),
+          games: games.map((g) => sanitizeText(g)),
+          city: sanitizeText(city),
+          timeZone: sanitizeText(timeZone),
+          hasSchedule: Boolean(hasSchedule),
+          schedule: schedule || {},
+          bio: sanitizeText(bio).slice(0, 500),
+        },
+        baseUsername,
+      ),
+    );
 
     if (!user) {
       return NextResponse.json(
@@ -88,14 +111,16 @@ export async function POST(request) {
       );
     }
 
-    const token = jwt.sign({ userId: user.id }, JWT_SECRET, {
-      expiresIn: "7d",
-    });
+    const token = measure("jwt", () =>
+      jwt.sign({ userId: user.id }, JWT_SECRET, { expiresIn: "7d" }),
+    );
     const { passwordHash: _, ...userWithoutPassword } = user;
 
-    const response = NextResponse.json({
+    const response = await compressedJson(request, {
       token,
-      user: userWithoutPassword,
+      user: fields
+        ? applyProjection(user, fieldsProjection(fields))
+        : userWithoutPassword,
     });
 
     // Use consistent cookie settings across all auth endpoints
@@ -108,13 +133,24 @@ export async function POST(request) {
       domain: undefined, // Let browser set the correct domain
     });
 
-    console.log(
-      "MongoDB: Signup successful, cookie set, token length:",
-      token.length,
-    );
+    logger.debug("signup", { userId: user.id });
 
     return response;
   } catch (error) {
+    if (error instanceof FieldsetError) {
+      return NextResponse.json(
+        { error: error.message },
+        { status: error.status },
+      );
+    }
+
+    if (error instanceof HashQueueFullError) {
+      return NextResponse.json(
+        { error: "Server is busy, please try again" },
+        { status: 503, headers: { "Retry-After": "1" } },
+      );
+    }
+
     console.error("MongoDB: Signup error:", error);
     return NextResponse.json(
       { error: "Internal server error" },
@@ -122,3 +158,5 @@ export async function POST(request) {
     );
   }
 }
+
+export const POST = withTiming("/api/auth/signup", authAdmission.limit(signup));
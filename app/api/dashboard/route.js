@@ -0,0 +1,124 @@
+export const dynamic = "force-dynamic";
+
+import { NextResponse } from "next/server";
+import jwt from "jsonwebtoken";
+import { mongoUserRepo } from "../../../lib/repositories/mongodb-user.js";
+import { mongoHouseRepo } from "../../../lib/repositories/mongodb-house.js";
+import { mongoMessageRepo } from "../../../lib/repositories/mongodb-message.js";
+import { roommateRanker } from "../../../lib/roommate-ranker.js";
+import { avatarUrlFor } from "../../../lib/image-processor.js";
+import { measure, withTiming } from "../../../lib/request-timing.js";
+
+const JWT_SECRET = process.env.JWT_SECRET || "streamer-house-secret-key";
+
+// Enough to fill the dashboard panels; the full lists have their own routes
+const HOUSE_PREVIEW_SIZE = 6;
+const ROOMMATE_PREVIEW_SIZE = 4;
+const PREVIEW_AVATAR_SIZE = 96;
+
+function toRoommatePreview(u, score = null) {
+  return {
+    id: u.id,
+    displayName: u.displayName,
+    username: u.username,
+    avatarUrl: avatarUrlFor(u, PREVIEW_AVATAR_SIZE),
+    city: u.city,
+    matchScore: score === null ? null : Math.round(score * 100),
+  };
+}
+
+// Best matches from the in-memory index, or the newest opted-in creators
+// while it is still loading
+async function roommatePreview(user) {
+  const ranked = measure("rank", () =>
+    roommateRanker.rank(user, { limit: ROOMMATE_PREVIEW_SIZE }),
+  );
+
+  if (ranked && ranked.total > 0) {
+    const users = await measure("mongo", () =>
+      mongoUserRepo.getUsersByIds(ranked.results.map((result) => result.id)),
+    );
+    if (!users) return null;
+
+    const usersById = new Map(users.map((u) => [u.id, u]));
+
+    return ranked.results
+      .filter((result) => usersById.has(result.id))
+      .map((result) =>
+        toRoommatePreview(usersById.get(result.id), result.score),
+      );
+  }
+
+  const result = await measure("mongo", () =>
+    mongoUserRepo.searchRoommates({
+      excludeUserId: user.id,
+      limit: ROOMMATE_PREVIEW_SIZE,
+    }),
+  );
+  return result ? result.users.map((u) => toRoommatePreview(u)) : null;
+}
+
+// Everything the dashboard needs on first paint in one round trip. The token
+// is verified once and the panels load concurrently; only the roommate
+// preview waits on the user, since ranking needs their profile. A panel that
+// fails to load comes back as null so the rest of the page still renders.
+async function getDashboard(request) {
+  try {
+    const token = request.cookies.get("access_token")?.value;
+
+    if (!token) {
+      return NextResponse.json({ error: "No token provided" }, { status: 401 });
+    }
+
+    let decoded;
+    try {
+      decoded = measure("jwt", () => jwt.verify(token, JWT_SECRET));
+    } catch (jwtError) {
+      return NextResponse.json({ error: "Invalid token" }, { status: 401 });
+    }
+
+    const userPromise = measure("mongo", () =>
+      mongoUserRepo.getUserById(decoded.userId),
+    );
+
+    const [user, houses, unread, roommates] = await Promise.all([
+      userPromise,
+      measure("mongo", () =>
+        mongoHouseRepo.getHousesForUser(decoded.userId, {
+          limit: HOUSE_PREVIEW_SIZE,
+          withTotal: true,
+        }),
+      ),
+      measure("mongo", () => mongoMessageRepo.getUnreadCount(decoded.userId)),
+      userPromise.then((u) => (u ? roommatePreview(u) : null)),
+    ]);
+
+    if (!user) {
+      return NextResponse.json({ error: "User not found" }, { status: 401 });
+    }
+
+    const { passwordHash: _, ...userWithoutPassword } = user;
+
+    return NextResponse.json(
+      {
+        user: userWithoutPassword,
+        houses: houses && {
+          items: houses.houses,
+          total: houses.total,
+          hasMore: Boolean(houses.nextCursor),
+        },
+        roommates,
+        unread,
+      },
+      { headers: { "Cache-Control": "private, no-store" } },
+    );
+  } catch (error) {
+    console.error("MongoDB: Dashboard error:", error);
+    return NextResponse.json(
+      { error: "Internal server error" },
+      { status: 500 },
+    );
+  }
+}
+
+export const GET = withTiming("/api/dashboard", getDashboard);
@@ -1,9 +1,26 @@
 export const dynamic = "force-dynamic";
 
 import { NextResponse } from "next/server";
-import { connectDB, getDb } from "../../../lib/mongodb.js";
+import { getPoolStats } from "../../../lib/mongodb.js";
+import { healthProbe } from "../../../lib/health-probe.js";
+import { mongoUserRepo } from "../../../lib/repositories/mongodb-user.js";
+import { profileCache } from "../../../lib/profile-cache.js";
+import { roommateRanker } from "../../../lib/roommate-ranker.js";
+import { leaderboard } from "../../../lib/leaderboard.js";
+import { authAdmission } from "../../../lib/rate-limit.js";
+import { passwordHasher } from "../../../lib/password-hasher.js";
+import { imageProcessor } from "../../../lib/image-processor.js";
+import { withTiming } from "../../../lib/request-timing.js";
 
-export async function GET() {
+const NO_CACHE_HEADERS = {
+  "Cache-Control": "no-cache, no-store, must-revalidate",
+  Pragma: "no-cache",
+  Expires: "0",
+};
+
+// Served from the background probe in lib/health-probe.js; nothing here
+// touches MongoDB.
+async function getHealth() {
   const startTime = Date.now();
   const health = {
     status: "ok",
@@ -11,81 +28,41 @@ export async function GET() {
     version: process.env.npm_package_version || "1.0.0",
     environment: process.env.NODE_ENV || "development",
     checks: {},
+    checkedAt: null,
+    caches: {},
+    passwordHashing: {},
+    imageProcessing: {},
+    authAdmission: {},
+    roommateIndex: {},
+    leaderboard: {},
+    mongoPool: {},
     responseTime: 0,
   };
 
   try {
-    // Check environment variables
-    const requiredEnvVars = [
-      "MONGO_URL",
-      "DB_NAME",
-      "JWT_SECRET",
-      "NEXT_PUBLIC_BASE_URL",
-    ];
-    const missingEnvVars = requiredEnvVars.filter((key) => !process.env[key]);
-
-    health.checks.environment = {
-      status: missingEnvVars.length === 0 ? "pass" : "fail",
-      requiredVars: requiredEnvVars,
-      missing: missingEnvVars,
-      message:
-        missingEnvVars.length === 0
-          ? "All required environment variables present"
-          : `Missing: ${missingEnvVars.join(", ")}`,
-    };
-
-    // Check MongoDB connection
-    try {
-      const client = await connectDB();
-      const db = await getDb();
+    const probe = await healthProbe.getResult();
 
-      // Test database operation
-      await db.admin().ping();
+    health.status = probe.status;
+    health.checks = probe.checks;
+    health.checkedAt = probe.checkedAt;
 
-      health.checks.mongodb = {
-        status: "pass",
-        message: "MongoDB connection successful",
-        database: process.env.DB_NAME,
-      };
-    } catch (mongoError) {
-      console.error("Health check MongoDB error:", mongoError);
-      health.checks.mongodb = {
-        status: "fail",
-        message: "MongoDB connection failed",
-        error: mongoError.message,
-      };
-      health.status = "error";
-    }
+    health.caches.users = mongoUserRepo.getCacheStats();
+    health.caches.profiles = profileCache.stats();
+    health.passwordHashing = passwordHasher.getStats();
+    health.imageProcessing = imageProcessor.getStats();
+    health.authAdmission = authAdmission.getStats();
+    health.roommateIndex = roommateRanker.stats();
+    health.leaderboard = leaderboard.stats();
+    health.mongoPool = getPoolStats();
 
-    // Check JWT secret
-    health.checks.jwt = {
-      status: process.env.JWT_SECRET ? "pass" : "fail",
-      message: process.env.JWT_SECRET
-        ? "JWT secret configured"
-        : "JWT secret missing",
-    };
-
-    // Calculate response time
     health.responseTime = Date.now() - startTime;
 
-    // Determine overall status
-    const hasFailures = Object.values(health.checks).some(
-      (check) => check.status === "fail",
-    );
-    if (hasFailures && health.status === "ok") {
-      health.status = "degraded";
-    }
-
     const statusCode =
       health.status === "ok" ? 200 : health.status === "degraded" ? 207 : 503;
 
     return NextResponse.json(health, {
       status: statusCode,
-      headers: {
-        "Cache-Control": "no-cache, no-store, must-revalidate",
-        Pragma: "no-cache",
-        Expires: "0",
-      },
+      headers: NO_CACHE_HEADERS,
     });
   } catch (error) {
     console.error("Health check error:", error);
@@ -100,11 +77,9 @@ export async function GET() {
 
     return NextResponse.json(health, {
       status: 503,
-      headers: {
-        "Cache-Control": "no-cache, no-store, must-revalidate",
-        Pragma: "no-cache",
-        Expires: "0",
-      },
+      headers: NO_CACHE_HEADERS,
     });
   }
 }
+
+export const GET = withTiming("/api/health", getHealth);
@@ -0,0 +1,63 @@
+export const dynamic = "force-dynamic";
+
+import { NextResponse } from "next/server";
+import jwt from "jsonwebtoken";
+import { mongoHouseRepo } from "../../../../../lib/repositories/mongodb-house.js";
+import { measure, withTiming } from "../../../../../lib/request-timing.js";
+
+const JWT_SECRET = process.env.JWT_SECRET || "streamer-house-secret-key";
+
+async function joinHouse(request, { params }) {
+  try {
+    const token = request.cookies.get("access_token")?.value;
+
+    if (!token) {
+      return NextResponse.json({ error: "No token provided" }, { status: 401 });
+    }
+
+    let decoded;
+    try {
+      decoded = measure("jwt", () => jwt.verify(token, JWT_SECRET));
+    } catch (jwtError) {
+      return NextResponse.json({ error: "Invalid token" }, { status: 401 });
+    }
+
+    const house = await measure("mongo", () =>
+      mongoHouseRepo.addMember(params.id, decoded.userId),
+    );
+
+    if (house) {
+      return NextResponse.json({
+        success: true,
+        house,
+        message: "Joined house successfully",
+      });
+    }
+
+    // The atomic join was refused; work out why for the response
+    const existing = await measure("mongo", () =>
+      mongoHouseRepo.getHouseById(params.id),
+    );
+
+    if (!existing) {
+      return NextResponse.json({ error: "House not found" }, { status: 404 });
+    }
+
+    if (existing.members.includes(decoded.userId)) {
+      return NextResponse.json(
+        { error: "Already a member of this house" },
+        { status: 409 },
+      );
+    }
+
+    return NextResponse.json({ error: "House is full" }, { status: 409 });
+  } catch (error) {
+    console.error("MongoDB: Join house error:", error);
+    return NextResponse.json(
+      { error: "Internal server error" },
+      { status: 500 },
+    );
+  }
+}
+
+export const POST = withTiming("/api/houses/[id]/join", joinHouse);
@@ -0,0 +1,105 @@
+export const dynamic = "force-dynamic";
+
+import { NextResponse } from "next/server";
+import jwt from "jsonwebtoken";
+import { mongoHouseRepo } from "../../../../../lib/repositories/mongodb-house.js";
+import { mongoUserRepo } from "../../../../../lib/repositories/mongodb-user.js";
+import { leaderboard } from "../../../../../lib/leaderboard.js";
+import { avatarUrlFor } from "../../../../../lib/image-processor.js";
+import { measure, withTiming } from "../../../../../lib/request-timing.js";
+
+const JWT_SECRET = process.env.JWT_SECRET || "streamer-house-secret-key";
+
+const ROW_AVATAR_SIZE = 96;
+
+function pointsOf(u) {
+  return u.totalPoints || 0;
+}
+
+function byPoints(a, b) {
+  return pointsOf(b) - pointsOf(a) || (a.id < b.id ? -1 : 1);
+}
+
+// Members ranked by points within the house. Houses hold at most 20
+// members, so this is one batched read and an in-memory sort; each row also
+// carries the member's global rank from the leaderboard tree.
+async function getHouseLeaderboard(request, { params }) {
+  try {
+    const token = request.cookies.get("access_token")?.value;
+
+    if (!token) {
+      return NextResponse.json({ error: "No token provided" }, { status: 401 });
+    }
+
+    let decoded;
+    try {
+      decoded = measure("jwt", () => jwt.verify(token, JWT_SECRET));
+    } catch (jwtError) {
+      return NextResponse.json({ error: "Invalid token" }, { status: 401 });
+    }
+
+    const house = await measure("mongo", () =>
+      mongoHouseRepo.getHouseById(params.id),
+    );
+
+    if (!house) {
+      return NextResponse.json({ error: "House not found" }, { status: 404 });
+    }
+
+    const members = await measure("mongo", () =>
+      mongoUserRepo.getLeaderboardUsers(house.members || []),
+    );
+
+    if (!members) {
+      return NextResponse.json(
+        { error: "Failed to load house leaderboard" },
+        { status: 500 },
+      );
+    }
+
+    members.sort(byPoints);
+
+    const globalRanks = await measure("rank", () =>
+      Promise.all(members.map((u) => leaderboard.rankOf(pointsOf(u)))),
+    );
+
+    let rank = 0;
+    const entries = members.map((u, i) => {
+      // Ties share a rank, as on the global leaderboard
+      if (i === 0 || pointsOf(members[i - 1]) !== pointsOf(u)) {
+        rank = i + 1;
+      }
+      return {
+        rank,
+        globalRank: globalRanks[i],
+        id: u.id,
+        username: u.username,
+        displayName: u.displayName,
+        avatarUrl: avatarUrlFor(u, ROW_AVATAR_SIZE),
+        totalPoints: pointsOf(u),
+      };
+    });
+
+    return NextResponse.json({
+      house: {
+        id: house.id,
+        name: house.name,
+        memberCount: house.memberCount,
+        totalPoints: entries.reduce((sum, e) => sum + e.totalPoints, 0),
+      },
+      leaderboard: entries,
+      me: entries.find((e) => e.id === decoded.userId) || null,
+    });
+  } catch (error) {
+    console.error("MongoDB: Get house leaderboard error:", error);
+    return NextResponse.json(
+      { error: "Internal server error" },
+      { status: 500 },
+    );
+  }
+}
+
+export const GET = withTiming(
+  "/api/houses/[id]/leaderboard",
+  getHouseLeaderboard,
+);
@@ -3,10 +3,13 @@ export const dynamic = "force-dynamic";
 import { NextResponse } from "next/server";
 import jwt from "jsonwebtoken";
 import { mongoUserRepo } from "../../../../lib/repositories/mongodb-user.js";
+import { mongoHouseRepo } from "../../../../lib/repositories/mongodb-house.js";
+import { measure, withTiming } from "../../../../lib/request-timing.js";
+import { logger } from "../../../../lib/logger.js";
 
 const JWT_SECRET = process.env.JWT_SECRET || "streamer-house-secret-key";
 
-export async function POST(request) {
+async function createHouse(request) {
   try {
     const token = request.cookies.get("access_token")?.value;
 
@@ -16,12 +19,14 @@ export async function POST(request) {
 
     let decoded;
     try {
-      decoded = jwt.verify(token, JWT_SECRET);
+      decoded = measure("jwt", () => jwt.verify(token, JWT_SECRET));
     } catch (jwtError) {
       return NextResponse.json({ error: "Invalid token" }, { status: 401 });
     }
 
-    const user = await mongoUserRepo.getUserById(decoded.userId);
+    const user = await measure("mongo", () =>
+      mongoUserRepo.getUserById(decoded.userId),
+    );
 
     if (!user) {
       return NextResponse.json({ error: "User not found" }, { status: 401 });
@@ -44,26 +49,28 @@ export async function POST(request) {
       );
     }
 
-    // Create mock house for now (in real app, this would go to database)
-    const house = {
-      id: `house_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`,
-      name: name.trim(),
-      description: description || "",
-      niches: niches,
-      maxMembers: Math.max(2, Math.min(20, maxMembers || 5)),
-      rules: rules || "",
-      ownerId: user.id,
-      ownerDisplayName: user.displayName,
-      members: [user.id], // Creator is automatically a member
-      createdAt: new Date().toISOString(),
-      isPrivate: false,
-      memberCount: 1,
-      totalPoints: 0,
-    };
+    const house = await measure("mongo", () =>
+      mongoHouseRepo.createHouse({
+        id: `house_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`,
+        name: name.trim(),
+        description: description || "",
+        niches: niches,
+        maxMembers: Math.max(2, Math.min(20, maxMembers || 5)),
+        rules: rules || "",
+        ownerId: user.id,
+        ownerDisplayName: user.displayName,
+        isPrivate: false,
+      }),
+    );
 
-    // In a real app, we would save this to the database
-    // For now, we'll just return the house data
-    console.log("MongoDB: Created house:", house.name, "for user:", user.email);
+    if (!house) {
+      return NextResponse.json(
+        { error: "Failed to create house" },
+        { status: 500 },
+      );
+    }
+
+    logger.debug("house created", { houseId: house.id, userId: user.id });
 
     return NextResponse.json({
       success: true,
@@ -78,3 +85,5 @@ export async function POST(request) {
     );
   }
 }
+
+export const POST = withTiming("/api/houses/create", createHouse);
@@ -0,0 +1,113 @@
+export const dynamic = "force-dynamic";
+
+import { NextResponse } from "next/server";
+import jwt from "jsonwebtoken";
+import { mongoUserRepo } from "../../../lib/repositories/mongodb-user.js";
+import { leaderboard } from "../../../lib/leaderboard.js";
+import { avatarUrlFor } from "../../../lib/image-processor.js";
+import { decodeCursor } from "../../../lib/cursor.js";
+import { measure, withTiming } from "../../../lib/request-timing.js";
+
+const JWT_SECRET = process.env.JWT_SECRET || "streamer-house-secret-key";
+
+const DEFAULT_PAGE_SIZE = 20;
+const MAX_PAGE_SIZE = 100;
+const ROW_AVATAR_SIZE = 96;
+
+function toLeaderboardEntry(u, rank) {
+  return {
+    rank,
+    id: u.id,
+    username: u.username,
+    displayName: u.displayName,
+    avatarUrl: avatarUrlFor(u, ROW_AVATAR_SIZE),
+    totalPoints: u.totalPoints || 0,
+  };
+}
+
+// Ranks for a page: one lookup per distinct total, since ties share a rank
+async function rankPage(users) {
+  const totals = [...new Set(users.map((u) => u.totalPoints || 0))];
+  const ranks = await measure("rank", () =>
+    Promise.all(totals.map((points) => leaderboard.rankOf(points))),
+  );
+  const rankByTotal = new Map(totals.map((points, i) => [points, ranks[i]]));
+
+  return users.map((u) =>
+    toLeaderboardEntry(u, rankByTotal.get(u.totalPoints || 0)),
+  );
+}
+
+// Global points leaderboard, highest first, with the caller's own rank
+async function getLeaderboard(request) {
+  try {
+    const token = request.cookies.get("access_token")?.value;
+
+    if (!token) {
+      return NextResponse.json({ error: "No token provided" }, { status: 401 });
+    }
+
+    let decoded;
+    try {
+      decoded = measure("jwt", () => jwt.verify(token, JWT_SECRET));
+    } catch (jwtError) {
+      return NextResponse.json({ error: "Invalid token" }, { status: 401 });
+    }
+
+    const searchParams = request.nextUrl.searchParams;
+    const cursor = searchParams.get("cursor");
+    const after = decodeCursor(cursor);
+
+    if (
+      cursor &&
+      !(after && Number.isFinite(after[0]) && typeof after[1] === "string")
+    ) {
+      return NextResponse.json({ error: "Invalid cursor" }, { status: 400 });
+    }
+
+    const limit = Math.min(
+      MAX_PAGE_SIZE,
+      Math.max(1, parseInt(searchParams.get("limit"), 10) || DEFAULT_PAGE_SIZE),
+    );
+
+    const [page, user] = await Promise.all([
+      measure("mongo", () =>
+        mongoUserRepo.getLeaderboardPage({ after, limit }),
+      ),
+      measure("mongo", () => mongoUserRepo.getUserById(decoded.userId)),
+    ]);
+
+    if (!user) {
+      return NextResponse.json({ error: "User not found" }, { status: 401 });
+    }
+
+    if (!page) {
+      return NextResponse.json(
+        { error: "Failed to load leaderboard" },
+        { status: 500 },
+      );
+    }
+
+    const totalPoints = user.totalPoints || 0;
+    const [entries, myRank] = await Promise.all([
+      rankPage(page.users),
+      measure("rank", () => leaderboard.rankOf(totalPoints)),
+    ]);
+
+    return NextResponse.json({
+      leaderboard: entries,
+      total: leaderboard.size,
+      nextCursor: page.nextCursor,
+      hasMore: Boolean(page.nextCursor),
+      me: { rank: myRank, totalPoints, points: user.points || {} },
+    });
+  } catch (error) {
+    console.error("MongoDB: Get leaderboard error:", error);
+    return NextResponse.json(
+      { error: "Internal server error" },
+      { status: 500 },
+    );
+  }
+}
+
+export const GET = withTiming("/api/leaderboard", getLeaderboard);
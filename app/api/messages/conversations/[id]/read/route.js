@@ -0,0 +1,49 @@
+export const dynamic = "force-dynamic";
+
+import { NextResponse } from "next/server";
+import jwt from "jsonwebtoken";
+import { mongoMessageRepo } from "../../../../../../lib/repositories/mongodb-message.js";
+import { measure, withTiming } from "../../../../../../lib/request-timing.js";
+
+const JWT_SECRET = process.env.JWT_SECRET || "streamer-house-secret-key";
+
+async function markConversationRead(request, { params }) {
+  try {
+    const token = request.cookies.get("access_token")?.value;
+
+    if (!token) {
+      return NextResponse.json({ error: "No token provided" }, { status: 401 });
+    }
+
+    let decoded;
+    try {
+      decoded = measure("jwt", () => jwt.verify(token, JWT_SECRET));
+    } catch (jwtError) {
+      return NextResponse.json({ error: "Invalid token" }, { status: 401 });
+    }
+
+    const updated = await measure("mongo", () =>
+      mongoMessageRepo.markRead(params.id, decoded.userId),
+    );
+
+    if (!updated) {
+      return NextResponse.json(
+        { error: "Conversation not found" },
+        { status: 404 },
+      );
+    }
+
+    return NextResponse.json({ success: true });
+  } catch (error) {
+    console.error("MongoDB: Mark conversation read error:", error);
+    return NextResponse.json(
+      { error: "Internal server error" },
+      { status: 500 },
+    );
+  }
+}
+
+export const POST = withTiming(
+  "/api/messages/conversations/[id]/read",
+  markConversationRead,
+);
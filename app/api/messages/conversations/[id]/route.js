@@ -0,0 +1,168 @@
+export const dynamic = "force-dynamic";
+
+import { NextResponse } from "next/server";
+import jwt from "jsonwebtoken";
+import { mongoMessageRepo } from "../../../../../lib/repositories/mongodb-message.js";
+import { mongoUserRepo } from "../../../../../lib/repositories/mongodb-user.js";
+import { messageHub } from "../../../../../lib/message-hub.js";
+import { decodeCursor } from "../../../../../lib/cursor.js";
+import { measure, withTiming } from "../../../../../lib/request-timing.js";
+
+const JWT_SECRET = process.env.JWT_SECRET || "streamer-house-secret-key";
+
+const DEFAULT_PAGE_SIZE = 50;
+const MAX_PAGE_SIZE = 100;
+const MAX_MESSAGE_LENGTH = 2000;
+
+async function getMessages(request, { params }) {
+  try {
+    const token = request.cookies.get("access_token")?.value;
+
+    if (!token) {
+      return NextResponse.json({ error: "No token provided" }, { status: 401 });
+    }
+
+    let decoded;
+    try {
+      decoded = measure("jwt", () => jwt.verify(token, JWT_SECRET));
+    } catch (jwtError) {
+      return NextResponse.json({ error: "Invalid token" }, { status: 401 });
+    }
+
+    const searchParams = request.nextUrl.searchParams;
+    const cursor = searchParams.get("cursor");
+    const after = decodeCursor(cursor);
+
+    if (cursor && !after) {
+      return NextResponse.json({ error: "Invalid cursor" }, { status: 400 });
+    }
+
+    const limit = Math.min(
+      MAX_PAGE_SIZE,
+      Math.max(1, parseInt(searchParams.get("limit"), 10) || DEFAULT_PAGE_SIZE),
+    );
+
+    const conversation = await measure("mongo", () =>
+      mongoMessageRepo.getConversationForParticipant(
+        params.id,
+        decoded.userId,
+      ),
+    );
+
+    if (!conversation) {
+      return NextResponse.json(
+        { error: "Conversation not found" },
+        { status: 404 },
+      );
+    }
+
+    const result = await measure("mongo", () =>
+      mongoMessageRepo.getMessages(conversation.id, {
+        after,
+        limit,
+      }),
+    );
+
+    if (!result) {
+      return NextResponse.json(
+        { error: "Failed to load messages" },
+        { status: 500 },
+      );
+    }
+
+    return NextResponse.json({
+      messages: result.messages,
+      nextCursor: result.nextCursor,
+      hasMore: Boolean(result.nextCursor),
+    });
+  } catch (error) {
+    console.error("MongoDB: Get messages error:", error);
+    return NextResponse.json(
+      { error: "Internal server error" },
+      { status: 500 },
+    );
+  }
+}
+
+export const GET = withTiming("/api/messages/conversations/[id]", getMessages);
+
+async function sendMessage(request, { params }) {
+  try {
+    const token = request.cookies.get("access_token")?.value;
+
+    if (!token) {
+      return NextResponse.json({ error: "No token provided" }, { status: 401 });
+    }
+
+    let decoded;
+    try {
+      decoded = measure("jwt", () => jwt.verify(token, JWT_SECRET));
+    } catch (jwtError) {
+      return NextResponse.json({ error: "Invalid token" }, { status: 401 });
+    }
+
+    const { body } = await request.json();
+    const text = typeof body === "string" ? body.trim() : "";
+
+    if (!text) {
+      return NextResponse.json(
+        { error: "Message body is required" },
+        { status: 400 },
+      );
+    }
+
+    if (text.length > MAX_MESSAGE_LENGTH) {
+      return NextResponse.json(
+        {
+          error: `Message must be at most ${MAX_MESSAGE_LENGTH} characters`,
+        },
+        { status: 400 },
+      );
+    }
+
+    const [conversation, sender] = await Promise.all([
+      measure("mongo", () =>
+        mongoMessageRepo.getConversationForParticipant(
+          params.id,
+          decoded.userId,
+        ),
+      ),
+      measure("mongo", () => mongoUserRepo.getUserById(decoded.userId)),
+    ]);
+
+    if (!conversation) {
+      return NextResponse.json(
+        { error: "Conversation not found" },
+        { status: 404 },
+      );
+    }
+
+    if (!sender) {
+      return NextResponse.json({ error: "User not found" }, { status: 404 });
+    }
+
+    const message = await measure("mongo", () =>
+      mongoMessageRepo.sendMessage(conversation, sender, text),
+    );
+
+    if (!message) {
+      return NextResponse.json(
+        { error: "Failed to send message" },
+        { status: 500 },
+      );
+    }
+
+    messageHub.deliver(message);
+
+    const { participantIds, ...created } = message;
+    return NextResponse.json({ success: true, message: created });
+  } catch (error) {
+    console.error("MongoDB: Send message error:", error);
+    return NextResponse.json(
+      { error: "Internal server error" },
+      { status: 500 },
+    );
+  }
+}
+
+export const POST = withTiming("/api/messages/conversations/[id]", sendMessage);
@@ -0,0 +1,173 @@
+export const dynamic = "force-dynamic";
+
+import { NextResponse } from "next/server";
+import jwt from "jsonwebtoken";
+import { mongoMessageRepo } from "../../../../lib/repositories/mongodb-message.js";
+import { mongoUserRepo } from "../../../../lib/repositories/mongodb-user.js";
+import { decodeCursor } from "../../../../lib/cursor.js";
+import { avatarUrlFor } from "../../../../lib/image-processor.js";
+import { measure, withTiming } from "../../../../lib/request-timing.js";
+
+const JWT_SECRET = process.env.JWT_SECRET || "streamer-house-secret-key";
+
+const DEFAULT_PAGE_SIZE = 20;
+const MAX_PAGE_SIZE = 50;
+
+async function getConversations(request) {
+  try {
+    const token = request.cookies.get("access_token")?.value;
+
+    if (!token) {
+      return NextResponse.json({ error: "No token provided" }, { status: 401 });
+    }
+
+    let decoded;
+    try {
+      decoded = measure("jwt", () => jwt.verify(token, JWT_SECRET));
+    } catch (jwtError) {
+      return NextResponse.json({ error: "Invalid token" }, { status: 401 });
+    }
+
+    const searchParams = request.nextUrl.searchParams;
+    const cursor = searchParams.get("cursor");
+    const after = decodeCursor(cursor);
+
+    if (cursor && !after) {
+      return NextResponse.json({ error: "Invalid cursor" }, { status: 400 });
+    }
+
+    const limit = Math.min(
+      MAX_PAGE_SIZE,
+      Math.max(1, parseInt(searchParams.get("limit"), 10) || DEFAULT_PAGE_SIZE),
+    );
+
+    const result = await measure("mongo", () =>
+      mongoMessageRepo.getConversationsForUser(decoded.userId, {
+        after,
+        limit,
+      }),
+    );
+
+    if (!result) {
+      return NextResponse.json(
+        { error: "Failed to load conversations" },
+        { status: 500 },
+      );
+    }
+
+    // One batched read for the other side of every conversation on the page
+    const otherIds = result.conversations.map((conversation) =>
+      conversation.participants.find((p) => p !== decoded.userId),
+    );
+    const users = await measure("mongo", () =>
+      mongoUserRepo.getUsersByIds([...new Set(otherIds)]),
+    );
+
+    if (!users) {
+      return NextResponse.json(
+        { error: "Failed to load conversations" },
+        { status: 500 },
+      );
+    }
+
+    const usersById = new Map(users.map((user) => [user.id, user]));
+
+    const conversations = result.conversations.map(
+      ({ unread, ...conversation }, i) => ({
+        ...conversation,
+        user: usersById.get(otherIds[i]) || null,
+        unreadCount: unread?.[decoded.userId] || 0,
+      }),
+    );
+
+    return NextResponse.json({
+      conversations,
+      nextCursor: result.nextCursor,
+      hasMore: Boolean(result.nextCursor),
+    });
+  } catch (error) {
+    console.error("MongoDB: Get conversations error:", error);
+    return NextResponse.json(
+      { error: "Internal server error" },
+      { status: 500 },
+    );
+  }
+}
+
+export const GET = withTiming("/api/messages/conversations", getConversations);
+
+async function createConversation(request) {
+  try {
+    const token = request.cookies.get("access_token")?.value;
+
+    if (!token) {
+      return NextResponse.json({ error: "No token provided" }, { status: 401 });
+    }
+
+    let decoded;
+    try {
+      decoded = measure("jwt", () => jwt.verify(token, JWT_SECRET));
+    } catch (jwtError) {
+      return NextResponse.json({ error: "Invalid token" }, { status: 401 });
+    }
+
+    const { participantId } = await request.json();
+
+    if (!participantId || participantId === decoded.userId) {
+      return NextResponse.json(
+        { error: "A different participant is required" },
+        { status: 400 },
+      );
+    }
+
+    const participant = await measure("mongo", () =>
+      mongoUserRepo.getUserById(participantId),
+    );
+
+    if (!participant) {
+      return NextResponse.json({ error: "User not found" }, { status: 404 });
+    }
+
+    const conversation = await measure("mongo", () =>
+      mongoMessageRepo.getOrCreateDirectConversation(
+        decoded.userId,
+        participantId,
+      ),
+    );
+
+    if (!conversation) {
+      return NextResponse.json(
+        { error: "Failed to create conversation" },
+        { status: 500 },
+      );
+    }
+
+    const { unread, key, ...rest } = conversation;
+
+    return NextResponse.json({
+      success: true,
+      conversation: {
+        ...rest,
+        user: {
+          id: participant.id,
+          username: participant.username,
+          displayName: participant.displayName,
+          avatarUrl: avatarUrlFor(participant, 96),
+          platforms: participant.platforms,
+        },
+        unreadCount: unread?.[decoded.userId] || 0,
+      },
+    });
+  } catch (error) {
+    console.error("MongoDB: Create conversation error:", error);
+    return NextResponse.json(
+      { error: "Internal server error" },
+      { status: 500 },
+    );
+  }
+}
+
+export const POST = withTiming(
+  "/api/messages/conversations",
+  createConversation,
+);
@@ -0,0 +1,57 @@
+export const dynamic = "force-dynamic";
+
+import { NextResponse } from "next/server";
+import jwt from "jsonwebtoken";
+import { messageHub } from "../../../../lib/message-hub.js";
+import { measure, withTiming } from "../../../../lib/request-timing.js";
+
+const JWT_SECRET = process.env.JWT_SECRET || "streamer-house-secret-key";
+
+// Server-Sent Events stream of new messages for the signed-in user
+async function streamMessages(request) {
+  try {
+    const token = request.cookies.get("access_token")?.value;
+
+    if (!token) {
+      return NextResponse.json({ error: "No token provided" }, { status: 401 });
+    }
+
+    let decoded;
+    try {
+      decoded = measure("jwt", () => jwt.verify(token, JWT_SECRET));
+    } catch (jwtError) {
+      return NextResponse.json({ error: "Invalid token" }, { status: 401 });
+    }
+
+    const subscription = messageHub.subscribe(decoded.userId);
+
+    if (!subscription) {
+      return NextResponse.json(
+        { error: "Too many open message streams" },
+        { status: 503, headers: { "Retry-After": "5" } },
+      );
+    }
+
+    request.signal.addEventListener("abort", subscription.close, {
+      once: true,
+    });
+
+    return new Response(subscription.stream, {
+      headers: {
+        "Content-Type": "text/event-stream; charset=utf-8",
+        "Cache-Control": "no-cache, no-transform",
+        Connection: "keep-alive",
+        // Stops nginx from buffering the stream
+        "X-Accel-Buffering": "no",
+      },
+    });
+  } catch (error) {
+    console.error("Message stream error:", error);
+    return NextResponse.json(
+      { error: "Internal server error" },
+      { status: 500 },
+    );
+  }
+}
+
+export const GET = withTiming("/api/messages/stream", streamMessages);
@@ -0,0 +1,205 @@
+export const dynamic = "force-dynamic";
+
+import { NextResponse } from "next/server";
+import { getPoolStats } from "../../../lib/mongodb.js";
+import { metrics, formatMetric } from "../../../lib/metrics.js";
+import { mongoUserRepo } from "../../../lib/repositories/mongodb-user.js";
+import { profileCache } from "../../../lib/profile-cache.js";
+import { passwordHasher } from "../../../lib/password-hasher.js";
+import { imageProcessor } from "../../../lib/image-processor.js";
+import { messageHub } from "../../../lib/message-hub.js";
+import { roommateRanker } from "../../../lib/roommate-ranker.js";
+import { leaderboard } from "../../../lib/leaderboard.js";
+import { authAdmission } from "../../../lib/rate-limit.js";
+import { getCompressionStats } from "../../../lib/compression.js";
+
+// Set METRICS_TOKEN to require "Authorization: Bearer <token>" on scrapes
+const METRICS_TOKEN = process.env.METRICS_TOKEN;
+
+function gauge(name, help, value) {
+  return formatMetric(name, "gauge", help, [[{}, value]]);
+}
+
+function counter(name, help, value) {
+  return formatMetric(name, "counter", help, [[{}, value]]);
+}
+
+// Prometheus text exposition of everything collected in-process. Not wrapped
+// in withTiming so scrapes don't show up in the request metrics.
+export async function GET(request) {
+  if (
+    METRICS_TOKEN &&
+    request.headers.get("authorization") !== `Bearer ${METRICS_TOKEN}`
+  ) {
+    return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
+  }
+
+  const pool = getPoolStats();
+  const hashing = passwordHasher.getStats();
+  const images = imageProcessor.getStats();
+  const admission = authAdmission.getStats();
+  const userCache = mongoUserRepo.getCacheStats();
+  const profiles = profileCache.stats();
+  const streams = messageHub.getStats();
+  const roommates = roommateRanker.stats();
+  const board = leaderboard.stats();
+  const compression = getCompressionStats();
+
+  const body = metrics.render([
+    gauge("mongodb_pool_connections", "Open connections", pool.open),
+    gauge(
+      "mongodb_pool_checked_out",
+      "Connections checked out by operations",
+      pool.checkedOut,
+    ),
+    gauge(
+      "mongodb_pool_available",
+      "Open connections not in use",
+      pool.available,
+    ),
+    gauge(
+      "mongodb_pool_wait_queue",
+      "Operations waiting for a connection",
+      pool.waitQueue,
+    ),
+    gauge("mongodb_pool_max_size", "Configured maxPoolSize", pool.maxPoolSize),
+    counter(
+      "mongodb_pool_checkout_failures_total",
+      "Connection checkouts that failed or timed out",
+      pool.checkoutFailures,
+    ),
+    formatMetric(
+      "mongodb_pool_checkout_seconds",
+      "gauge",
+      "Connection checkout latency over recent checkouts",
+      [
+        [{ quantile: "0.5" }, pool.checkoutMs.p50 / 1000],
+        [{ quantile: "0.95" }, pool.checkoutMs.p95 / 1000],
+        [{ quantile: "0.99" }, pool.checkoutMs.p99 / 1000],
+      ],
+    ),
+    gauge(
+      "bcrypt_queue_depth",
+      "Password hash jobs waiting for a worker",
+      hashing.queueDepth,
+    ),
+    gauge("bcrypt_workers_active", "Busy hashing workers", hashing.active),
+    counter(
+      "bcrypt_rejected_total",
+      "Hash jobs refused because the queue was full",
+      hashing.rejected,
+    ),
+    gauge(
+      "image_queue_depth",
+      "Avatar images waiting for a processing worker",
+      images.queueDepth,
+    ),
+    gauge("image_workers_active", "Busy image workers", images.active),
+    counter(
+      "image_rejected_total",
+      "Image jobs refused because the queue was full",
+      images.rejected,
+    ),
+    gauge(
+      "auth_requests_in_flight",
+      "Login and signup requests being processed",
+      admission.inFlight,
+    ),
+    counter(
+      "auth_requests_shed_total",
+      "Login and signup requests refused at the in-flight cap",
+      admission.shed,
+    ),
+    formatMetric(
+      "auth_rate_limited_total",
+      "counter",
+      "Login and signup attempts refused with 429",
+      [
+        [{ key: "ip" }, admission.limitedByIp],
+        [{ key: "email" }, admission.limitedByEmail],
+      ],
+    ),
+    gauge("user_cache_entries", "Cached user documents", userCache.size),
+    counter("user_cache_hits_total", "User cache hits", userCache.hits),
+    counter("user_cache_misses_total", "User cache misses", userCache.misses),
+    gauge("profile_cache_entries", "Cached profile responses", profiles.size),
+    counter("profile_cache_hits_total", "Profile cache hits", profiles.hits),
+    counter(
+      "profile_cache_misses_total",
+      "Profile cache misses",
+      profiles.misses,
+    ),
+    counter(
+      "profile_not_modified_total",
+      "Profile requests answered 304 from If-None-Match",
+      profiles.notModified,
+    ),
+    gauge("message_streams_open", "Open message SSE streams", streams.streams),
+    counter(
+      "message_streams_dropped_total",
+      "Streams closed for falling behind",
+      streams.dropped,
+    ),
+    gauge(
+      "roommate_index_users",
+      "Opted-in users in the ranking index",
+      roommates.users,
+    ),
+    gauge(
+      "roommate_index_pending",
+      "Changed users waiting to be refreshed in the ranking index",
+      roommates.pending,
+    ),
+    counter(
+      "roommate_rank_queries_total",
+      "Ranked roommate searches",
+      roommates.queries,
+    ),
+    counter(
+      "roommate_rank_truncated_total",
+      "Ranked searches that hit the candidate budget",
+      roommates.truncated,
+    ),
+    gauge(
+      "leaderboard_users",
+      "Users in the leaderboard rank tree",
+      board.users,
+    ),
+    counter(
+      "leaderboard_awards_total",
+      "Point awards applied through this instance",
+      board.awards,
+    ),
+    counter(
+      "leaderboard_rank_fallbacks_total",
+      "Rank lookups answered by a database count before the tree loaded",
+      board.fallbackLookups,
+    ),
+    formatMetric(
+      "json_responses_total",
+      "counter",
+      "JSON responses sent through compressedJson",
+      [
+        [{ compressed: "true" }, compression.compressed],
+        [{ compressed: "false" }, compression.uncompressed],
+      ],
+    ),
+    counter(
+      "json_compression_input_bytes_total",
+      "Bytes of JSON before compression",
+      compression.bytesIn,
+    ),
+    counter(
+      "json_compression_output_bytes_total",
+      "Bytes of JSON after compression",
+      compression.bytesOut,
+    ),
+  ]);
+
+  return new Response(body, {
+    headers: {
+      "Content-Type": "text/plain; version=0.0.4; charset=utf-8",
+      "Cache-Control": "no-store",
+    },
+  });
+}
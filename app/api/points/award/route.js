@@ -0,0 +1,75 @@
+export const dynamic = "force-dynamic";
+
+import { NextResponse } from "next/server";
+import { POINT_KINDS } from "../../../../lib/repositories/mongodb-user.js";
+import { leaderboard } from "../../../../lib/leaderboard.js";
+import { measure, withTiming } from "../../../../lib/request-timing.js";
+
+// Points are granted by trusted services (moderation, clip and collab
+// review), not by users themselves. Set POINTS_AWARD_TOKEN to enable this
+// route; callers send "Authorization: Bearer <token>".
+const POINTS_AWARD_TOKEN = process.env.POINTS_AWARD_TOKEN;
+
+const MAX_AWARD = 10000;
+
+async function awardPoints(request) {
+  try {
+    if (!POINTS_AWARD_TOKEN) {
+      return NextResponse.json(
+        { error: "Point awards are disabled" },
+        { status: 403 },
+      );
+    }
+
+    const authorization = request.headers.get("authorization");
+    if (authorization !== `Bearer ${POINTS_AWARD_TOKEN}`) {
+      return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
+    }
+
+    const { userId, kind, amount } = await request.json();
+
+    if (!userId || !POINT_KINDS.includes(kind)) {
+      return NextResponse.json(
+        {
+          error: `userId and a kind of ${POINT_KINDS.join(", ")} are required`,
+        },
+        { status: 400 },
+      );
+    }
+
+    if (!Number.isInteger(amount) || amount < 1 || amount > MAX_AWARD) {
+      return NextResponse.json(
+        { error: `amount must be a whole number from 1 to ${MAX_AWARD}` },
+        { status: 400 },
+      );
+    }
+
+    const user = await measure("mongo", () =>
+      leaderboard.award(userId, kind, amount),
+    );
+
+    if (!user) {
+      return NextResponse.json({ error: "User not found" }, { status: 404 });
+    }
+
+    const rank = await measure("rank", () =>
+      leaderboard.rankOf(user.totalPoints),
+    );
+
+    return NextResponse.json({
+      success: true,
+      userId: user.id,
+      totalPoints: user.totalPoints,
+      points: user.points,
+      rank,
+    });
+  } catch (error) {
+    console.error("MongoDB: Award points error:", error);
+    return NextResponse.json(
+      { error: "Internal server error" },
+      { status: 500 },
+    );
+  }
+}
+
+export const POST = withTiming("/api/points/award", awardPoints);
@@ -3,10 +3,134 @@ export const dynamic = "force-dynamic";
 import { NextResponse } from "next/server";
 import jwt from "jsonwebtoken";
 import { mongoUserRepo } from "../../../lib/repositories/mongodb-user.js";
+import {
+  roommateRanker,
+  sharedAttributes,
+  MAX_RANK_DEPTH,
+} from "../../../lib/roommate-ranker.js";
+import { decodeCursor, encodeCursor } from "../../../lib/cursor.js";
+import { avatarUrlFor } from "../../../lib/image-processor.js";
+import {
+  parseFields,
+  fieldsProjection,
+  applyProjection,
+  FieldsetError,
+} from "../../../lib/fieldsets.js";
+import { compressedJson } from "../../../lib/compression.js";
+import { measure, withTiming } from "../../../lib/request-timing.js";
 
 const JWT_SECRET = process.env.JWT_SECRET || "streamer-house-secret-key";
 
-export async function GET(request) {
+const DEFAULT_PAGE_SIZE = 20;
+const MAX_PAGE_SIZE = 50;
+
+// Cards show a 48px avatar, so the 2x variant is enough
+const CARD_AVATAR_SIZE = 96;
+
+// Ranked pages are addressed by position: the cursor is ["rank", offset]
+const RANK_CURSOR = "rank";
+
+// Stored fields each card field is built from, so ?fields=displayName,city
+// narrows the database read as well as the response. id and createdAt are
+// always read for the page cursor.
+const CARD_SOURCES = {
+  id: [],
+  displayName: ["displayName"],
+  username: ["username"],
+  avatarUrl: ["avatarUrl", "avatarVariants"],
+  platforms: ["platforms"],
+  niches: ["niches"],
+  games: ["games"],
+  city: ["city"],
+  timeZone: ["timeZone"],
+  bio: ["bio"],
+  matchScore: [],
+  shared: ["platforms", "niches", "games"],
+};
+const CARD_FIELDS = Object.keys(CARD_SOURCES);
+
+// The database projection and the card trimming for a field list
+function cardFields(fields) {
+  if (!fields) return { projection: undefined, shape: (card) => card };
+
+  const projection = { _id: 0, id: 1, createdAt: 1 };
+  for (const field of fields) {
+    for (const source of CARD_SOURCES[field]) projection[source] = 1;
+  }
+
+  const cardProjection = fieldsProjection(fields);
+  return { projection, shape: (card) => applyProjection(card, cardProjection) };
+}
+
+function parseList(value) {
+  if (!value) return [];
+  return value
+    .split(",")
+    .map((item) => item.trim())
+    .filter(Boolean);
+}
+
+function toRoommate(u) {
+  return {
+    id: u.id,
+    displayName: u.displayName,
+    username: u.username,
+    avatarUrl: avatarUrlFor(u, CARD_AVATAR_SIZE),
+    platforms: u.platforms || [],
+    niches: u.niches || [],
+    games: u.games || [],
+    city: u.city,
+    timeZone: u.timeZone,
+    bio: u.bio || "",
+  };
+}
+
+// Ordered by compatibility with the searcher from the in-memory index.
+// Returns null when there is nothing to rank by (index still loading, or no
+// candidate shares anything with the searcher) or the ranked users couldn't
+// be read, so the caller can fall back to newest-first.
+async function rankedPage(user, filters, offset, limit, card) {
+  const ranked = measure("rank", () =>
+    roommateRanker.rank(user, { filters, offset, limit }),
+  );
+
+  if (!ranked || (ranked.total === 0 && offset === 0)) return null;
+
+  const users = await measure("mongo", () =>
+    mongoUserRepo.getUsersByIds(
+      ranked.results.map((result) => result.id),
+      card.projection,
+    ),
+  );
+  if (!users) return null;
+
+  const usersById = new Map(users.map((u) => [u.id, u]));
+
+  // A user deleted since the index was refreshed is simply skipped
+  const roommates = ranked.results
+    .filter((result) => usersById.has(result.id))
+    .map((result) => {
+      const u = usersById.get(result.id);
+      return card.shape({
+        ...toRoommate(u),
+        matchScore: Math.round(result.score * 100),
+        shared: sharedAttributes(u, user),
+      });
+    });
+
+  const nextOffset = offset + limit;
+  const hasMore = nextOffset < Math.min(ranked.total, MAX_RANK_DEPTH);
+
+  return {
+    roommates,
+    total: offset === 0 ? ranked.total : null,
+    nextCursor: hasMore ? encodeCursor([RANK_CURSOR, nextOffset]) : null,
+    hasMore,
+    sort: "match",
+  };
+}
+
+async function getRoommates(request) {
   try {
     const token = request.cookies.get("access_token")?.value;
 
@@ -16,58 +140,108 @@ export async function GET(request) {
 
     let decoded;
     try {
-      decoded = jwt.verify(token, JWT_SECRET);
+      decoded = measure("jwt", () => jwt.verify(token, JWT_SECRET));
     } catch (jwtError) {
       return NextResponse.json({ error: "Invalid token" }, { status: 401 });
     }
 
-    const user = await mongoUserRepo.getUserById(decoded.userId);
+    const user = await measure("mongo", () =>
+      mongoUserRepo.getUserById(decoded.userId),
+    );
 
     if (!user) {
       return NextResponse.json({ error: "User not found" }, { status: 401 });
     }
 
-    // Get all users who have opted into roommate search
-    const allUsers = await mongoUserRepo.getAllUsers();
-    const roommateUsers = allUsers.filter(
-      (u) =>
-        u.id !== user.id && // Don't include the current user
-        u.roommateOptIn && // Only include users who opted in
-        u.city, // Only include users who have a location
+    const searchParams = request.nextUrl.searchParams;
+    const cursor = searchParams.get("cursor");
+    const after = decodeCursor(cursor);
+
+    if (cursor && !after) {
+      return NextResponse.json({ error: "Invalid cursor" }, { status: 400 });
+    }
+
+    const limit = Math.min(
+      MAX_PAGE_SIZE,
+      Math.max(1, parseInt(searchParams.get("limit"), 10) || DEFAULT_PAGE_SIZE),
     );
 
-    console.log(
-      "MongoDB: Found",
-      roommateUsers.length,
-      "roommate candidates for user:",
-      user.email,
+    // Budget filters are accepted by the page but there is no stored budget
+    // field to match against yet, so they are ignored here.
+    const filters = {
+      city: searchParams.get("location")?.trim() || null,
+      timeZone: searchParams.get("timeZone")?.trim() || null,
+      niche: searchParams.get("niche")?.trim() || null,
+      platform: searchParams.get("platform")?.trim() || null,
+      interests: parseList(searchParams.get("interests")),
+    };
+
+    const fields = parseFields(searchParams.get("fields"), CARD_FIELDS);
+    const card = cardFields(fields);
+
+    const ranked = searchParams.get("sort") !== "recent";
+    const rankCursor = after?.[0] === RANK_CURSOR;
+    if (
+      rankCursor &&
+      !(ranked && Number.isInteger(after[1]) && after[1] >= 0)
+    ) {
+      return NextResponse.json({ error: "Invalid cursor" }, { status: 400 });
+    }
+
+    // Best matches first unless ?sort=recent; a newest-first cursor keeps
+    // paging newest-first.
+    if (ranked && (!after || rankCursor)) {
+      const page = await rankedPage(
+        user,
+        filters,
+        rankCursor ? after[1] : 0,
+        limit,
+        card,
+      );
+      if (page) return compressedJson(request, page);
+
+      // Only a freshly started instance has no index to continue from
+      if (rankCursor) {
+        return NextResponse.json(
+          { error: "Roommate ranking is loading, try again shortly" },
+          { status: 503 },
+        );
+      }
+    }
+
+    const result = await measure("mongo", () =>
+      mongoUserRepo.searchRoommates({
+        excludeUserId: user.id,
+        ...filters,
+        after,
+        limit,
+        withTotal: !after,
+        projection: card.projection,
+      }),
     );
 
-    // Return roommate data
-    const roommates = roommateUsers.map((u) => ({
-      id: u.id,
-      displayName: u.displayName,
-      username: u.username,
-      avatarUrl: u.avatarUrl,
-      platforms: u.platforms || [],
-      niches: u.niches || [],
-      city: u.city,
-      timeZone: u.timeZone,
-      bio: u.bio || "",
-      // Add some mock roommate-specific fields
-      experience: "Intermediate",
-      lookingFor: "Content collaboration",
-      budget: "$800-1200",
-      availableFrom: "2024-01-01",
-    }));
-
-    return NextResponse.json({
-      roommates: roommates.slice(0, 20), // Limit to 20 for now
-      total: roommates.length,
-      page: 1,
-      hasMore: roommates.length > 20,
+    if (!result) {
+      return NextResponse.json(
+        { error: "Failed to load roommates" },
+        { status: 500 },
+      );
+    }
+
+    return compressedJson(request, {
+      roommates: result.users.map((u) => card.shape(toRoommate(u))),
+      total: result.total,
+      nextCursor: result.nextCursor,
+      hasMore: Boolean(result.nextCursor),
+      sort: "recent",
     });
   } catch (error) {
+    if (error instanceof FieldsetError) {
+      return NextResponse.json(
+        { error: error.message },
+        { status: error.status },
+      );
+    }
+
     console.error("MongoDB: Get roommates error:", error);
     return NextResponse.json(
       { error: "Internal server error" },
@@ -75,3 +249,5 @@ export async function GET(request) {
     );
   }
 }
+
+export const GET = withTiming("/api/roommates", getRoommates);
@@ -0,0 +1,58 @@
+export const dynamic = "force-dynamic";
+
+import { NextResponse } from "next/server";
+import jwt from "jsonwebtoken";
+import { mongoUserRepo } from "../../../../lib/repositories/mongodb-user.js";
+import { measure, withTiming } from "../../../../lib/request-timing.js";
+
+const JWT_SECRET = process.env.JWT_SECRET || "streamer-house-secret-key";
+
+const DEFAULT_SUGGESTIONS = 8;
+const MAX_SUGGESTIONS = 20;
+const MAX_PREFIX_LENGTH = 50;
+
+// GET /api/search/autocomplete?q=ni — display names starting with the
+// prefix, case-insensitively, answered from the display_name_prefix index.
+async function autocomplete(request) {
+  try {
+    const token = request.cookies.get("access_token")?.value;
+
+    if (!token) {
+      return NextResponse.json({ error: "No token provided" }, { status: 401 });
+    }
+
+    try {
+      measure("jwt", () => jwt.verify(token, JWT_SECRET));
+    } catch (jwtError) {
+      return NextResponse.json({ error: "Invalid token" }, { status: 401 });
+    }
+
+    const searchParams = request.nextUrl.searchParams;
+    const prefix = (searchParams.get("q") || "").slice(0, MAX_PREFIX_LENGTH);
+    const limit = Math.min(
+      MAX_SUGGESTIONS,
+      Math.max(
+        1,
+        parseInt(searchParams.get("limit"), 10) || DEFAULT_SUGGESTIONS,
+      ),
+    );
+
+    const suggestions = await measure("mongo", () =>
+      mongoUserRepo.autocompleteUsers(prefix, limit),
+    );
+
+    // Typing the same prefix again within a minute is served by the browser
+    return NextResponse.json(
+      { suggestions },
+      { headers: { "Cache-Control": "private, max-age=60" } },
+    );
+  } catch (error) {
+    console.error("MongoDB: Autocomplete error:", error);
+    return NextResponse.json(
+      { error: "Internal server error" },
+      { status: 500 },
+    );
+  }
+}
+
+export const GET = withTiming("/api/search/autocomplete", autocomplete);
@@ -0,0 +1,103 @@
+export const dynamic = "force-dynamic";
+
+import { NextResponse } from "next/server";
+import jwt from "jsonwebtoken";
+import {
+  mongoUserRepo,
+  MAX_SEARCH_MATCHES,
+} from "../../../../lib/repositories/mongodb-user.js";
+import { decodeCursor, encodeCursor } from "../../../../lib/cursor.js";
+import { measure, withTiming } from "../../../../lib/request-timing.js";
+
+const JWT_SECRET = process.env.JWT_SECRET || "streamer-house-secret-key";
+
+const DEFAULT_PAGE_SIZE = 20;
+const MAX_PAGE_SIZE = 50;
+const MAX_QUERY_LENGTH = 100;
+
+// GET /api/search/users?q=valorant&niche=Gaming&city=Austin&roommates=true
+// Keyword search with platform/niche/city facet counts. Pages are addressed
+// by position: the cursor is [offset]. The total and the facets are counted
+// over the best MAX_SEARCH_MATCHES matches only; totalCapped says when there
+// were more.
+async function searchUsers(request) {
+  try {
+    const token = request.cookies.get("access_token")?.value;
+
+    if (!token) {
+      return NextResponse.json({ error: "No token provided" }, { status: 401 });
+    }
+
+    let decoded;
+    try {
+      decoded = measure("jwt", () => jwt.verify(token, JWT_SECRET));
+    } catch (jwtError) {
+      return NextResponse.json({ error: "Invalid token" }, { status: 401 });
+    }
+
+    const searchParams = request.nextUrl.searchParams;
+    const cursor = searchParams.get("cursor");
+    const after = decodeCursor(cursor);
+
+    if (cursor && !(Number.isInteger(after?.[0]) && after[0] >= 0)) {
+      return NextResponse.json({ error: "Invalid cursor" }, { status: 400 });
+    }
+
+    const limit = Math.min(
+      MAX_PAGE_SIZE,
+      Math.max(1, parseInt(searchParams.get("limit"), 10) || DEFAULT_PAGE_SIZE),
+    );
+    const offset = after ? after[0] : 0;
+
+    const text = searchParams.get("q")?.trim().slice(0, MAX_QUERY_LENGTH);
+    const filters = {
+      platform: searchParams.get("platform")?.trim() || null,
+      niche: searchParams.get("niche")?.trim() || null,
+      game: searchParams.get("game")?.trim() || null,
+      city: searchParams.get("city")?.trim() || null,
+    };
+
+    if (!text && !Object.values(filters).some(Boolean)) {
+      return NextResponse.json(
+        { error: "Provide a search term or at least one filter" },
+        { status: 400 },
+      );
+    }
+
+    const result = await measure("mongo", () =>
+      mongoUserRepo.searchUsers({
+        text: text || null,
+        ...filters,
+        roommatesOnly: searchParams.get("roommates") === "true",
+        excludeUserId: decoded.userId,
+        offset,
+        limit,
+      }),
+    );
+
+    if (!result) {
+      return NextResponse.json(
+        { error: "Failed to search users" },
+        { status: 500 },
+      );
+    }
+
+    return NextResponse.json({
+      users: result.users,
+      total: result.total,
+      totalCapped: result.totalCapped,
+      facets: result.facets,
+      facetsLimitedTo: MAX_SEARCH_MATCHES,
+      nextCursor: result.hasMore ? encodeCursor([offset + limit]) : null,
+      hasMore: result.hasMore,
+    });
+  } catch (error) {
+    console.error("MongoDB: Search users error:", error);
+    return NextResponse.json(
+      { error: "Internal server error" },
+      { status: 500 },
+    );
+  }
+}
+
+export const GET = withTiming("/api/search/users", searchUsers);
@@ -3,10 +3,11 @@ export const dynamic = "force-dynamic";
 import { NextResponse } from "next/server";
 import jwt from "jsonwebtoken";
 import { mongoUserRepo } from "../../../../lib/repositories/mongodb-user.js";
+import { measure, withTiming } from "../../../../lib/request-timing.js";
 
 const JWT_SECRET = process.env.JWT_SECRET || "streamer-house-secret-key";
 
-export async function PUT(request) {
+async function updateRoommateSearch(request) {
   try {
     const token = request.cookies.get("access_token")?.value;
 
@@ -16,30 +17,26 @@ export async function PUT(request) {
 
     let decoded;
     try {
-      decoded = jwt.verify(token, JWT_SECRET);
+      decoded = measure("jwt", () => jwt.verify(token, JWT_SECRET));
     } catch (jwtError) {
       return NextResponse.json({ error: "Invalid token" }, { status: 401 });
     }
 
-    const user = await mongoUserRepo.getUserById(decoded.userId);
-
-    if (!user) {
-      return NextResponse.json({ error: "User not found" }, { status: 401 });
-    }
-
     const { appearInRoommateSearch } = await request.json();
 
-    console.log(
-      "MongoDB: Updating roommate search visibility for user:",
-      user.email,
-      "to:",
-      appearInRoommateSearch,
+    // Update the user's roommate opt-in setting
+    const updatedUser = await measure("mongo", () =>
+      mongoUserRepo.updateUser(
+        decoded.userId,
+        { roommateOptIn: Boolean(appearInRoommateSearch) },
+        { projection: { _id: 0, roommateOptIn: 1 } },
+      ),
     );
 
-    // Update the user's roommate opt-in setting
-    const updatedUser = await mongoUserRepo.updateUser(user.id, {
-      roommateOptIn: Boolean(appearInRoommateSearch),
-    });
+    // A valid token for a user that has since been deleted
+    if (updatedUser === false) {
+      return NextResponse.json({ error: "User not found" }, { status: 401 });
+    }
 
     if (!updatedUser) {
       return NextResponse.json(
@@ -61,3 +58,8 @@ export async function PUT(request) {
     );
   }
 }
+
+export const PUT = withTiming(
+  "/api/settings/roommate-search",
+  updateRoommateSearch,
+);
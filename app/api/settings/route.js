@@ -3,10 +3,18 @@ export const dynamic = "force-dynamic";
 import { NextResponse } from "next/server";
 import jwt from "jsonwebtoken";
 import { mongoUserRepo } from "../../../lib/repositories/mongodb-user.js";
+import {
+  parseFields,
+  fieldsProjection,
+  FieldsetError,
+} from "../../../lib/fieldsets.js";
+import { compressedJson } from "../../../lib/compression.js";
+import { measure, withTiming } from "../../../lib/request-timing.js";
 
 const JWT_SECRET = process.env.JWT_SECRET || "streamer-house-secret-key";
 
-export async function PUT(request) {
+// Responds with the updated user; ?fields= narrows it as on /api/auth/me
+async function updateSettings(request) {
   try {
     const token = request.cookies.get("access_token")?.value;
 
@@ -16,21 +24,18 @@ export async function PUT(request) {
 
     let decoded;
     try {
-      decoded = jwt.verify(token, JWT_SECRET);
+      decoded = measure("jwt", () => jwt.verify(token, JWT_SECRET));
     } catch (jwtError) {
       return NextResponse.json({ error: "Invalid token" }, { status: 401 });
     }
 
-    const user = await mongoUserRepo.getUserById(decoded.userId);
-
-    if (!user) {
-      return NextResponse.json({ error: "User not found" }, { status: 401 });
-    }
+    const fields = parseFields(request.nextUrl.searchParams.get("fields"));
+    const projection = fields
+      ? fieldsProjection(fields)
+      : { _id: 0, passwordHash: 0 };
 
     const updates = await request.json();
 
-    console.log("MongoDB: Updating user settings:", updates);
-
     // Validate that at least one field is being updated
     const allowedFields = [
       "displayName",
@@ -43,19 +48,26 @@ export async function PUT(request) {
       "games",
       "roommateOptIn",
     ];
-    const validUpdates = Object.keys(updates).filter((key) =>
-      allowedFields.includes(key),
+    const validUpdates = Object.fromEntries(
+      Object.entries(updates).filter(([key]) => allowedFields.includes(key)),
     );
 
-    if (validUpdates.length === 0) {
+    if (Object.keys(validUpdates).length === 0) {
       return NextResponse.json(
         { error: "At least one valid field must be provided to update" },
         { status: 400 },
       );
     }
 
-    // Update the user
-    const updatedUser = await mongoUserRepo.updateUser(user.id, updates);
+    // Update the user and read back the result in one round trip
+    const updatedUser = await measure("mongo", () =>
+      mongoUserRepo.updateUser(decoded.userId, validUpdates, { projection }),
+    );
+
+    // A valid token for a user that has since been deleted
+    if (updatedUser === false) {
+      return NextResponse.json({ error: "User not found" }, { status: 401 });
+    }
 
     if (!updatedUser) {
       return NextResponse.json(
@@ -64,14 +76,19 @@ export async function PUT(request) {
       );
     }
 
-    const { passwordHash: _, ...userWithoutPassword } = updatedUser;
-
-    return NextResponse.json({
+    return compressedJson(request, {
       success: true,
-      user: userWithoutPassword,
+      user: updatedUser,
       message: "Settings updated successfully",
     });
   } catch (error) {
+    if (error instanceof FieldsetError) {
+      return NextResponse.json(
+        { error: error.message },
+        { status: error.status },
+      );
+    }
+
     console.error("MongoDB: Update settings error:", error);
     return NextResponse.json(
       { error: "Internal server error" },
@@ -79,3 +96,5 @@ export async function PUT(request) {
     );
   }
 }
+
+export const PUT = withTiming("/api/settings", updateSettings);
@@ -2,11 +2,98 @@ export const dynamic = "force-dynamic";
 
 import { NextResponse } from "next/server";
 import jwt from "jsonwebtoken";
+import { createHash } from "node:crypto";
 import { mongoUserRepo } from "../../../../lib/repositories/mongodb-user.js";
+import { mongoAvatarRepo } from "../../../../lib/repositories/mongodb-avatar.js";
+import {
+  imageProcessor,
+  AVATAR_SIZES,
+  ImageProcessingUnavailableError,
+  ImageQueueFullError,
+  InvalidImageError,
+} from "../../../../lib/image-processor.js";
+import {
+  openMultipartFile,
+  MultipartError,
+} from "../../../../lib/multipart.js";
+import { measure, withTiming } from "../../../../lib/request-timing.js";
+import { logger } from "../../../../lib/logger.js";
 
 const JWT_SECRET = process.env.JWT_SECRET || "streamer-house-secret-key";
 
-export async function POST(request) {
+const MAX_AVATAR_BYTES = 5 * 1024 * 1024;
+const TOO_LARGE_MESSAGE = "File size must be less than 5MB";
+
+// Reads the whole file (bounded by MAX_AVATAR_BYTES), hashing as it arrives
+async function readUpload(stream) {
+  const hash = createHash("sha256");
+  const chunks = [];
+  let size = 0;
+
+  for await (const chunk of stream) {
+    hash.update(chunk);
+    chunks.push(chunk);
+    size += chunk.length;
+  }
+
+  return { bytes: Buffer.concat(chunks, size), hash: hash.digest("hex") };
+}
+
+// A stored asset is reused if it has every configured size, or if it was
+// stored unprocessed and processing is still unavailable.
+function isReusable(asset) {
+  if (!asset) return false;
+  if (AVATAR_SIZES.every((size) => asset.variants?.[size])) return true;
+  return !asset.processed && !imageProcessor.available;
+}
+
+// Processes and stores a new image under keys derived from its hash
+async function storeAvatar(storage, bytes, hash, contentType) {
+  let processed;
+  try {
+    processed = await imageProcessor.processAvatar(bytes);
+  } catch (error) {
+    if (!(error instanceof ImageProcessingUnavailableError)) throw error;
+
+    // A bare "image/" type has no subtype to name the file by
+    const extension =
+      (contentType.split("/")[1] || "").replace(/[^a-z0-9]/gi, "") || "bin";
+    const uploadResult = await measure("storage", () =>
+      storage.uploadFile(bytes, `avatars/${hash}.${extension}`, contentType),
+    );
+    return {
+      _id: hash,
+      url: uploadResult.url,
+      variants: {},
+      processed: false,
+      createdAt: new Date().toISOString(),
+    };
+  }
+
+  const uploads = await measure("storage", () =>
+    Promise.all(
+      processed.variants.map(({ size, data }) =>
+        storage.uploadFile(data, `avatars/${hash}/${size}.webp`, "image/webp"),
+      ),
+    ),
+  );
+
+  const variants = Object.fromEntries(
+    processed.variants.map(({ size }, i) => [size, uploads[i].url]),
+  );
+
+  return {
+    _id: hash,
+    url: uploads[uploads.length - 1].url,
+    variants,
+    processed: true,
+    width: processed.width,
+    height: processed.height,
+    createdAt: new Date().toISOString(),
+  };
+}
+
+async function uploadAvatar(request) {
   try {
     const token = request.cookies.get("access_token")?.value;
 
@@ -16,56 +103,77 @@ export async function POST(request) {
 
     let decoded;
     try {
-      decoded = jwt.verify(token, JWT_SECRET);
+      decoded = measure("jwt", () => jwt.verify(token, JWT_SECRET));
     } catch (jwtError) {
       return NextResponse.json({ error: "Invalid token" }, { status: 401 });
     }
 
-    const user = await mongoUserRepo.getUserById(decoded.userId);
+    const user = await measure("mongo", () =>
+      mongoUserRepo.getUserById(decoded.userId),
+    );
 
     if (!user) {
       return NextResponse.json({ error: "User not found" }, { status: 401 });
     }
 
-    const formData = await request.formData();
-    const file = formData.get("avatar");
+    // Read the file part without buffering the rest of the body
+    let upload;
+    try {
+      upload = await openMultipartFile(request, {
+        field: "avatar",
+        maxBytes: MAX_AVATAR_BYTES,
+      });
+    } catch (multipartError) {
+      if (multipartError instanceof MultipartError) {
+        return NextResponse.json(
+          {
+            error:
+              multipartError.status === 413
+                ? TOO_LARGE_MESSAGE
+                : multipartError.message,
+          },
+          { status: 400 },
+        );
+      }
+      throw multipartError;
+    }
 
-    if (!file) {
+    if (!upload) {
       return NextResponse.json({ error: "No file provided" }, { status: 400 });
     }
 
-    // Validate file type and size
-    if (!file.type.startsWith("image/")) {
+    // Validate file type before reading any file bytes
+    if (!upload.contentType.startsWith("image/")) {
+      upload.cancel();
       return NextResponse.json(
         { error: "File must be an image" },
         { status: 400 },
       );
     }
 
-    if (file.size > 5 * 1024 * 1024) {
-      // 5MB limit
-      return NextResponse.json(
-        { error: "File size must be less than 5MB" },
-        { status: 400 },
-      );
-    }
-
-    // Convert file to buffer for storage
-    const bytes = await file.arrayBuffer();
-    const buffer = Buffer.from(bytes);
+    try {
+      const { bytes, hash } = await readUpload(upload.stream);
 
-    // Generate unique key for the file
-    const key = `avatars/${user.id}_${Date.now()}_${file.name}`;
+      // Identical bytes were already processed and stored, possibly for
+      // another user; point this user at the same variants.
+      let asset = await measure("mongo", () => mongoAvatarRepo.getAsset(hash));
+      const deduplicated = isReusable(asset);
 
-    try {
-      // Use storage adapter (will automatically choose S3, Cloudinary, or Mock)
-      const { storage } = await import("../../../../lib/storage.ts");
-      const uploadResult = await storage.uploadFile(buffer, key, file.type);
+      if (!deduplicated) {
+        // Storage adapter picks S3, Cloudinary, or Mock
+        const { storage } = await import("../../../../lib/storage.ts");
+        asset = await storeAvatar(storage, bytes, hash, upload.contentType);
+        await measure("mongo", () => mongoAvatarRepo.saveAsset(asset));
+      }
 
       // Update user with new avatar URL
-      const updatedUser = await mongoUserRepo.updateUser(user.id, {
-        avatarUrl: uploadResult.url,
-      });
+      const updatedUser = await measure("mongo", () =>
+        mongoUserRepo.updateUser(user.id, {
+          avatarUrl: asset.url,
+          avatarVariants: asset.variants,
+          avatarHash: hash,
+        }),
+      );
 
       if (!updatedUser) {
         return NextResponse.json(
@@ -74,25 +182,66 @@ export async function POST(request) {
         );
       }
 
-      console.log("MongoDB: Avatar uploaded and updated for user:", user.email, "URL:", uploadResult.url);
+      logger.debug("avatar uploaded", {
+        userId: user.id,
+        hash,
+        deduplicated,
+      });
 
       return NextResponse.json({
         success: true,
-        avatarUrl: uploadResult.url,
+        avatarUrl: asset.url,
+        avatarVariants: asset.variants,
+        deduplicated,
         message: "Avatar updated successfully",
-        storageProvider: uploadResult.url.includes('cloudinary.com') ? 'Cloudinary' : 
-                        uploadResult.url.includes('amazonaws.com') ? 'AWS S3' : 'Mock'
+        storageProvider: asset.url.includes("cloudinary.com")
+          ? "Cloudinary"
+          : asset.url.includes("amazonaws.com")
+            ? "AWS S3"
+            : "Mock",
       });
     } catch (uploadError) {
+      // The size limit trips mid-stream, before anything is processed
+      if (upload.tooLarge) {
+        return NextResponse.json({ error: TOO_LARGE_MESSAGE }, { status: 400 });
+      }
+
+      // A truncated or malformed body is the client's fault, not a reason
+      // to fall back to a generated avatar
+      if (uploadError instanceof MultipartError) {
+        return NextResponse.json(
+          { error: uploadError.message },
+          { status: 400 },
+        );
+      }
+
+      if (uploadError instanceof InvalidImageError) {
+        return NextResponse.json(
+          { error: "File must be a valid image" },
+          { status: 400 },
+        );
+      }
+
+      if (uploadError instanceof ImageQueueFullError) {
+        return NextResponse.json(
+          { error: "Server is busy, please try again" },
+          { status: 503, headers: { "Retry-After": "1" } },
+        );
+      }
+
       console.error("Avatar upload failed:", uploadError);
 
       // Fallback to dicebear avatar
       const avatarUrl = `https://api.dicebear.com/7.x/avataaars/svg?seed=${user.username}&backgroundColor=b6e3f4,c0aede,d1d4f9`;
 
       // Update user with fallback avatar URL
-      const updatedUser = await mongoUserRepo.updateUser(user.id, {
-        avatarUrl: avatarUrl,
-      });
+      const updatedUser = await measure("mongo", () =>
+        mongoUserRepo.updateUser(user.id, {
+          avatarUrl: avatarUrl,
+          avatarVariants: null,
+          avatarHash: null,
+        }),
+      );
 
       if (!updatedUser) {
         return NextResponse.json(
@@ -101,7 +250,7 @@ export async function POST(request) {
         );
       }
 
-      console.log("MongoDB: Fallback avatar updated for user:", user.email);
+      logger.debug("fallback avatar set", { userId: user.id });
 
       return NextResponse.json({
         success: true,
@@ -117,3 +266,5 @@ export async function POST(request) {
     );
   }
 }
+
+export const POST = withTiming("/api/upload/avatar", uploadAvatar);
@@ -2,8 +2,35 @@ export const dynamic = "force-dynamic";
 
 import { NextResponse } from "next/server";
 import { mongoUserRepo } from "../../../../lib/repositories/mongodb-user.js";
+import { profileCache } from "../../../../lib/profile-cache.js";
+import { measure, withTiming } from "../../../../lib/request-timing.js";
 
-export async function GET(request, { params }) {
+// Browsers revalidate every view (cheap with the ETag); a shared cache or CDN
+// may serve a profile for 30s and keep serving it for 5 minutes while it
+// revalidates in the background.
+const CACHE_CONTROL =
+  "public, max-age=0, s-maxage=30, stale-while-revalidate=300";
+
+// Bump when the response shape changes so old ETags stop matching
+const PROFILE_FORMAT = 1;
+
+function profileETag(user) {
+  const revision = user.version ?? user.updatedAt ?? user.createdAt;
+  return `W/"${user.id}.${revision}.${PROFILE_FORMAT}"`;
+}
+
+function matchesETag(ifNoneMatch, etag) {
+  if (!ifNoneMatch) return false;
+  if (ifNoneMatch.trim() === "*") return true;
+
+  // Weak comparison: the W/ prefix is ignored on both sides
+  const opaque = etag.replace(/^W\//, "");
+  return ifNoneMatch
+    .split(",")
+    .some((candidate) => candidate.trim().replace(/^W\//, "") === opaque);
+}
+
+async function getUserProfile(request, { params }) {
   try {
     const { username } = params;
 
@@ -14,37 +41,52 @@ export async function GET(request, { params }) {
       );
     }
 
-    console.log("MongoDB: Looking up user by username:", username);
+    const key = username.toLowerCase();
+    let entry = profileCache.get(key);
 
-    // Get user by username
-    const user = await mongoUserRepo.getUserByUsername(username);
+    if (!entry) {
+      const generation = profileCache.generation;
+      const user = await measure("mongo", () =>
+        mongoUserRepo.getPublicProfile(key),
+      );
+
+      if (!user) {
+        return NextResponse.json({ error: "User not found" }, { status: 404 });
+      }
 
-    if (!user) {
-      console.log("MongoDB: User not found for username:", username);
-      return NextResponse.json({ error: "User not found" }, { status: 404 });
+      // Post and clip counts are still mocked; points come from awards
+      const profileData = {
+        ...user,
+        stats: {
+          totalPosts: 0,
+          totalClips: 0,
+          totalPoints: user.totalPoints || 0,
+          engagePoints: user.points?.engage || 0,
+          clipPoints: user.points?.clip || 0,
+          collabPoints: user.points?.collab || 0,
+        },
+        posts: [], // Mock empty posts for now
+        clips: [], // Mock empty clips for now
+      };
+
+      entry = {
+        userId: user.id,
+        etag: profileETag(user),
+        body: JSON.stringify(profileData),
+      };
+      profileCache.set(key, entry, generation);
     }
 
-    console.log("MongoDB: User found:", user.email);
-
-    // Return user profile data (without password)
-    const { passwordHash: _, ...userProfile } = user;
-
-    // Add mock engagement stats for now
-    const profileData = {
-      ...userProfile,
-      stats: {
-        totalPosts: 0,
-        totalClips: 0,
-        totalPoints: user.totalPoints || 0,
-        engagePoints: 0,
-        clipPoints: 0,
-        collabPoints: 0,
-      },
-      posts: [], // Mock empty posts for now
-      clips: [], // Mock empty clips for now
-    };
-
-    return NextResponse.json(profileData);
+    const headers = { ETag: entry.etag, "Cache-Control": CACHE_CONTROL };
+
+    if (matchesETag(request.headers.get("if-none-match"), entry.etag)) {
+      profileCache.recordNotModified();
+      return new Response(null, { status: 304, headers });
+    }
+
+    return new Response(entry.body, {
+      headers: { ...headers, "Content-Type": "application/json" },
+    });
   } catch (error) {
     console.error("MongoDB: Get user profile error:", error);
     return NextResponse.json(
@@ -53,3 +95,5 @@ export async function GET(request, { params }) {
     );
   }
 }
+
+export const GET = withTiming("/api/users/[username]", getUserProfile);
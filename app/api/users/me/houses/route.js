@@ -2,11 +2,16 @@ export const dynamic = "force-dynamic";
 
 import { NextResponse } from "next/server";
 import jwt from "jsonwebtoken";
-import { mongoUserRepo } from "../../../../../lib/repositories/mongodb-user.js";
+import { mongoHouseRepo } from "../../../../../lib/repositories/mongodb-house.js";
+import { decodeCursor } from "../../../../../lib/cursor.js";
+import { measure, withTiming } from "../../../../../lib/request-timing.js";
 
 const JWT_SECRET = process.env.JWT_SECRET || "streamer-house-secret-key";
 
-export async function GET(request) {
+const DEFAULT_PAGE_SIZE = 20;
+const MAX_PAGE_SIZE = 50;
+
+async function getMyHouses(request) {
   try {
     const token = request.cookies.get("access_token")?.value;
 
@@ -16,24 +21,45 @@ export async function GET(request) {
 
     let decoded;
     try {
-      decoded = jwt.verify(token, JWT_SECRET);
+      decoded = measure("jwt", () => jwt.verify(token, JWT_SECRET));
     } catch (jwtError) {
       return NextResponse.json({ error: "Invalid token" }, { status: 401 });
     }
 
-    const user = await mongoUserRepo.getUserById(decoded.userId);
+    const searchParams = request.nextUrl.searchParams;
+    const cursor = searchParams.get("cursor");
+    const after = decodeCursor(cursor);
 
-    if (!user) {
-      return NextResponse.json({ error: "User not found" }, { status: 401 });
+    if (cursor && !after) {
+      return NextResponse.json({ error: "Invalid cursor" }, { status: 400 });
     }
 
-    console.log("MongoDB: Getting houses for user:", user.email);
+    const limit = Math.min(
+      MAX_PAGE_SIZE,
+      Math.max(1, parseInt(searchParams.get("limit"), 10) || DEFAULT_PAGE_SIZE),
+    );
+
+    // Membership comes from the token's user id, so no user read is needed
+    const result = await measure("mongo", () =>
+      mongoHouseRepo.getHousesForUser(decoded.userId, {
+        after,
+        limit,
+        withTotal: !after,
+      }),
+    );
+
+    if (!result) {
+      return NextResponse.json(
+        { error: "Failed to load houses" },
+        { status: 500 },
+      );
+    }
 
-    // For now, return empty array as houses aren't implemented yet
-    // In the future, this would query the houses the user belongs to
     return NextResponse.json({
-      houses: [],
-      total: 0,
+      houses: result.houses,
+      total: result.total,
+      nextCursor: result.nextCursor,
+      hasMore: Boolean(result.nextCursor),
     });
   } catch (error) {
     console.error("MongoDB: Get user houses error:", error);
@@ -43,3 +69,5 @@ export async function GET(request) {
     );
   }
 }
+
+export const GET = withTiming("/api/users/me/houses", getMyHouses);
@@ -27,41 +27,43 @@ import { useRouter } from "next/navigation";
 export default function Dashboard() {
   const [user, setUser] = useState(null);
   const [houses, setHouses] = useState([]);
+  const [houseCount, setHouseCount] = useState(0);
+  const [roommates, setRoommates] = useState([]);
+  const [unread, setUnread] = useState(0);
   const [loading, setLoading] = useState(true);
   const [messages, setMessages] = useState([]);
   const [newMessage, setNewMessage] = useState("");
   const router = useRouter();
 
   useEffect(() => {
-    // Load actual user data from authentication API
-    const loadUserData = async () => {
+    // One request loads the user and every dashboard panel
+    const loadDashboard = async () => {
       try {
-        const response = await fetch("/api/auth/me", {
+        const response = await fetch("/api/dashboard", {
           credentials: "include",
         });
 
-        if (response.ok) {
-          const userData = await response.json();
-          console.log("Dashboard: Loaded user data:", userData);
-          setUser(userData);
-        } else {
-          console.error("Dashboard: Failed to load user data");
+        if (!response.ok) {
+          console.error("Dashboard: Failed to load dashboard");
           // Redirect to login if not authenticated
           router.push("/");
           return;
         }
+
+        const data = await response.json();
+        setUser(data.user);
+        setHouses(data.houses?.items || []);
+        setHouseCount(data.houses?.total ?? data.houses?.items?.length ?? 0);
+        setRoommates(data.roommates || []);
+        setUnread(data.unread || 0);
+        setLoading(false);
       } catch (error) {
-        console.error("Dashboard: Error loading user data:", error);
+        console.error("Dashboard: Error loading dashboard:", error);
         router.push("/");
-        return;
       }
-
-      // Load houses (keeping as empty for now)
-      setHouses([]);
-      setLoading(false);
     };
 
-    loadUserData();
+    loadDashboard();
 
     // Load mock chat messages
     setMessages([
@@ -110,20 +112,6 @@ export default function Dashboard() {
     setNewMessage("");
   };
 
-  useEffect(() => {
-    // Load user data without API calls to avoid 502 issues
-    // In a real app, this would come from server-side rendering or a working API
-    setUser({
-      id: "user-id",
-      email: "user@example.com",
-      displayName: "Creator User",
-      platforms: ["TikTok", "YouTube"],
-      niches: ["Gaming"],
-    });
-    setHouses([]); // Start with empty houses
-    setLoading(false);
-  }, []);
-
   const handleLogout = async () => {
     try {
       // Create a form to submit logout
@@ -222,7 +210,7 @@ export default function Dashboard() {
                     My Houses
                   </h3>
                   <p className="text-2xl font-bold text-purple-600">
-                    {houses.length}
+                    {houseCount}
                   </p>
                 </div>
               </div>
@@ -251,7 +239,9 @@ export default function Dashboard() {
                   <h3 className="text-lg font-semibold text-gray-900">
                     Messages
                   </h3>
-                  <p className="text-2xl font-bold text-green-600">0</p>
+                  <p className="text-2xl font-bold text-green-600">
+                    {unread}
+                  </p>
                 </div>
               </div>
             </CardContent>
@@ -344,10 +334,36 @@ export default function Dashboard() {
                 </CardDescription>
               </CardHeader>
               <CardContent>
-                <p className="text-sm text-gray-600 mb-4">
-                  Discover creators in your area who are looking for roommates
-                  and collaboration opportunities.
-                </p>
+                {roommates.length === 0 ? (
+                  <p className="text-sm text-gray-600 mb-4">
+                    Discover creators in your area who are looking for
+                    roommates and collaboration opportunities.
+                  </p>
+                ) : (
+                  <div className="space-y-2 mb-4">
+                    {roommates.map((roommate) => (
+                      <div
+                        key={roommate.id}
+                        className="flex justify-between items-center text-sm"
+                      >
+                        <span className="font-medium text-gray-900">
+                          {roommate.displayName}
+                          {roommate.city && (
+                            <span className="text-gray-500">
+                              {" "}
+                              · {roommate.city}
+                            </span>
+                          )}
+                        </span>
+                        {roommate.matchScore !== null && (
+                          <Badge variant="secondary">
+                            {roommate.matchScore}% match
+                          </Badge>
+                        )}
+                      </div>
+                    ))}
+                  </div>
+                )}
                 <Button asChild className="w-full">
                   <Link href="/roommates">Browse Roommates</Link>
                 </Button>
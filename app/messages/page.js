@@ -1,6 +1,6 @@
 "use client";
 
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { Button } from "@/components/ui/button";
 import {
   Card,
@@ -17,6 +17,55 @@ import { ArrowLeft, Send, Search, MessageCircle } from "lucide-react";
 import Link from "next/link";
 import { useRouter } from "next/navigation";
 
+function formatTime(iso) {
+  return new Date(iso).toLocaleTimeString([], {
+    hour: "2-digit",
+    minute: "2-digit",
+  });
+}
+
+function formatRelative(iso) {
+  if (!iso) return "";
+
+  const minutes = Math.floor((Date.now() - new Date(iso).getTime()) / 60000);
+  if (minutes < 1) return "Just now";
+  if (minutes < 60) return `${minutes} min ago`;
+  if (minutes < 24 * 60) return `${Math.floor(minutes / 60)} hour ago`;
+  return new Date(iso).toLocaleDateString();
+}
+
+function toConversationView(conversation) {
+  return {
+    id: conversation.id,
+    user: {
+      ...conversation.user,
+      displayName: conversation.user?.displayName || "Unknown creator",
+      platforms: conversation.user?.platforms || [],
+    },
+    lastMessage: conversation.lastMessage?.body || "No messages yet",
+    updatedAt: conversation.updatedAt,
+    timestamp: formatRelative(conversation.lastMessage?.createdAt),
+    unread: conversation.unreadCount > 0,
+  };
+}
+
+function toMessageView(message, userId) {
+  return {
+    id: message.id,
+    senderId: message.senderId,
+    senderName: message.senderName,
+    message: message.body,
+    timestamp: formatTime(message.createdAt),
+    isOwn: message.senderId === userId,
+  };
+}
+
+function appendMessage(messages, message) {
+  // A sent message can arrive from both the POST response and the stream
+  if (messages.some((m) => m.id === message.id)) return messages;
+  return [...messages, message];
+}
+
 export default function MessagesPage() {
   const [user, setUser] = useState(null);
   const [conversations, setConversations] = useState([]);
@@ -24,112 +73,153 @@ export default function MessagesPage() {
   const [messages, setMessages] = useState([]);
   const [newMessage, setNewMessage] = useState("");
   const [loading, setLoading] = useState(true);
+  const selectedIdRef = useRef(null);
   const router = useRouter();
 
   useEffect(() => {
-    // Set mock user data
-    setUser({
-      id: "user-123",
-      displayName: "Creator User",
-      email: "user@example.com",
-    });
+    const loadData = async () => {
+      try {
+        const [meResponse, conversationsResponse] = await Promise.all([
+          // Only the id is needed, to tell our messages from theirs
+          fetch("/api/auth/me?fields=id", { credentials: "include" }),
+          fetch("/api/messages/conversations", { credentials: "include" }),
+        ]);
 
-    // Set mock conversations
-    setConversations([
-      {
-        id: "conv-1",
-        user: {
-          id: "user-1",
-          displayName: "Gaming Creator",
-          username: "gamingcreator",
-          platforms: ["Twitch", "YouTube"],
-        },
-        lastMessage: "Hey! Interested in that collab we discussed?",
-        timestamp: "2 min ago",
-        unread: true,
-      },
-      {
-        id: "conv-2",
-        user: {
-          id: "user-2",
-          displayName: "Beauty Influencer",
-          username: "beautyinfluencer",
-          platforms: ["TikTok", "Instagram"],
-        },
-        lastMessage: "Thanks for the engagement on my latest post!",
-        timestamp: "1 hour ago",
-        unread: false,
-      },
-      {
-        id: "conv-3",
-        user: {
-          id: "user-3",
-          displayName: "Tech Reviewer",
-          username: "techreviewer",
-          platforms: ["YouTube"],
-        },
-        lastMessage: "When are you free for that tech review collab?",
-        timestamp: "Yesterday",
-        unread: false,
-      },
-    ]);
+        if (!meResponse.ok) {
+          // Redirect to login if not authenticated
+          router.push("/");
+          return;
+        }
+
+        setUser(await meResponse.json());
+
+        if (conversationsResponse.ok) {
+          const data = await conversationsResponse.json();
+          setConversations(data.conversations.map(toConversationView));
+        } else {
+          console.error("Messages: Failed to load conversations");
+        }
+      } catch (error) {
+        console.error("Messages: Error loading data:", error);
+      } finally {
+        setLoading(false);
+      }
+    };
 
-    setLoading(false);
-  }, []);
+    loadData();
+  }, [router]);
 
-  const handleSelectConversation = (conversation) => {
+  useEffect(() => {
+    if (!user) return;
+
+    // EventSource reconnects by itself if the stream drops
+    const events = new EventSource("/api/messages/stream");
+
+    events.addEventListener("message", (event) => {
+      const message = JSON.parse(event.data);
+      const isOpen = message.conversationId === selectedIdRef.current;
+
+      if (isOpen) {
+        setMessages((current) =>
+          appendMessage(current, toMessageView(message, user.id)),
+        );
+        if (message.senderId !== user.id) {
+          fetch(`/api/messages/conversations/${message.conversationId}/read`, {
+            method: "POST",
+            credentials: "include",
+          });
+        }
+      }
+
+      setConversations((current) => {
+        const existing = current.find((c) => c.id === message.conversationId);
+        if (!existing) return current;
+
+        const updated = {
+          ...existing,
+          lastMessage: message.body,
+          updatedAt: message.createdAt,
+          timestamp: formatRelative(message.createdAt),
+          unread: existing.unread || (!isOpen && message.senderId !== user.id),
+        };
+        return [updated, ...current.filter((c) => c.id !== updated.id)];
+      });
+    });
+
+    return () => events.close();
+  }, [user]);
+
+  const handleSelectConversation = async (conversation) => {
     setSelectedConversation(conversation);
+    selectedIdRef.current = conversation.id;
+    setMessages([]);
+
+    setConversations((current) =>
+      current.map((c) =>
+        c.id === conversation.id ? { ...c, unread: false } : c,
+      ),
+    );
+
+    try {
+      const [response] = await Promise.all([
+        fetch(`/api/messages/conversations/${conversation.id}`, {
+          credentials: "include",
+        }),
+        fetch(`/api/messages/conversations/${conversation.id}/read`, {
+          method: "POST",
+          credentials: "include",
+        }),
+      ]);
+
+      if (!response.ok) {
+        console.error("Messages: Failed to load messages");
+        return;
+      }
 
-    // Load mock messages for selected conversation
-    const mockMessages = [
-      {
-        id: 1,
-        senderId: conversation.user.id,
-        senderName: conversation.user.displayName,
-        message: "Hey there! I saw your content and really love your style.",
-        timestamp: "10:30 AM",
-        isOwn: false,
-      },
-      {
-        id: 2,
-        senderId: "user-123",
-        senderName: "Creator User",
-        message:
-          "Thank you so much! I really appreciate that. Your gaming content is amazing too!",
-        timestamp: "10:45 AM",
-        isOwn: true,
-      },
-      {
-        id: 3,
-        senderId: conversation.user.id,
-        senderName: conversation.user.displayName,
-        message: conversation.lastMessage,
-        timestamp: "11:15 AM",
-        isOwn: false,
-      },
-    ];
-
-    setMessages(mockMessages);
+      const data = await response.json();
+      if (selectedIdRef.current !== conversation.id) return;
+
+      // The API pages newest first; the chat reads oldest first
+      setMessages(
+        data.messages.reverse().map((m) => toMessageView(m, user.id)),
+      );
+    } catch (error) {
+      console.error("Messages: Error loading messages:", error);
+    }
   };
 
-  const handleSendMessage = (e) => {
+  const handleSendMessage = async (e) => {
     e.preventDefault();
     if (!newMessage.trim() || !selectedConversation) return;
 
-    const message = {
-      id: messages.length + 1,
-      senderId: "user-123",
-      senderName: "Creator User",
-      message: newMessage,
-      timestamp: new Date().toLocaleTimeString([], {
-        hour: "2-digit",
-        minute: "2-digit",
-      }),
-      isOwn: true,
-    };
-
-    setMessages([...messages, message]);
+    const body = newMessage;
     setNewMessage("");
+
+    try {
+      const response = await fetch(
+        `/api/messages/conversations/${selectedConversation.id}`,
+        {
+          method: "POST",
+          headers: { "Content-Type": "application/json" },
+          credentials: "include",
+          body: JSON.stringify({ body }),
+        },
+      );
+
+      if (!response.ok) {
+        console.error("Messages: Failed to send message");
+        setNewMessage(body);
+        return;
+      }
+
+      const data = await response.json();
+      setMessages((current) =>
+        appendMessage(current, toMessageView(data.message, user.id)),
+      );
+    } catch (error) {
+      console.error("Messages: Error sending message:", error);
+      setNewMessage(body);
+    }
   };
 
   if (loading) {
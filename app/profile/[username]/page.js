@@ -35,7 +35,7 @@ export default function ProfilePage({ params }) {
     try {
       const token = localStorage.getItem("token");
       if (token) {
-        const response = await fetch("/api/auth/me", {
+        const response = await fetch("/api/auth/me?fields=username", {
           headers: { Authorization: `Bearer ${token}` },
         });
         if (response.ok) {
@@ -73,34 +73,6 @@ export default function RoommatesPage() {
       city: "Los Angeles, CA",
     });
 
-    // Set mock roommate data
-    setRoommates([
-      {
-        id: "roommate-1",
-        displayName: "Gaming Creator",
-        username: "gamingcreator",
-        platforms: ["Twitch", "YouTube"],
-        niches: ["Gaming"],
-        city: "Los Angeles, CA",
-        bio: "Looking for gaming collaboration partners!",
-        experience: "Intermediate",
-        lookingFor: "Content collaboration",
-        budget: "$800-1200",
-      },
-      {
-        id: "roommate-2",
-        displayName: "Beauty Influencer",
-        username: "beautyinfluencer",
-        platforms: ["TikTok", "Instagram"],
-        niches: ["Beauty", "Lifestyle"],
-        city: "Los Angeles, CA",
-        bio: "Beauty content creator seeking roommate for collabs",
-        experience: "Advanced",
-        lookingFor: "Roommate + collaboration",
-        budget: "$1000-1500",
-      },
-    ]);
-
     setLoadingAuth(false);
   }, []);
 
@@ -126,7 +98,7 @@ export default function RoommatesPage() {
 
       if (response.ok) {
         const data = await response.json();
-        setRoommates(data.items || []);
+        setRoommates(data.roommates || []);
         setPagination((prev) => ({ ...prev, total: data.total || 0 }));
       } else {
         toast({
@@ -399,6 +371,11 @@ export default function RoommatesPage() {
                             roommate.username ||
                             "Anonymous"}
                         </h3>
+                        {roommate.matchScore != null && (
+                          <p className="text-sm text-purple-600">
+                            {roommate.matchScore}% match
+                          </p>
+                        )}
                       </div>
                     </div>
                   </CardHeader>
@@ -9,18 +9,1080 @@ CRITICAL AREAS TO TEST:
 3. API Endpoints with MongoDB: /api/auth/me, /api/users/{username}, /api/settings/*, /api/upload/avatar, /api/roommates
 4. Settings & Profile Management: privacy settings (roommateOptIn) default to true and can be toggled, profile data updates persist
 5. Data Persistence: create test account → verify in MongoDB, update user settings → verify changes persist, data survives server restarts
+
+USAGE:
+  python backend_test.py                                   # functional checks against NEXT_PUBLIC_BASE_URL
+  python backend_test.py load --users 50 --duration 120    # load test a local `next start` (needs aiohttp)
+  python backend_test.py load --output base.json           # ...and record a JSON result file
+  python backend_test.py compare base.json new.json --threshold 10   # exit 1 on regression
+  python backend_test.py auth-bench --users 20 --output auth.json   # login storm vs. non-auth latency
+  python backend_test.py house-bench --users 20 --houses-per-user 100 # 2000 houses, joins and paging
+  python backend_test.py message-bench --users 200 --duration 60    # 100 open conversations, SSE fan-out
+  python backend_test.py seed --users 100000                        # synthetic users straight into MongoDB
+  python backend_test.py scale-bench --output scale-100k.json        # login, roommates, leaderboard, profiles vs. size
+  python backend_test.py seed --teardown                            # remove every seeded user
+  python backend_test.py soak --users 100 --duration 14400 --ramp 600 # 4h mixed workload, RSS and lag trends
+  python backend_test.py export --output users.ndjson             # stream users out, throughput and server RSS
+  python backend_test.py import users.ndjson --replace             # stream them back in with bulk writes
 """
 
+import argparse
+import asyncio
+import math
 import requests
 import json
 import time
 import os
+import random
+import subprocess
+import sys
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
 from io import BytesIO
 
+try:
+    import aiohttp
+except ImportError:  # only needed for load mode
+    aiohttp = None
+
+try:
+    import pymongo
+except ImportError:  # only needed to record dataset size and to seed
+    pymongo = None
+
+try:
+    import bcrypt
+except ImportError:  # only needed to seed
+    bcrypt = None
+
 # Get base URL from environment
 BASE_URL = os.getenv('NEXT_PUBLIC_BASE_URL', 'https://api-dynamic-fix.preview.emergentagent.com')
 API_BASE = f"{BASE_URL}/api"
 
+# Load mode targets a local `next start` backed by a local mongod by default
+LOAD_BASE_URL = os.getenv('LOAD_BASE_URL', 'http://localhost:3000')
+
+RESULT_SCHEMA_VERSION = 1
+
+# Upper bounds (ms) of the latency histogram buckets stored in result files
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lower, upper = math.floor(k), math.ceil(k)
+    if lower == upper:
+        return ordered[int(k)]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+
+def latency_histogram(values):
+    """Bucket latencies into LATENCY_BUCKETS_MS; the final bucket (None) is overflow"""
+    counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    for value in values:
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    return [[bound, count] for bound, count in zip(LATENCY_BUCKETS_MS + [None], counts)]
+
+
+class LoadStats:
+    """Per-endpoint latency samples and error counts for a load run"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.started = None
+        self.finished = None
+
+    def record(self, endpoint, elapsed_ms, ok):
+        self.latencies[endpoint].append(elapsed_ms)
+        if not ok:
+            self.errors[endpoint] += 1
+
+    def summary(self):
+        duration = max((self.finished or time.perf_counter()) - self.started, 1e-9)
+        endpoints = {}
+        for name, values in sorted(self.latencies.items()):
+            count = len(values)
+            errors = self.errors[name]
+            endpoints[name] = {
+                "count": count,
+                "errors": errors,
+                "error_rate": errors / count if count else 0.0,
+                "throughput": count / duration,
+                "mean_ms": sum(values) / count if count else 0.0,
+                "p50_ms": percentile(values, 50),
+                "p75_ms": percentile(values, 75),
+                "p90_ms": percentile(values, 90),
+                "p95_ms": percentile(values, 95),
+                "p99_ms": percentile(values, 99),
+                "max_ms": max(values) if values else 0.0,
+                "histogram": latency_histogram(values),
+            }
+        total = sum(e["count"] for e in endpoints.values())
+        total_errors = sum(e["errors"] for e in endpoints.values())
+        return {
+            "duration_s": duration,
+            "total_requests": total,
+            "throughput": total / duration,
+            "error_rate": total_errors / total if total else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+class RatePacer:
+    """Spaces request starts across all virtual users to hold a target request rate"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_slot = time.perf_counter()
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self.lock:
+            now = time.perf_counter()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class VirtualUser:
+    """One simulated creator with its own cookie jar running the auth → browse → settings flow"""
+
+    def __init__(self, api_base, stats, pacer):
+        tag = uuid.uuid4().hex[:10]
+        # Each virtual user is its own client. Sent straight to a server with TRUSTED_PROXY_HOPS=1, this
+        # single X-Forwarded-For entry is the one the server trusts, so per-IP auth throttling buckets
+        # virtual users separately. Without that setting the server skips per-IP limits.
+        self.client_ip = "10.{}.{}.{}".format(*uuid.uuid4().bytes[:3])
+        self.api_base = api_base
+        self.stats = stats
+        self.pacer = pacer
+        self.user_data = {
+            "email": f"loaduser{tag}@example.com",
+            "password": "loadtestpassword123",
+            "displayName": f"Load User {tag}",
+            "platforms": ["Twitch", "YouTube"],
+            "niches": ["Gaming"],
+            "games": ["Minecraft"],
+            "city": "Los Angeles",
+            "timeZone": "America/Los_Angeles",
+            "bio": "Load test user",
+        }
+
+    async def fetch(self, session, endpoint, method, path, ok_statuses=None, throttled_as=None, **kwargs):
+        """Timed request returning (ok, status, parsed JSON body or None). With `throttled_as`, 429/503
+        answers are recorded under that endpoint name instead of as errors"""
+        await self.pacer.wait()
+        start = time.perf_counter()
+        status, payload = None, None
+        try:
+            async with session.request(method, f"{self.api_base}{path}", **kwargs) as response:
+                body = await response.read()
+                status = response.status
+                if response.content_type == "application/json":
+                    payload = json.loads(body)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            pass
+        ok = status is not None and (status in ok_statuses if ok_statuses else status < 400)
+        if throttled_as and status in (429, 503):
+            endpoint, ok = throttled_as, True
+        self.stats.record(endpoint, (time.perf_counter() - start) * 1000, ok)
+        return ok, status, payload
+
+    async def request(self, session, endpoint, method, path, **kwargs):
+        ok, _, _ = await self.fetch(session, endpoint, method, path, **kwargs)
+        return ok
+
+    def open_session(self, timeout, connections=None):
+        """Cookie-keeping session; `connections` caps its keep-alive pool (aiohttp's default is 100)"""
+        connector = aiohttp.TCPConnector(limit=connections) if connections else None
+        return aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True),
+                                     timeout=aiohttp.ClientTimeout(total=timeout),
+                                     headers={"X-Forwarded-For": self.client_ip}, connector=connector)
+
+    async def signup(self, session):
+        return await self.request(session, "POST /auth/signup", "POST", "/auth/signup", json=self.user_data)
+
+    async def login(self, session):
+        # Repeated logins for one account run into the per-email bucket; those 429s are expected
+        return await self.request(session, "POST /auth/login", "POST", "/auth/login", json={
+            "email": self.user_data["email"],
+            "password": self.user_data["password"],
+        }, throttled_as="POST /auth/login (throttled)")
+
+    async def run(self, deadline, timeout):
+        async with self.open_session(timeout) as session:
+            if not await self.signup(session):
+                return
+
+            opt_in = True
+            while time.perf_counter() < deadline:
+                await self.login(session)
+                await self.request(session, "GET /auth/me", "GET", "/auth/me")
+                await self.request(session, "GET /roommates", "GET", "/roommates")
+                opt_in = not opt_in
+                await self.request(session, "PUT /settings/roommate-search", "PUT", "/settings/roommate-search",
+                                   json={"appearInRoommateSearch": opt_in})
+                await self.request(session, "PUT /settings", "PUT", "/settings",
+                                   json={"bio": f"Load test user updated at {time.time():.0f}"})
+
+
+async def run_load(api_base, users, duration, rate, timeout):
+    """Run `users` virtual users concurrently for `duration` seconds and return the stats summary"""
+    stats = LoadStats()
+    pacer = RatePacer(rate)
+    stats.started = time.perf_counter()
+    deadline = stats.started + duration
+    virtual_users = [VirtualUser(api_base, stats, pacer) for _ in range(users)]
+    await asyncio.gather(*(vu.run(deadline, timeout) for vu in virtual_users))
+    stats.finished = time.perf_counter()
+    return stats.summary()
+
+
+async def probe_loop(api_base, stats, deadline, interval, timeout):
+    """Time a cheap unauthenticated request at a fixed interval to see how other routes fare"""
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                async with session.get(f"{api_base}/health") as response:
+                    await response.read()
+                    ok = response.status < 400
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                ok = False
+            stats.record("GET /health (probe)", (time.perf_counter() - start) * 1000, ok)
+            await asyncio.sleep(interval)
+
+
+async def run_auth_bench(api_base, users, duration, probe_interval, timeout):
+    """Hammer /auth/login from `users` accounts while probing a non-auth route; returns the stats summary"""
+    setup_stats = LoadStats()
+    pacer = RatePacer(0)
+    virtual_users = [VirtualUser(api_base, setup_stats, pacer) for _ in range(users)]
+    sessions = [vu.open_session(timeout) for vu in virtual_users]
+
+    try:
+        # Accounts are created up front so only logins land in the measured window
+        signed_up = await asyncio.gather(*(vu.signup(s) for vu, s in zip(virtual_users, sessions)))
+        active = [(vu, s) for vu, s, ok in zip(virtual_users, sessions, signed_up) if ok]
+
+        stats = LoadStats()
+        for vu, _ in active:
+            vu.stats = stats
+
+        async def login_loop(vu, session):
+            while time.perf_counter() < deadline:
+                await vu.login(session)
+
+        stats.started = time.perf_counter()
+        deadline = stats.started + duration
+        await asyncio.gather(probe_loop(api_base, stats, deadline, probe_interval, timeout),
+                             *(login_loop(vu, s) for vu, s in active))
+        stats.finished = time.perf_counter()
+    finally:
+        await asyncio.gather(*(s.close() for s in sessions))
+
+    return stats.summary()
+
+
+async def run_house_bench(api_base, users, houses_per_user, race_houses, page_size, timeout):
+    """Seed users × houses_per_user houses, have one hub user join all of them, race joins on
+    nearly-full houses, then page through house lists; returns (summary, findings)"""
+    setup_stats = LoadStats()
+    pacer = RatePacer(0)
+    creators = [VirtualUser(api_base, setup_stats, pacer) for _ in range(users)]
+    hub = VirtualUser(api_base, setup_stats, pacer)
+    everyone = creators + [hub]
+    sessions = {vu: vu.open_session(timeout) for vu in everyone}
+    semaphore = asyncio.Semaphore(50)
+    findings = {}
+
+    async def limited(coro):
+        async with semaphore:
+            return await coro
+
+    try:
+        signed_up = await asyncio.gather(*(vu.signup(sessions[vu]) for vu in everyone))
+        if not all(signed_up):
+            print("❌ Signup failed for some benchmark users")
+            return None, findings
+
+        stats = LoadStats()
+        for vu in everyone:
+            vu.stats = stats
+        stats.started = time.perf_counter()
+
+        # Phase 1: every creator creates houses with room for exactly two more members
+        async def create(vu, n):
+            _, _, payload = await vu.fetch(sessions[vu], "POST /houses/create", "POST", "/houses/create", json={
+                "name": f"Bench House {n}", "niches": ["Gaming"], "maxMembers": 3,
+            })
+            return (payload or {}).get("house", {}).get("id")
+
+        house_ids = [h for h in await asyncio.gather(*(
+            limited(create(vu, n)) for vu in creators for n in range(houses_per_user))) if h]
+        findings["houses_created"] = len(house_ids)
+
+        # Phase 2: the hub joins every house, leaving one slot in each
+        await asyncio.gather(*(limited(hub.fetch(sessions[hub], "POST /houses/[id]/join", "POST",
+                                                 f"/houses/{h}/join")) for h in house_ids))
+
+        # Phase 3: all creators race for the last slot of a sample of houses; exactly one may win
+        race_sample = house_ids[:race_houses]
+        over_capacity = 0
+        for house_id in race_sample:
+            results = await asyncio.gather(*(
+                vu.fetch(sessions[vu], "POST /houses/[id]/join (race)", "POST", f"/houses/{house_id}/join",
+                         ok_statuses={200, 409}) for vu in creators))
+            winners = [payload for _, status, payload in results if status == 200]
+            if len(winners) > 1 or any(w["house"]["memberCount"] > 3 for w in winners):
+                over_capacity += 1
+        findings["race_houses"] = len(race_sample)
+        findings["race_over_capacity"] = over_capacity
+
+        # Phase 4: page through the hub's (large) and one creator's (small) house lists
+        async def page_through(vu, label):
+            cursor, pages, seen = None, 0, 0
+            while True:
+                path = f"/users/me/houses?limit={page_size}" + (f"&cursor={cursor}" if cursor else "")
+                ok, _, payload = await vu.fetch(sessions[vu], f"GET /users/me/houses ({label})", "GET", path)
+                if not ok or not payload:
+                    break
+                pages += 1
+                seen += len(payload.get("houses", []))
+                cursor = payload.get("nextCursor")
+                if not cursor:
+                    break
+            return seen
+
+        findings["hub_houses_listed"] = await page_through(hub, "hub")
+        findings["creator_houses_listed"] = await page_through(creators[0], "creator")
+        stats.finished = time.perf_counter()
+    finally:
+        await asyncio.gather(*(s.close() for s in sessions.values()))
+
+    return stats.summary(), findings
+
+
+async def read_event_stream(session, url, on_event, ready):
+    """Consume a Server-Sent Events response, calling on_event(event, data) per event until cancelled"""
+    try:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=None)) as response:
+            if response.status != 200:
+                return
+            event, data = None, []
+            async for raw in response.content:
+                line = raw.decode().rstrip("\r\n")
+                if not line:
+                    if event == "ready":
+                        ready.set()
+                    elif event:
+                        on_event(event, "\n".join(data))
+                    event, data = None, []
+                elif line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:"):
+                    data.append(line[5:].lstrip())
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        pass
+    finally:
+        ready.set()
+
+
+async def run_message_bench(api_base, users, duration, send_interval, grace, timeout):
+    """Pair up users, hold an SSE stream open for each, and have every pair exchange messages;
+    measures send latency and send → push delivery latency. Returns (summary, findings)"""
+    setup_stats = LoadStats()
+    pacer = RatePacer(0)
+    virtual_users = [VirtualUser(api_base, setup_stats, pacer) for _ in range(users - users % 2)]
+    sessions = {vu: vu.open_session(timeout) for vu in virtual_users}
+    streams = []
+    findings = {"streams_opened": 0, "sent": 0, "delivered": 0, "lost": 0}
+    pending = {}
+
+    try:
+        signups = await asyncio.gather(*(vu.fetch(sessions[vu], "POST /auth/signup", "POST", "/auth/signup",
+                                                  json=vu.user_data) for vu in virtual_users))
+        if not all(ok for ok, _, _ in signups):
+            print("❌ Signup failed for some benchmark users")
+            return None, findings
+        user_ids = {vu: payload["user"]["id"] for vu, (_, _, payload) in zip(virtual_users, signups)}
+
+        stats = LoadStats()
+        for vu in virtual_users:
+            vu.stats = stats
+
+        def on_event(receiver):
+            def handle(event, data):
+                if event != "message":
+                    return
+                message = json.loads(data)
+                sent = pending.get(message["body"])
+                # Only the other participant's copy counts; the sender is subscribed too
+                if sent and message["senderId"] != user_ids[receiver]:
+                    del pending[message["body"]]
+                    stats.record("SSE delivery", (time.perf_counter() - sent) * 1000, True)
+                    findings["delivered"] += 1
+            return handle
+
+        readies = []
+        for vu in virtual_users:
+            ready = asyncio.Event()
+            readies.append(ready)
+            streams.append(asyncio.create_task(read_event_stream(
+                sessions[vu], f"{api_base}/messages/stream", on_event(vu), ready)))
+        await asyncio.gather(*(ready.wait() for ready in readies))
+        findings["streams_opened"] = sum(not task.done() for task in streams)
+
+        pairs = list(zip(virtual_users[::2], virtual_users[1::2]))
+        conversations = await asyncio.gather(*(
+            a.fetch(sessions[a], "POST /messages/conversations", "POST", "/messages/conversations",
+                    json={"participantId": user_ids[b]}) for a, b in pairs))
+        conversation_ids = [(payload or {}).get("conversation", {}).get("id") for _, _, payload in conversations]
+
+        stats.started = time.perf_counter()
+        deadline = stats.started + duration
+
+        async def chat(vu, conversation_id):
+            while time.perf_counter() < deadline:
+                body = f"bench {uuid.uuid4().hex}"
+                pending[body] = time.perf_counter()
+                findings["sent"] += 1
+                ok = await vu.request(sessions[vu], "POST /messages/conversations/[id]", "POST",
+                                      f"/messages/conversations/{conversation_id}", json={"body": body})
+                if not ok:
+                    pending.pop(body, None)
+                    findings["sent"] -= 1
+                await asyncio.sleep(send_interval)
+
+        await asyncio.gather(*(chat(vu, cid) for (a, b), cid in zip(pairs, conversation_ids) if cid
+                               for vu in (a, b)))
+
+        # Give in-flight pushes a moment to land before counting losses
+        wait_until = time.perf_counter() + grace
+        while pending and time.perf_counter() < wait_until:
+            await asyncio.sleep(0.05)
+        findings["lost"] = len(pending)
+
+        # History paging for one busy conversation
+        if conversation_ids and conversation_ids[0]:
+            a = pairs[0][0]
+            cursor, listed = None, 0
+            while True:
+                path = f"/messages/conversations/{conversation_ids[0]}?limit=50" + (
+                    f"&cursor={cursor}" if cursor else "")
+                ok, _, payload = await a.fetch(sessions[a], "GET /messages/conversations/[id]", "GET", path)
+                if not ok or not payload:
+                    break
+                listed += len(payload.get("messages", []))
+                cursor = payload.get("nextCursor")
+                if not cursor:
+                    break
+            findings["history_listed"] = listed
+        stats.finished = time.perf_counter()
+    finally:
+        for task in streams:
+            task.cancel()
+        await asyncio.gather(*streams, return_exceptions=True)
+        await asyncio.gather(*(s.close() for s in sessions.values()))
+
+    return stats.summary(), findings
+
+
+# Synthetic users for scale runs. Picks are weighted so a few platforms, niches and cities dominate,
+# as they do in real signups; time zones follow the city.
+SEED_PASSWORD = "seedpassword123"
+SEED_EMAIL_DOMAIN = "seed.streamhouse.test"
+SEED_PLATFORMS = [("Twitch", 30), ("YouTube", 28), ("TikTok", 25), ("Instagram", 12), ("Kick", 8),
+                  ("Discord", 8), ("Twitter/X", 6), ("Facebook Gaming", 3), ("Rumble", 2)]
+SEED_NICHES = [("Gaming", 40), ("Just Chatting", 15), ("Lifestyle", 12), ("IRL Streaming", 10), ("Music", 8),
+               ("Comedy", 8), ("Tech", 6), ("Beauty", 6), ("Fitness", 5), ("Art", 4), ("Cooking", 3),
+               ("Fashion", 3), ("Travel", 3), ("Education", 2), ("ASMR", 2), ("Reaction", 2)]
+SEED_GAMES = [("Fortnite", 20), ("Valorant", 16), ("Minecraft", 15), ("League of Legends", 14),
+              ("Call of Duty", 12), ("Apex Legends", 10), ("Counter-Strike 2", 8), ("Grand Theft Auto V", 8),
+              ("Overwatch 2", 6), ("Rocket League", 5), ("Dota 2", 4), ("World of Warcraft", 4),
+              ("Among Us", 2), ("Fall Guys", 2)]
+SEED_CITIES = [("Los Angeles, CA", "America/Los_Angeles", 20), ("New York, NY", "America/New_York", 16),
+               ("Austin, TX", "America/Chicago", 8), ("Chicago, IL", "America/Chicago", 7),
+               ("Seattle, WA", "America/Los_Angeles", 6), ("Miami, FL", "America/New_York", 6),
+               ("Denver, CO", "America/Denver", 4), ("Atlanta, GA", "America/New_York", 5),
+               ("Toronto, ON", "America/Toronto", 6), ("London, UK", "Europe/London", 8),
+               ("Paris, FR", "Europe/Paris", 3), ("Berlin, DE", "Europe/Berlin", 4),
+               ("Tokyo, JP", "Asia/Tokyo", 4), ("Shanghai, CN", "Asia/Shanghai", 1),
+               ("Sydney, AU", "Australia/Sydney", 3)]
+
+
+def weighted_sample(rng, choices, count):
+    """Up to `count` distinct values drawn by weight"""
+    values, weights = zip(*choices)
+    picked = []
+    while len(picked) < min(count, len(values)):
+        value = rng.choices(values, weights)[0]
+        if value not in picked:
+            picked.append(value)
+    return picked
+
+
+def iso_timestamp(dt):
+    """Same format as JavaScript's toISOString(), which the app stores"""
+    return dt.strftime("%Y-%m-%dT%H:%M:%S.") + f"{dt.microsecond // 1000:03d}Z"
+
+
+def synthetic_user(rng, run, index, password_hash, opt_in_ratio, now):
+    """One user document shaped like insertUser() in lib/repositories/mongodb-user.js"""
+    niches = weighted_sample(rng, SEED_NICHES, rng.choice([1, 1, 2, 3]))
+    games = weighted_sample(rng, SEED_GAMES, rng.randint(1, 4)) if "Gaming" in niches else \
+        weighted_sample(rng, SEED_GAMES, rng.choice([0, 0, 1]))
+    city, time_zone = weighted_sample(rng, [((c, tz), w) for c, tz, w in SEED_CITIES], 1)[0]
+    # Spread signups over the last year so newest-first listings have a realistic spread
+    created = iso_timestamp(now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600)))
+    return {
+        "id": str(uuid.uuid4()),
+        "email": f"seed-{run}-{index}@{SEED_EMAIL_DOMAIN}",
+        "passwordHash": password_hash,
+        "displayName": f"Seed Creator {run} {index}",
+        "displayNameLower": f"seed creator {run} {index}",
+        "username": f"seed{run}{index}",
+        "platforms": weighted_sample(rng, SEED_PLATFORMS, rng.choice([1, 2, 2, 3])),
+        "niches": niches,
+        "games": games,
+        "city": city,
+        "timeZone": time_zone,
+        "hasSchedule": rng.random() < 0.4,
+        "schedule": {},
+        "bio": "Synthetic user for scale testing",
+        "createdAt": created,
+        "updatedAt": created,
+        "version": 1,
+        "avatarUrl": None,
+        "totalPoints": int(rng.expovariate(1 / 200)),
+        "roommateOptIn": rng.random() < opt_in_ratio,
+        "roommatePlatforms": [],
+        "roommateNiche": None,
+        "roommateTimezone": None,
+        "roommateRegion": None,
+        "roommateExperience": None,
+        "seedRun": run,
+    }
+
+
+def seed_users(mongo_url, db_name, count, batch_size, opt_in_ratio, random_seed):
+    """Insert `count` synthetic users in unordered batches; returns (run tag, inserted count)"""
+    rng = random.Random(random_seed)
+    # The seed fixes the generated profiles; the run tag keeps ids, emails and usernames unique
+    run = uuid.uuid4().hex[:6]
+    # Hashed once at the app's cost factor; bcryptjs reads $2a$ and $2b$ alike
+    password_hash = bcrypt.hashpw(SEED_PASSWORD.encode(), bcrypt.gensalt(12)).decode().replace("$2b$", "$2a$", 1)
+    now = datetime.now(timezone.utc)
+
+    client = pymongo.MongoClient(mongo_url)
+    inserted = 0
+    try:
+        users = client[db_name]["users"]
+        started = time.perf_counter()
+        for start in range(0, count, batch_size):
+            batch = [synthetic_user(rng, run, i, password_hash, opt_in_ratio, now)
+                     for i in range(start, min(start + batch_size, count))]
+            try:
+                inserted += len(users.insert_many(batch, ordered=False).inserted_ids)
+            except pymongo.errors.BulkWriteError as e:
+                inserted += e.details.get("nInserted", 0)
+                print(f"⚠️  {len(e.details.get('writeErrors', []))} inserts failed in batch at {start}")
+            if (start // batch_size) % 20 == 0 or start + batch_size >= count:
+                elapsed = time.perf_counter() - started
+                print(f"   {inserted}/{count} users ({inserted / max(elapsed, 1e-9):.0f}/s)")
+    finally:
+        client.close()
+    return run, inserted
+
+
+def teardown_seed(mongo_url, db_name, run=None):
+    """Delete seeded users, from one run or all of them; returns the number removed"""
+    client = pymongo.MongoClient(mongo_url)
+    try:
+        query = {"seedRun": run} if run else {"seedRun": {"$exists": True}}
+        return client[db_name]["users"].delete_many(query).deleted_count
+    finally:
+        client.close()
+
+
+def sample_seeded_users(mongo_url, db_name, size):
+    """Random seeded accounts (email, username) to log in as and look up"""
+    client = pymongo.MongoClient(mongo_url)
+    try:
+        return list(client[db_name]["users"].aggregate([
+            {"$match": {"seedRun": {"$exists": True}}},
+            {"$sample": {"size": size}},
+            {"$project": {"_id": 0, "email": 1, "username": 1}},
+        ]))
+    finally:
+        client.close()
+
+
+async def run_scale_bench(api_base, accounts, users, duration, profile_reads, timeout):
+    """Log `users` virtual users in as seeded accounts, then loop ranked roommate searches, leaderboard
+    pages with the caller's rank, and public profile reads; returns the stats summary"""
+    stats = LoadStats()
+    pacer = RatePacer(0)
+    virtual_users = [VirtualUser(api_base, stats, pacer) for _ in range(users)]
+    sessions = [vu.open_session(timeout) for vu in virtual_users]
+    rng = random.Random()
+
+    async def browse(vu, session):
+        account = rng.choice(accounts)
+        vu.user_data = {**vu.user_data, "email": account["email"], "password": SEED_PASSWORD}
+        if not await vu.login(session):
+            return
+        while time.perf_counter() < deadline:
+            await vu.request(session, "GET /roommates", "GET", "/roommates")
+            await vu.request(session, "GET /leaderboard", "GET", "/leaderboard")
+            for _ in range(profile_reads):
+                username = rng.choice(accounts)["username"]
+                await vu.request(session, "GET /users/[username]", "GET", f"/users/{username}")
+
+    try:
+        stats.started = time.perf_counter()
+        deadline = stats.started + duration
+        await asyncio.gather(*(browse(vu, s) for vu, s in zip(virtual_users, sessions)))
+        stats.finished = time.perf_counter()
+    finally:
+        await asyncio.gather(*(s.close() for s in sessions))
+
+    return stats.summary()
+
+
+# Default soak mix: relative weights of each flow a virtual user picks from between think times
+SOAK_MIX = {"signup": 1, "login": 2, "me": 20, "roommates": 20, "profile": 25, "settings": 8, "avatar": 2}
+
+# Same tiny PNG the functional avatar test uploads
+SOAK_AVATAR_PNG = (b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x02\x00\x00\x00'
+                   b'\x90wS\xde\x00\x00\x00\tpHYs\x00\x00\x0b\x13\x00\x00\x0b\x13\x01\x00\x9a\x9c\x18\x00'
+                   b'\x00\x00\nIDATx\x9cc\xf8\x00\x00\x00\x01\x00\x01\x00\x00\x00\x00IEND\xaeB`\x82')
+
+
+def parse_mix(value):
+    """'me=20,login=2' → {'me': 20, 'login': 2}, starting from SOAK_MIX"""
+    mix = dict(SOAK_MIX)
+    for part in filter(None, (p.strip() for p in (value or "").split(","))):
+        name, _, weight = part.partition("=")
+        if name not in SOAK_MIX:
+            raise ValueError(f"unknown soak flow {name!r} (expected one of {', '.join(SOAK_MIX)})")
+        mix[name] = float(weight)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def parse_prometheus(text):
+    """Sample lines of a Prometheus text exposition as {'name{labels}': value}"""
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        key, _, value = line.rpartition(" ")
+        try:
+            samples[key] = float(value)
+        except ValueError:
+            continue
+    return samples
+
+
+async def scrape_server_metrics(session, base_url, token):
+    """RSS, heap and event-loop lag of the server under test from /api/metrics, or {} if unavailable"""
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    try:
+        async with session.get(f"{base_url}/api/metrics", headers=headers) as response:
+            if response.status != 200:
+                return {}
+            samples = parse_prometheus(await response.text())
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return {}
+
+    def mb(key):
+        return samples[key] / (1024 * 1024) if key in samples else None
+
+    def ms(key):
+        return samples[key] * 1000 if key in samples else None
+
+    return {
+        "rss_mb": mb("process_resident_memory_bytes"),
+        "heap_mb": mb("nodejs_heap_used_bytes"),
+        "loop_lag_p99_ms": ms('nodejs_eventloop_lag_seconds{quantile="0.99"}'),
+        "loop_lag_max_ms": ms("nodejs_eventloop_lag_max_seconds"),
+    }
+
+
+class WindowedStats(LoadStats):
+    """LoadStats that also keeps the samples of the current time window, for trends over a long run"""
+
+    def __init__(self):
+        super().__init__()
+        self.window = LoadStats()
+        self.window.started = time.perf_counter()
+
+    def record(self, endpoint, elapsed_ms, ok):
+        super().record(endpoint, elapsed_ms, ok)
+        self.window.record(endpoint, elapsed_ms, ok)
+
+    def roll(self):
+        """Close the current window and return its totals across all endpoints"""
+        window, self.window = self.window, LoadStats()
+        window.finished = self.window.started = time.perf_counter()
+        summary = window.summary()
+        values = [v for samples in window.latencies.values() for v in samples]
+        return {
+            "requests": summary["total_requests"],
+            "throughput": summary["throughput"],
+            "error_rate": summary["error_rate"],
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99),
+        }
+
+
+def linear_slope(points):
+    """Least-squares slope of [(x, y), ...], or None with fewer than two points"""
+    if len(points) < 2:
+        return None
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var_x:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+async def run_soak(base_url, users, duration, ramp, window, think_time, mix, connections, metrics_token,
+                   timeout):
+    """Ramp up `users` virtual users over `ramp` seconds, have each replay a weighted mix of flows until
+    `duration` elapses, and sample throughput, latency and server memory/event-loop lag every `window`
+    seconds. Returns (summary, windows)"""
+    api_base = f"{base_url}/api"
+    stats = WindowedStats()
+    pacer = RatePacer(0)
+    usernames = []
+    active = [0]
+    windows = []
+    flows, weights = zip(*mix.items())
+    rng = random.Random()
+
+    async def soak_user(vu, delay):
+        await asyncio.sleep(delay)
+        async with vu.open_session(timeout, connections) as session:
+            ok, _, payload = await vu.fetch(session, "POST /auth/signup", "POST", "/auth/signup",
+                                            json=vu.user_data)
+            if not ok:
+                return
+            usernames.append(payload["user"]["username"])
+            active[0] += 1
+            try:
+                while time.perf_counter() < deadline:
+                    flow = rng.choices(flows, weights)[0]
+                    if flow == "signup":
+                        # A new account on the same connection pool, as after a logout
+                        tag = uuid.uuid4().hex[:10]
+                        vu.user_data = {**vu.user_data, "email": f"soakuser{tag}@example.com",
+                                        "displayName": f"Soak User {tag}"}
+                        ok, _, payload = await vu.fetch(session, "POST /auth/signup", "POST", "/auth/signup",
+                                                        json=vu.user_data,
+                                                        throttled_as="POST /auth/signup (throttled)")
+                        if ok and payload and "user" in payload:
+                            usernames.append(payload["user"]["username"])
+                    elif flow == "login":
+                        await vu.login(session)
+                    elif flow == "me":
+                        await vu.request(session, "GET /auth/me", "GET", "/auth/me")
+                    elif flow == "roommates":
+                        await vu.request(session, "GET /roommates", "GET", "/roommates")
+                    elif flow == "profile":
+                        await vu.request(session, "GET /users/[username]", "GET",
+                                         f"/users/{rng.choice(usernames)}")
+                    elif flow == "settings":
+                        await vu.request(session, "PUT /settings/roommate-search", "PUT",
+                                         "/settings/roommate-search",
+                                         json={"appearInRoommateSearch": rng.random() < 0.8})
+                    elif flow == "avatar":
+                        form = aiohttp.FormData()
+                        form.add_field("avatar", SOAK_AVATAR_PNG, filename="soak.png", content_type="image/png")
+                        await vu.request(session, "POST /upload/avatar", "POST", "/upload/avatar", data=form)
+                    await asyncio.sleep(rng.expovariate(1 / think_time) if think_time > 0 else 0)
+            finally:
+                active[0] -= 1
+
+    async def sampler():
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+            while time.perf_counter() < deadline:
+                await asyncio.sleep(min(window, max(0.0, deadline - time.perf_counter())))
+                entry = {"t_s": round(time.perf_counter() - stats.started, 1), "active_users": active[0]}
+                entry.update(stats.roll())
+                entry.update(await scrape_server_metrics(session, base_url, metrics_token))
+                windows.append(entry)
+                print(f"   t={entry['t_s']:>7.0f}s users={entry['active_users']:>4} "
+                      f"req/s={entry['throughput']:>7.1f} p95={entry['p95_ms']:>7.1f}ms "
+                      f"err={entry['error_rate'] * 100:>5.2f}% rss={entry.get('rss_mb') or 0:>7.1f}MB "
+                      f"lag99={entry.get('loop_lag_p99_ms') or 0:>6.1f}ms")
+
+    virtual_users = [VirtualUser(api_base, stats, pacer) for _ in range(users)]
+    stats.started = time.perf_counter()
+    deadline = stats.started + duration
+    await asyncio.gather(sampler(), *(soak_user(vu, ramp * i / max(users, 1))
+                                      for i, vu in enumerate(virtual_users)))
+    stats.finished = time.perf_counter()
+    return stats.summary(), windows
+
+
+def soak_findings(windows, ramp):
+    """Trends over the steady-state windows (after the ramp): memory growth and latency drift"""
+    steady = [w for w in windows if w["t_s"] > ramp] or windows
+    findings = {"windows": len(windows), "steady_windows": len(steady)}
+    rss = [(w["t_s"] / 3600, w["rss_mb"]) for w in steady if w.get("rss_mb") is not None]
+    heap = [(w["t_s"] / 3600, w["heap_mb"]) for w in steady if w.get("heap_mb") is not None]
+    slope = linear_slope(rss)
+    findings["rss_growth_mb_per_hour"] = slope
+    findings["heap_growth_mb_per_hour"] = linear_slope(heap)
+    if rss:
+        findings["rss_start_mb"], findings["rss_end_mb"] = rss[0][1], rss[-1][1]
+    if steady:
+        findings["p95_first_ms"], findings["p95_last_ms"] = steady[0]["p95_ms"], steady[-1]["p95_ms"]
+        findings["p95_drift_ms_per_hour"] = linear_slope([(w["t_s"] / 3600, w["p95_ms"]) for w in steady])
+    lags = [w["loop_lag_max_ms"] for w in steady if w.get("loop_lag_max_ms") is not None]
+    findings["loop_lag_max_ms"] = max(lags) if lags else None
+    return findings
+
+
+TRANSFER_CHUNK_BYTES = 64 * 1024
+
+
+def server_rss_mb(base_url, token):
+    """Resident memory of the server under test from /api/metrics, or None if unavailable"""
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    try:
+        response = requests.get(f"{base_url}/api/metrics", headers=headers, timeout=5)
+    except requests.RequestException:
+        return None
+    if response.status_code != 200:
+        return None
+    value = parse_prometheus(response.text).get("process_resident_memory_bytes")
+    return value / (1024 * 1024) if value is not None else None
+
+
+def export_users(base_url, admin_token, path, fields, include_password_hash, metrics_token, sample_mb, timeout):
+    """Stream /api/admin/users/export into a file, sampling server RSS every sample_mb downloaded"""
+    params = {}
+    if fields:
+        params["fields"] = fields
+    if include_password_hash:
+        params["includePasswordHash"] = "true"
+
+    rss = [server_rss_mb(base_url, metrics_token)]
+    sample_bytes = int(sample_mb * 1024 * 1024)
+    next_sample = sample_bytes
+    users = size = 0
+    last = b""
+    started = time.perf_counter()
+    with requests.get(f"{base_url}/api/admin/users/export", params=params, stream=True, timeout=timeout,
+                      headers={"Authorization": f"Bearer {admin_token}"}) as response:
+        if response.status_code != 200:
+            raise RuntimeError(f"export failed: HTTP {response.status_code} {response.text[:200]}")
+        with open(path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=TRANSFER_CHUNK_BYTES):
+                f.write(chunk)
+                size += len(chunk)
+                users += chunk.count(b"\n")
+                last = chunk[-1:]
+                if size >= next_sample:
+                    rss.append(server_rss_mb(base_url, metrics_token))
+                    next_sample += sample_bytes
+    elapsed = time.perf_counter() - started
+    rss.append(server_rss_mb(base_url, metrics_token))
+
+    return {
+        "users": users,
+        "bytes": size,
+        "elapsed_s": elapsed,
+        # Every exported line ends in a newline; anything else means the server aborted mid-stream
+        "complete": size == 0 or last == b"\n",
+        "rss_mb": [r for r in rss if r is not None],
+    }
+
+
+def import_users(base_url, admin_token, path, replace, metrics_token, sample_mb, timeout):
+    """Upload an NDJSON file to /api/admin/users/import as a chunked stream, sampling server RSS every
+    sample_mb sent. Returns the server's import summary plus client-side timings."""
+    rss = [server_rss_mb(base_url, metrics_token)]
+    sample_bytes = int(sample_mb * 1024 * 1024)
+    sent = [0]
+
+    def body():
+        next_sample = sample_bytes
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(TRANSFER_CHUNK_BYTES)
+                if not chunk:
+                    return
+                yield chunk
+                sent[0] += len(chunk)
+                if sent[0] >= next_sample:
+                    rss.append(server_rss_mb(base_url, metrics_token))
+                    next_sample += sample_bytes
+
+    started = time.perf_counter()
+    response = requests.post(f"{base_url}/api/admin/users/import", data=body(), timeout=timeout,
+                             params={"mode": "replace"} if replace else {},
+                             headers={"Authorization": f"Bearer {admin_token}",
+                                      "Content-Type": "application/x-ndjson"})
+    elapsed = time.perf_counter() - started
+    rss.append(server_rss_mb(base_url, metrics_token))
+
+    try:
+        result = response.json()
+    except ValueError:
+        result = {"error": response.text[:200]}
+    result.update({
+        "status": response.status_code,
+        "bytes": sent[0],
+        "elapsed_s": elapsed,
+        "rss_mb": [r for r in rss if r is not None],
+    })
+    return result
+
+
+def print_transfer_summary(users, size, elapsed, rss):
+    """Throughput of an export or import, and how far server memory moved while it ran"""
+    elapsed = max(elapsed, 1e-9)
+    print(f"\n📦 {users} users, {size / (1024 * 1024):.1f} MB in {elapsed:.1f}s "
+          f"({users / elapsed:.0f} users/s, {size / (1024 * 1024) / elapsed:.1f} MB/s)")
+    if rss:
+        print(f"🧠 Server RSS {rss[0]:.1f} MB at start, {max(rss):.1f} MB peak, {rss[-1]:.1f} MB at end "
+              f"({len(rss)} samples)")
+    else:
+        print("⚠️  No server memory samples; is /api/metrics reachable (see --metrics-token)?")
+
+
+def print_load_summary(summary):
+    print("\n" + "=" * 80)
+    print("📈 LOAD TEST RESULTS")
+    print("=" * 80)
+    print(f"Duration: {summary['duration_s']:.1f}s | Requests: {summary['total_requests']} | "
+          f"Throughput: {summary['throughput']:.1f} req/s | Error rate: {summary['error_rate'] * 100:.2f}%")
+    print(f"\n{'ENDPOINT':<32}{'COUNT':>8}{'REQ/S':>9}{'ERR%':>8}{'P50':>9}{'P95':>9}{'P99':>9}")
+    for name, e in summary["endpoints"].items():
+        print(f"{name:<32}{e['count']:>8}{e['throughput']:>9.1f}{e['error_rate'] * 100:>8.2f}"
+              f"{e['p50_ms']:>9.1f}{e['p95_ms']:>9.1f}{e['p99_ms']:>9.1f}")
+    print("(latencies in ms)")
+
+
+def git_commit():
+    """Current commit and whether the working tree has uncommitted changes"""
+    try:
+        sha = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain"], capture_output=True, text=True,
+                                    check=True).stdout.strip())
+        return sha, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def count_users(mongo_url, db_name):
+    """Size of the users collection behind the server under test, or None if it can't be read"""
+    if not mongo_url or pymongo is None:
+        return None
+    try:
+        client = pymongo.MongoClient(mongo_url, serverSelectionTimeoutMS=3000)
+        try:
+            return client[db_name]["users"].estimated_document_count()
+        finally:
+            client.close()
+    except pymongo.errors.PyMongoError as e:
+        print(f"⚠️  Could not read dataset size: {str(e)}")
+        return None
+
+
+def build_result_record(kind, base_url, config, summary, mongo_url, db_name):
+    sha, dirty = git_commit()
+    return {
+        "schema": RESULT_SCHEMA_VERSION,
+        "kind": kind,
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": sha,
+        "git_dirty": dirty,
+        "target": base_url,
+        "config": config,
+        "dataset": {"users": count_users(mongo_url, db_name)},
+        "summary": summary,
+    }
+
+
+def write_results(path, record):
+    with open(path, "w") as f:
+        json.dump(record, f, indent=2)
+    print(f"💾 Results written to {path}")
+
+
+def compare_results(baseline, candidate, threshold_pct, metrics, min_delta_ms):
+    """Diff two result records; returns the list of regressions past threshold_pct.
+
+    Latency metrics regress when they grow, `throughput` when it shrinks, and
+    `error_rate` when it grows by more than threshold_pct percentage points.
+    Latency changes smaller than min_delta_ms are treated as noise.
+    """
+    print("🔍 BENCHMARK COMPARISON")
+    print("=" * 80)
+    for label, record in (("Baseline", baseline), ("Candidate", candidate)):
+        print(f"{label}: {record.get('git_commit') or 'unknown'}{' (dirty)' if record.get('git_dirty') else ''} | "
+              f"{record.get('recorded_at')} | dataset users: {record.get('dataset', {}).get('users')}")
+
+    regressions = []
+    base_endpoints = baseline["summary"]["endpoints"]
+    cand_endpoints = candidate["summary"]["endpoints"]
+
+    print(f"\n{'ENDPOINT':<32}{'METRIC':<12}{'BASELINE':>11}{'CANDIDATE':>11}{'CHANGE':>10}")
+    for name in sorted(set(base_endpoints) & set(cand_endpoints)):
+        for metric in metrics:
+            before = base_endpoints[name].get(metric)
+            after = cand_endpoints[name].get(metric)
+            if before is None or after is None:
+                continue
+
+            if metric == "error_rate":
+                change = (after - before) * 100
+                regressed = change > threshold_pct
+                change_label = f"{change:+.2f}pp"
+            else:
+                change = (after - before) / before * 100 if before else 0.0
+                if metric == "throughput":
+                    regressed = change < -threshold_pct
+                else:
+                    regressed = change > threshold_pct and (after - before) >= min_delta_ms
+                change_label = f"{change:+.1f}%"
+
+            marker = " ❌" if regressed else ""
+            print(f"{name:<32}{metric:<12}{before:>11.2f}{after:>11.2f}{change_label:>10}{marker}")
+            if regressed:
+                regressions.append({"endpoint": name, "metric": metric, "baseline": before,
+                                    "candidate": after, "change": change})
+
+    for name in sorted(set(base_endpoints) - set(cand_endpoints)):
+        print(f"⚠️  {name} missing from candidate run")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) past {threshold_pct}% threshold")
+    else:
+        print(f"\n✅ No regressions past {threshold_pct}% threshold")
+    return regressions
+
 class StreamHouseAPITester:
     def __init__(self):
         self.session = requests.Session()
@@ -88,7 +1150,6 @@ class StreamHouseAPITester:
                 print(f"✅ User ID: {data.get('id')}")
                 print(f"✅ Display Name: {data.get('displayName')}")
                 print(f"✅ Username: {data.get('username')}")
-                print(f"✅ Email: {data.get('email')}")
                 print(f"✅ Platforms: {data.get('platforms', [])}")
                 print(f"✅ Niches: {data.get('niches', [])}")
                 print(f"✅ City: {data.get('city')}")
@@ -133,6 +1194,23 @@ class StreamHouseAPITester:
                 print(f"✅ Posts: {len(data.get('posts', []))} posts")
                 print(f"✅ Clips: {len(data.get('clips', []))} clips")
                 
+                if 'email' in data or 'passwordHash' in data:
+                    print("❌ ISSUE: Public profile exposes private fields")
+                    return False
+
+                # A repeat view with the ETag should revalidate without a body
+                etag = response.headers.get('ETag')
+                if etag:
+                    revalidate = self.session.get(f"{API_BASE}/users/{self.created_username}",
+                                                  headers={'If-None-Match': etag}, timeout=10)
+                    print(f"✅ ETag: {etag} → conditional GET status {revalidate.status_code}")
+                    if revalidate.status_code != 304:
+                        print("❌ ISSUE: Matching If-None-Match did not return 304")
+                        return False
+                else:
+                    print("❌ ISSUE: Profile response has no ETag")
+                    return False
+
                 # Verify actual user data is returned
                 if data.get('displayName') == self.test_user_data['displayName']:
                     print("✅ VERIFIED: Profile returns correct user data")
@@ -226,12 +1304,22 @@ class StreamHouseAPITester:
                 print(f"✅ Message: {data.get('message')}")
                 
                 # Verify avatar URL is generated
-                if data.get('avatarUrl') and 'dicebear.com' in data.get('avatarUrl'):
-                    print("✅ VERIFIED: Avatar URL generated correctly")
-                    return True
-                else:
+                if not (data.get('avatarUrl') and 'dicebear.com' in data.get('avatarUrl')):
                     print("❌ ISSUE: Avatar URL not generated properly")
                     return False
+                print("✅ VERIFIED: Avatar URL generated correctly")
+
+                # Identical bytes are matched by content hash and not processed again
+                files = {
+                    'avatar': ('same_avatar.png', BytesIO(mock_image_data), 'image/png')
+                }
+                response = self.session.post(f"{API_BASE}/upload/avatar", files=files, timeout=10)
+                if response.status_code != 200 or not response.json().get('deduplicated'):
+                    print(f"❌ ISSUE: Re-upload of identical image was not deduplicated: "
+                          f"{response.status_code} {response.text}")
+                    return False
+                print(f"✅ VERIFIED: Identical re-upload reused {response.json().get('avatarUrl')}")
+                return True
             else:
                 print(f"❌ AVATAR UPLOAD FAILED: {response.text}")
                 return False
@@ -519,6 +1607,177 @@ class StreamHouseAPITester:
             print(f"❌ ROOMMATES API ERROR: {str(e)}")
             return False
 
+    def test_search_api(self):
+        """Test display-name autocomplete and keyword search with facets"""
+        print("\n🧪 Testing Search API: /api/search/autocomplete and /api/search/users...")
+
+        try:
+            prefix = self.test_user_data['displayName'][:12].lower()
+            start = time.perf_counter()
+            response = self.session.get(f"{API_BASE}/search/autocomplete", params={"q": prefix}, timeout=10)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if response.status_code != 200:
+                print(f"❌ AUTOCOMPLETE FAILED: {response.status_code} {response.text}")
+                return False
+            suggestions = response.json().get('suggestions', [])
+            print(f"✅ Autocomplete '{prefix}': {len(suggestions)} suggestions in {elapsed_ms:.1f}ms (round trip)")
+            if self.created_username and not any(s.get('username') == self.created_username for s in suggestions):
+                print(f"❌ ISSUE: {self.created_username} missing from its own display-name prefix")
+                return False
+
+            response = self.session.get(f"{API_BASE}/search/users", timeout=10)
+            if response.status_code != 400:
+                print(f"❌ ISSUE: Search without a term or filter returned {response.status_code}, expected 400")
+                return False
+            print("✅ Search without a term or filter rejected")
+
+            response = self.session.get(f"{API_BASE}/search/users", params={"q": "Fortnite", "niche": "Gaming"},
+                                        timeout=10)
+            if response.status_code != 200:
+                print(f"❌ SEARCH FAILED: {response.status_code} {response.text}")
+                return False
+            data = response.json()
+            facets = data.get('facets', {})
+            print(f"✅ Search 'Fortnite' in Gaming: {data.get('total')} matches, "
+                  f"{len(facets.get('platforms', []))} platform / {len(facets.get('cities', []))} city facets")
+            if not all(isinstance(facets.get(key), list) for key in ('platforms', 'niches', 'cities')):
+                print("❌ ISSUE: Facet counts missing from search response")
+                return False
+            return True
+
+        except Exception as e:
+            print(f"❌ SEARCH API ERROR: {str(e)}")
+            return False
+
+    def test_dashboard_api(self):
+        """Test the dashboard bootstrap payload loads every panel in one request"""
+        print("\n🧪 Testing Dashboard API: /api/dashboard...")
+
+        try:
+            start = time.perf_counter()
+            response = self.session.get(f"{API_BASE}/dashboard", timeout=10)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if response.status_code != 200:
+                print(f"❌ DASHBOARD FAILED: {response.status_code} {response.text}")
+                return False
+
+            data = response.json()
+            user = data.get('user') or {}
+            if user.get('email') != self.test_user_data['email'] or 'passwordHash' in user:
+                print(f"❌ ISSUE: Unexpected dashboard user: {user}")
+                return False
+            if not all(key in data for key in ('houses', 'roommates', 'unread')):
+                print(f"❌ ISSUE: Dashboard panels missing: {sorted(data)}")
+                return False
+            print(f"✅ Dashboard loaded in {elapsed_ms:.1f}ms (round trip): "
+                  f"{(data.get('houses') or {}).get('total')} houses, "
+                  f"{len(data.get('roommates') or [])} roommate previews, {data.get('unread')} unread")
+
+            response = requests.get(f"{API_BASE}/dashboard", timeout=10)
+            if response.status_code != 401:
+                print(f"❌ ISSUE: Dashboard without a session returned {response.status_code}, expected 401")
+                return False
+            print("✅ Dashboard without a session rejected")
+            return True
+
+        except Exception as e:
+            print(f"❌ DASHBOARD API ERROR: {str(e)}")
+            return False
+
+    def test_leaderboard_api(self):
+        """Test the points leaderboard is ordered and reports the caller's own rank"""
+        print("\n🧪 Testing Leaderboard API: /api/leaderboard...")
+
+        try:
+            start = time.perf_counter()
+            response = self.session.get(f"{API_BASE}/leaderboard", params={"limit": 10}, timeout=10)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if response.status_code != 200:
+                print(f"❌ LEADERBOARD FAILED: {response.status_code} {response.text}")
+                return False
+
+            data = response.json()
+            rows = data.get('leaderboard', [])
+            points = [row['totalPoints'] for row in rows]
+            if points != sorted(points, reverse=True):
+                print(f"❌ ISSUE: Leaderboard not ordered by points: {points}")
+                return False
+            if rows and rows[0]['rank'] != 1:
+                print(f"❌ ISSUE: Top entry has rank {rows[0]['rank']}")
+                return False
+            me = data.get('me') or {}
+            if not isinstance(me.get('rank'), int) or me['rank'] < 1:
+                print(f"❌ ISSUE: Caller's rank missing: {me}")
+                return False
+            print(f"✅ Leaderboard: {len(rows)} rows of {data.get('total')} in {elapsed_ms:.1f}ms (round trip), "
+                  f"my rank #{me['rank']} with {me.get('totalPoints')} points")
+
+            if data.get('nextCursor'):
+                response = self.session.get(f"{API_BASE}/leaderboard",
+                                            params={"limit": 10, "cursor": data['nextCursor']}, timeout=10)
+                next_rows = response.json().get('leaderboard', []) if response.status_code == 200 else []
+                if not next_rows or next_rows[0]['totalPoints'] > points[-1]:
+                    print(f"❌ ISSUE: Second leaderboard page out of order: {response.status_code}")
+                    return False
+                print(f"✅ Second page continues at rank #{next_rows[0]['rank']}")
+
+            response = self.session.get(f"{API_BASE}/leaderboard", params={"cursor": "not-a-cursor"}, timeout=10)
+            if response.status_code != 400:
+                print(f"❌ ISSUE: Invalid leaderboard cursor returned {response.status_code}, expected 400")
+                return False
+            return True
+
+        except Exception as e:
+            print(f"❌ LEADERBOARD API ERROR: {str(e)}")
+            return False
+
+    def test_sparse_fields_api(self):
+        """Test ?fields= narrows user payloads and large JSON responses are compressed"""
+        print("\n🧪 Testing sparse fieldsets and compression: /api/auth/me, /api/roommates...")
+
+        try:
+            response = self.session.get(f"{API_BASE}/auth/me", params={"fields": "displayName,points.engage"},
+                                        timeout=10)
+            if response.status_code != 200:
+                print(f"❌ SPARSE FIELDS FAILED: {response.status_code} {response.text}")
+                return False
+            user = response.json()
+            if not set(user) <= {'id', 'displayName', 'points'} or 'id' not in user:
+                print(f"❌ ISSUE: fields=displayName,points.engage returned {sorted(user)}")
+                return False
+            full = self.session.get(f"{API_BASE}/auth/me", timeout=10)
+            print(f"✅ /auth/me sparse: {len(response.content)} bytes vs {len(full.content)} bytes in full")
+
+            response = self.session.get(f"{API_BASE}/auth/me", params={"fields": "passwordHash"}, timeout=10)
+            if response.status_code != 400:
+                print(f"❌ ISSUE: fields=passwordHash returned {response.status_code}, expected 400")
+                return False
+            print("✅ Private fields refused")
+
+            response = self.session.get(f"{API_BASE}/roommates", params={"fields": "displayName,city"},
+                                        timeout=10)
+            if response.status_code != 200:
+                print(f"❌ ISSUE: Sparse roommates failed: {response.status_code} {response.text}")
+                return False
+            cards = response.json().get('roommates', [])
+            if any(not set(card) <= {'id', 'displayName', 'city'} for card in cards):
+                print(f"❌ ISSUE: Sparse roommate cards have extra fields: {cards[:1]}")
+                return False
+            print(f"✅ Sparse roommate cards: {len(cards)} cards, {len(response.content)} bytes")
+
+            response = self.session.get(f"{API_BASE}/roommates", headers={"Accept-Encoding": "gzip"}, timeout=10)
+            encoding = response.headers.get('Content-Encoding')
+            # requests decodes gzip transparently, so content is the uncompressed body
+            if len(response.content) >= 1024 and encoding != 'gzip':
+                print(f"❌ ISSUE: {len(response.content)} byte roommate page sent with encoding {encoding}")
+                return False
+            print(f"✅ Roommate page: {len(response.content)} bytes, Content-Encoding: {encoding or 'none'}")
+            return True
+
+        except Exception as e:
+            print(f"❌ SPARSE FIELDS API ERROR: {str(e)}")
+            return False
+
     def run_comprehensive_mongodb_test(self):
         """Run comprehensive MongoDB integration tests"""
         print("🏠 STREAM HOUSE MONGODB INTEGRATION COMPREHENSIVE TESTING")
@@ -558,15 +1817,27 @@ class StreamHouseAPITester:
         
         # Test 8: API Endpoints - Roommates with MongoDB
         results['api_roommates'] = self.test_roommates_api_with_mongodb()
+
+        # Test 9: API Endpoints - Search and autocomplete
+        results['api_search'] = self.test_search_api()
+
+        # Test 10: API Endpoints - Dashboard bootstrap
+        results['api_dashboard'] = self.test_dashboard_api()
+
+        # Test 11: API Endpoints - Points leaderboard
+        results['api_leaderboard'] = self.test_leaderboard_api()
+
+        # Test 12: API Endpoints - Sparse fieldsets and compression
+        results['api_sparse_fields'] = self.test_sparse_fields_api()
         
-        # Test 9: Settings & Profile Management
+        # Test 13: Settings & Profile Management
         print("\n⚙️  SETTINGS & PROFILE MANAGEMENT TESTS")
         results['settings_privacy'] = self.test_settings_roommate_search_api()
         
-        # Test 10: Privacy Settings Default
+        # Test 14: Privacy Settings Default
         results['privacy_default'] = self.test_privacy_default_for_new_users()
         
-        # Test 11: Profile Picture Upload
+        # Test 15: Profile Picture Upload
         results['avatar_upload'] = self.test_avatar_upload_api()
         
         # Summary
@@ -577,7 +1848,8 @@ class StreamHouseAPITester:
         # Categorize results
         mongodb_tests = ['mongodb_signup', 'mongodb_crud', 'mongodb_persistence']
         auth_tests = ['auth_complete_flow', 'cookie_persistence']
-        api_tests = ['api_auth_me', 'api_user_profile', 'api_roommates']
+        api_tests = ['api_auth_me', 'api_user_profile', 'api_roommates', 'api_search', 'api_dashboard',
+                     'api_leaderboard', 'api_sparse_fields']
         settings_tests = ['settings_privacy', 'privacy_default', 'avatar_upload']
         
         categories = [
@@ -614,6 +1886,445 @@ class StreamHouseAPITester:
         
         return results
 
+    def run_load_test(self, users=10, duration=60, rate=0, base_url=LOAD_BASE_URL, timeout=30,
+                      output=None, mongo_url=None, db_name="stream_house"):
+        """Run concurrent virtual users through signup → login → /auth/me → /roommates → settings"""
+        print("🏋️  STREAM HOUSE LOAD TEST")
+        print("=" * 80)
+        print(f"Target: {base_url} | Virtual users: {users} | Duration: {duration}s | "
+              f"Rate: {f'{rate} req/s' if rate > 0 else 'unthrottled'}")
+
+        if aiohttp is None:
+            print("❌ Load mode requires aiohttp (pip install aiohttp)")
+            return None
+
+        summary = asyncio.run(run_load(f"{base_url}/api", users, duration, rate, timeout))
+        print_load_summary(summary)
+
+        if output:
+            config = {"users": users, "duration_s": duration, "rate": rate, "timeout_s": timeout}
+            write_results(output, build_result_record("load", base_url, config, summary, mongo_url, db_name))
+        return summary
+
+    def run_auth_benchmark(self, users=20, duration=30, probe_interval=0.05, base_url=LOAD_BASE_URL, timeout=30,
+                           output=None, mongo_url=None, db_name="stream_house"):
+        """Measure login throughput and the latency a concurrent non-auth route sees during a login storm"""
+        print("🔐 STREAM HOUSE AUTH BENCHMARK")
+        print("=" * 80)
+        print(f"Target: {base_url} | Concurrent logins: {users} | Duration: {duration}s | "
+              f"Probe every {probe_interval * 1000:.0f}ms")
+
+        if aiohttp is None:
+            print("❌ Auth benchmark requires aiohttp (pip install aiohttp)")
+            return None
+
+        summary = asyncio.run(run_auth_bench(f"{base_url}/api", users, duration, probe_interval, timeout))
+        print_load_summary(summary)
+
+        if output:
+            config = {"users": users, "duration_s": duration, "probe_interval_s": probe_interval, "timeout_s": timeout}
+            write_results(output, build_result_record("auth-bench", base_url, config, summary, mongo_url, db_name))
+        return summary
+
+    def run_house_benchmark(self, users=20, houses_per_user=100, race_houses=20, page_size=50,
+                            base_url=LOAD_BASE_URL, timeout=30, output=None, mongo_url=None,
+                            db_name="stream_house"):
+        """Benchmark house creation, atomic joins and membership paging with thousands of houses"""
+        print("🏘️  STREAM HOUSE HOUSES BENCHMARK")
+        print("=" * 80)
+        print(f"Target: {base_url} | Creators: {users} | Houses: {users * houses_per_user} | "
+              f"Race sample: {race_houses} | Page size: {page_size}")
+
+        if aiohttp is None:
+            print("❌ House benchmark requires aiohttp (pip install aiohttp)")
+            return None
+
+        summary, findings = asyncio.run(run_house_bench(f"{base_url}/api", users, houses_per_user,
+                                                        race_houses, page_size, timeout))
+        if summary is None:
+            return None
+        print_load_summary(summary)
+
+        print(f"\n✅ Houses created: {findings['houses_created']}")
+        print(f"{'✅' if findings['hub_houses_listed'] == findings['houses_created'] else '❌'} "
+              f"Hub membership listed: {findings['hub_houses_listed']}/{findings['houses_created']}")
+        print(f"{'✅' if findings['creator_houses_listed'] == houses_per_user else '❌'} "
+              f"Creator houses listed: {findings['creator_houses_listed']}/{houses_per_user}")
+        print(f"{'✅' if findings['race_over_capacity'] == 0 else '❌'} "
+              f"Join races over capacity: {findings['race_over_capacity']}/{findings['race_houses']}")
+
+        if output:
+            config = {"users": users, "houses_per_user": houses_per_user, "race_houses": race_houses,
+                      "page_size": page_size, "timeout_s": timeout}
+            record = build_result_record("house-bench", base_url, config, summary, mongo_url, db_name)
+            record["findings"] = findings
+            write_results(output, record)
+        return summary
+
+    def run_message_benchmark(self, users=100, duration=30, send_interval=1.0, grace=5.0,
+                              base_url=LOAD_BASE_URL, timeout=30, output=None, mongo_url=None,
+                              db_name="stream_house"):
+        """Benchmark message sends and SSE push fan-out with many open conversations"""
+        print("💬 STREAM HOUSE MESSAGE FAN-OUT BENCHMARK")
+        print("=" * 80)
+        print(f"Target: {base_url} | Users: {users} ({users // 2} conversations) | Duration: {duration}s | "
+              f"Send every {send_interval}s per user")
+
+        if aiohttp is None:
+            print("❌ Message benchmark requires aiohttp (pip install aiohttp)")
+            return None
+
+        summary, findings = asyncio.run(run_message_bench(f"{base_url}/api", users, duration,
+                                                          send_interval, grace, timeout))
+        if summary is None:
+            return None
+        print_load_summary(summary)
+
+        print(f"\n{'✅' if findings['streams_opened'] == users - users % 2 else '❌'} "
+              f"Streams open: {findings['streams_opened']}/{users - users % 2}")
+        print(f"{'✅' if findings['lost'] == 0 else '❌'} "
+              f"Delivered: {findings['delivered']}/{findings['sent']} (lost {findings['lost']})")
+        if "history_listed" in findings:
+            print(f"✅ History paged: {findings['history_listed']} messages in one conversation")
+
+        if output:
+            config = {"users": users, "duration_s": duration, "send_interval_s": send_interval,
+                      "grace_s": grace, "timeout_s": timeout}
+            record = build_result_record("message-bench", base_url, config, summary, mongo_url, db_name)
+            record["findings"] = findings
+            write_results(output, record)
+        return summary
+
+    def run_seed(self, users=1000, batch_size=1000, opt_in_ratio=0.8, random_seed=None, teardown=False,
+                 run=None, mongo_url=None, db_name="stream_house"):
+        """Insert synthetic users directly into MongoDB, or remove them with teardown"""
+        print("🌱 STREAM HOUSE SEED")
+        print("=" * 80)
+
+        if pymongo is None or (bcrypt is None and not teardown):
+            print("❌ Seeding requires pymongo and bcrypt (pip install pymongo bcrypt)")
+            return None
+        if not mongo_url:
+            print("❌ Seeding needs --mongo-url or MONGO_URL")
+            return None
+
+        if teardown:
+            removed = teardown_seed(mongo_url, db_name, run)
+            print(f"🧹 Removed {removed} seeded users{f' from run {run}' if run else ''}")
+            return removed
+
+        print(f"Database: {db_name} | Users: {users} | Batch: {batch_size} | Opt-in: {opt_in_ratio:.0%}")
+        started = time.perf_counter()
+        run, inserted = seed_users(mongo_url, db_name, users, batch_size, opt_in_ratio, random_seed)
+        elapsed = time.perf_counter() - started
+        print(f"\n✅ Seeded {inserted} users as run {run} in {elapsed:.1f}s "
+              f"(password: {SEED_PASSWORD}, collection now {count_users(mongo_url, db_name)} users)")
+        # Direct inserts skip the app's invalidation hooks
+        print("ℹ️  Restart the server (or wait for ROOMMATE_INDEX_REBUILD_MS) so roommate ranking sees them")
+        return inserted
+
+    def run_scale_benchmark(self, users=20, duration=30, profile_reads=3, sample=1000, base_url=LOAD_BASE_URL,
+                            timeout=30, output=None, mongo_url=None, db_name="stream_house"):
+        """Benchmark login, ranked roommate search and profile reads against the seeded dataset; run it
+        after seeding 1k, 100k and 1M users and compare the result files for scaling curves"""
+        print("📏 STREAM HOUSE SCALE BENCHMARK")
+        print("=" * 80)
+
+        if aiohttp is None or pymongo is None:
+            print("❌ Scale benchmark requires aiohttp and pymongo (pip install aiohttp pymongo)")
+            return None
+        if not mongo_url:
+            print("❌ Scale benchmark needs --mongo-url or MONGO_URL to pick seeded accounts")
+            return None
+
+        accounts = sample_seeded_users(mongo_url, db_name, sample)
+        if not accounts:
+            print("❌ No seeded users found; run `seed` first")
+            return None
+        print(f"Target: {base_url} | Dataset: {count_users(mongo_url, db_name)} users | Virtual users: {users} | "
+              f"Duration: {duration}s | Profile reads per search: {profile_reads}")
+
+        summary = asyncio.run(run_scale_bench(f"{base_url}/api", accounts, users, duration, profile_reads,
+                                              timeout))
+        print_load_summary(summary)
+
+        if output:
+            config = {"users": users, "duration_s": duration, "profile_reads": profile_reads,
+                      "sample": len(accounts), "timeout_s": timeout}
+            write_results(output, build_result_record("scale-bench", base_url, config, summary, mongo_url,
+                                                      db_name))
+        return summary
+
+    def run_soak_test(self, users=50, duration=3600, ramp=300, window=60, think_time=1.0, mix=None,
+                      connections=2, metrics_token=None, base_url=LOAD_BASE_URL, timeout=30, output=None,
+                      mongo_url=None, db_name="stream_house"):
+        """Run a weighted mix of user flows for a long time and track latency, throughput and the server's
+        memory and event-loop lag per window, to surface leaks and gradual degradation"""
+        print("🕰️  STREAM HOUSE SOAK TEST")
+        print("=" * 80)
+
+        if aiohttp is None:
+            print("❌ Soak mode requires aiohttp (pip install aiohttp)")
+            return None
+        try:
+            flows = parse_mix(mix)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return None
+
+        print(f"Target: {base_url} | Virtual users: {users} | Duration: {duration}s | Ramp: {ramp}s | "
+              f"Window: {window}s | Think time: {think_time}s | Connections/user: {connections}")
+        print("Mix: " + ", ".join(f"{name}={weight:g}" for name, weight in flows.items()))
+
+        summary, windows = asyncio.run(run_soak(base_url, users, duration, ramp, window, think_time, flows,
+                                                connections, metrics_token, timeout))
+        print_load_summary(summary)
+
+        findings = soak_findings(windows, ramp)
+        if findings.get("rss_growth_mb_per_hour") is not None:
+            print(f"\n📦 RSS {findings['rss_start_mb']:.1f} → {findings['rss_end_mb']:.1f} MB "
+                  f"({findings['rss_growth_mb_per_hour']:+.1f} MB/h over steady state)")
+        else:
+            print("\n⚠️  No server memory samples; is /api/metrics reachable (see --metrics-token)?")
+        if findings.get("p95_drift_ms_per_hour") is not None:
+            print(f"⏱️  p95 {findings['p95_first_ms']:.1f} → {findings['p95_last_ms']:.1f} ms "
+                  f"({findings['p95_drift_ms_per_hour']:+.1f} ms/h)")
+
+        if output:
+            config = {"users": users, "duration_s": duration, "ramp_s": ramp, "window_s": window,
+                      "think_time_s": think_time, "mix": flows, "connections": connections, "timeout_s": timeout}
+            record = build_result_record("soak", base_url, config, summary, mongo_url, db_name)
+            record["windows"] = windows
+            record["findings"] = findings
+            write_results(output, record)
+        return summary
+
+    def run_export(self, path="users.ndjson", fields=None, include_password_hash=False, admin_token=None,
+                   metrics_token=None, sample_mb=10, base_url=LOAD_BASE_URL, timeout=600):
+        """Stream every user out of the server as NDJSON and report throughput and server memory"""
+        print("📤 STREAM HOUSE USER EXPORT")
+        print("=" * 80)
+
+        if not admin_token:
+            print("❌ Export needs --admin-token or ADMIN_TOKEN")
+            return None
+        print(f"Target: {base_url} | Output: {path} | Fields: {fields or 'all'}")
+
+        try:
+            result = export_users(base_url, admin_token, path, fields, include_password_hash, metrics_token,
+                                  sample_mb, timeout)
+        except (requests.RequestException, RuntimeError) as e:
+            print(f"❌ {e}")
+            return None
+
+        print_transfer_summary(result["users"], result["bytes"], result["elapsed_s"], result["rss_mb"])
+        if not result["complete"]:
+            print("❌ Export ended mid-line; the server aborted the stream")
+        return result
+
+    def run_import(self, path="users.ndjson", replace=False, admin_token=None, metrics_token=None,
+                   sample_mb=10, base_url=LOAD_BASE_URL, timeout=600):
+        """Stream an NDJSON file of users into the server and report throughput and server memory"""
+        print("📥 STREAM HOUSE USER IMPORT")
+        print("=" * 80)
+
+        if not admin_token:
+            print("❌ Import needs --admin-token or ADMIN_TOKEN")
+            return None
+        if not os.path.exists(path):
+            print(f"❌ {path} not found")
+            return None
+        print(f"Target: {base_url} | Input: {path} ({os.path.getsize(path) / (1024 * 1024):.1f} MB) | "
+              f"Mode: {'replace' if replace else 'insert'}")
+
+        try:
+            result = import_users(base_url, admin_token, path, replace, metrics_token, sample_mb, timeout)
+        except requests.RequestException as e:
+            print(f"❌ {e}")
+            return None
+
+        if result["status"] != 200:
+            print(f"❌ Import failed: HTTP {result['status']} {result.get('error')}")
+        imported = result.get("inserted", 0) + result.get("replaced", 0)
+        print_transfer_summary(imported, result["bytes"], result["elapsed_s"], result["rss_mb"])
+        print(f"   Lines: {result.get('lines', 0)} | Inserted: {result.get('inserted', 0)} | "
+              f"Replaced: {result.get('replaced', 0)} | Skipped: {result.get('skipped', 0)} | "
+              f"Invalid: {result.get('invalid', 0)} | Failed: {result.get('failed', 0)} | "
+              f"Server: {result.get('usersPerSecond', 0)} users/s")
+        for error in result.get("errors", []):
+            print(f"   line {error['line']}: {error['error']}")
+        return result
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream House backend API tests")
+    subparsers = parser.add_subparsers(dest="mode")
+
+    load_parser = subparsers.add_parser("load", help="concurrent load test with latency percentiles")
+    load_parser.add_argument("--base-url", default=LOAD_BASE_URL, help="server to load (default: %(default)s)")
+    load_parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    load_parser.add_argument("--duration", type=float, default=60, help="run time in seconds")
+    load_parser.add_argument("--rate", type=float, default=0,
+                             help="target requests/sec across all users (0 = limited only by concurrency)")
+    load_parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    load_parser.add_argument("--output", help="write a JSON result file for later comparison")
+    load_parser.add_argument("--mongo-url", default=os.getenv('MONGO_URL'),
+                             help="MongoDB behind the server, used to record dataset size (default: $MONGO_URL)")
+    load_parser.add_argument("--db-name", default=os.getenv('DB_NAME', 'stream_house'))
+
+    auth_parser = subparsers.add_parser("auth-bench", help="login throughput vs. latency of a concurrent non-auth route")
+    auth_parser.add_argument("--base-url", default=LOAD_BASE_URL, help="server to load (default: %(default)s)")
+    auth_parser.add_argument("--users", type=int, default=20, help="concurrent login loops")
+    auth_parser.add_argument("--duration", type=float, default=30, help="run time in seconds")
+    auth_parser.add_argument("--probe-interval", type=float, default=0.05, help="seconds between /health probes")
+    auth_parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    auth_parser.add_argument("--output", help="write a JSON result file for later comparison")
+    auth_parser.add_argument("--mongo-url", default=os.getenv('MONGO_URL'))
+    auth_parser.add_argument("--db-name", default=os.getenv('DB_NAME', 'stream_house'))
+
+    house_parser = subparsers.add_parser("house-bench", help="house creation, joins and membership paging at scale")
+    house_parser.add_argument("--base-url", default=LOAD_BASE_URL, help="server to load (default: %(default)s)")
+    house_parser.add_argument("--users", type=int, default=20, help="house-creating users")
+    house_parser.add_argument("--houses-per-user", type=int, default=100)
+    house_parser.add_argument("--race-houses", type=int, default=20, help="houses used for the last-slot join race")
+    house_parser.add_argument("--page-size", type=int, default=50)
+    house_parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    house_parser.add_argument("--output", help="write a JSON result file for later comparison")
+    house_parser.add_argument("--mongo-url", default=os.getenv('MONGO_URL'))
+    house_parser.add_argument("--db-name", default=os.getenv('DB_NAME', 'stream_house'))
+
+    message_parser = subparsers.add_parser("message-bench", help="message sends and SSE push fan-out")
+    message_parser.add_argument("--base-url", default=LOAD_BASE_URL, help="server to load (default: %(default)s)")
+    message_parser.add_argument("--users", type=int, default=100, help="users, paired into conversations")
+    message_parser.add_argument("--duration", type=float, default=30, help="run time in seconds")
+    message_parser.add_argument("--send-interval", type=float, default=1.0, help="seconds between sends per user")
+    message_parser.add_argument("--grace", type=float, default=5.0,
+                                help="seconds to wait for in-flight deliveries before counting losses")
+    message_parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    message_parser.add_argument("--output", help="write a JSON result file for later comparison")
+    message_parser.add_argument("--mongo-url", default=os.getenv('MONGO_URL'))
+    message_parser.add_argument("--db-name", default=os.getenv('DB_NAME', 'stream_house'))
+
+    seed_parser = subparsers.add_parser("seed", help="insert synthetic users straight into MongoDB")
+    seed_parser.add_argument("--users", type=int, default=1000, help="users to insert")
+    seed_parser.add_argument("--batch-size", type=int, default=1000, help="documents per insert_many")
+    seed_parser.add_argument("--opt-in-ratio", type=float, default=0.8, help="share opted in to roommate search")
+    seed_parser.add_argument("--random-seed", type=int, help="make the generated users reproducible")
+    seed_parser.add_argument("--teardown", action="store_true", help="delete seeded users instead")
+    seed_parser.add_argument("--run", help="with --teardown, only delete this seed run")
+    seed_parser.add_argument("--mongo-url", default=os.getenv('MONGO_URL'))
+    seed_parser.add_argument("--db-name", default=os.getenv('DB_NAME', 'stream_house'))
+
+    scale_parser = subparsers.add_parser("scale-bench", help="login, roommates and profiles against seeded users")
+    scale_parser.add_argument("--base-url", default=LOAD_BASE_URL, help="server to load (default: %(default)s)")
+    scale_parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    scale_parser.add_argument("--duration", type=float, default=30, help="run time in seconds")
+    scale_parser.add_argument("--profile-reads", type=int, default=3, help="profile lookups per roommate search")
+    scale_parser.add_argument("--sample", type=int, default=1000, help="seeded accounts to draw from")
+    scale_parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    scale_parser.add_argument("--output", help="write a JSON result file for later comparison")
+    scale_parser.add_argument("--mongo-url", default=os.getenv('MONGO_URL'))
+    scale_parser.add_argument("--db-name", default=os.getenv('DB_NAME', 'stream_house'))
+
+    soak_parser = subparsers.add_parser("soak", help="long mixed-workload run with server memory/lag trends")
+    soak_parser.add_argument("--base-url", default=LOAD_BASE_URL, help="server to load (default: %(default)s)")
+    soak_parser.add_argument("--users", type=int, default=50, help="concurrent virtual users")
+    soak_parser.add_argument("--duration", type=float, default=3600, help="run time in seconds")
+    soak_parser.add_argument("--ramp", type=float, default=300, help="seconds over which users start")
+    soak_parser.add_argument("--window", type=float, default=60, help="seconds per reported window")
+    soak_parser.add_argument("--think-time", type=float, default=1.0,
+                             help="mean seconds between a user's requests (exponential)")
+    soak_parser.add_argument("--mix", help="flow weights overriding the defaults, e.g. avatar=5,login=1 "
+                                           f"(flows: {', '.join(SOAK_MIX)})")
+    soak_parser.add_argument("--connections", type=int, default=2, help="keep-alive connections per user")
+    soak_parser.add_argument("--metrics-token", default=os.getenv('METRICS_TOKEN'),
+                             help="bearer token for /api/metrics, if the server requires one")
+    soak_parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    soak_parser.add_argument("--output", help="write a JSON result file for later comparison")
+    soak_parser.add_argument("--mongo-url", default=os.getenv('MONGO_URL'))
+    soak_parser.add_argument("--db-name", default=os.getenv('DB_NAME', 'stream_house'))
+
+    export_parser = subparsers.add_parser("export", help="stream all users out as NDJSON")
+    export_parser.add_argument("--base-url", default=LOAD_BASE_URL, help="server to export from (default: %(default)s)")
+    export_parser.add_argument("--output", default="users.ndjson", help="file to write (default: %(default)s)")
+    export_parser.add_argument("--fields", help="comma-separated fields to export (default: all)")
+    export_parser.add_argument("--include-password-hash", action="store_true",
+                               help="keep password hashes, for a full restore")
+    export_parser.add_argument("--admin-token", default=os.getenv('ADMIN_TOKEN'))
+    export_parser.add_argument("--metrics-token", default=os.getenv('METRICS_TOKEN'),
+                               help="bearer token for /api/metrics, if the server requires one")
+    export_parser.add_argument("--sample-mb", type=float, default=10, help="sample server RSS every N MB")
+    export_parser.add_argument("--timeout", type=float, default=600, help="read timeout in seconds")
+
+    import_parser = subparsers.add_parser("import", help="stream an NDJSON file of users in")
+    import_parser.add_argument("input", nargs="?", default="users.ndjson", help="file to upload (default: %(default)s)")
+    import_parser.add_argument("--base-url", default=LOAD_BASE_URL, help="server to import into (default: %(default)s)")
+    import_parser.add_argument("--replace", action="store_true", help="overwrite existing users with the same id")
+    import_parser.add_argument("--admin-token", default=os.getenv('ADMIN_TOKEN'))
+    import_parser.add_argument("--metrics-token", default=os.getenv('METRICS_TOKEN'),
+                               help="bearer token for /api/metrics, if the server requires one")
+    import_parser.add_argument("--sample-mb", type=float, default=10, help="sample server RSS every N MB")
+    import_parser.add_argument("--timeout", type=float, default=600, help="read timeout in seconds")
+
+    compare_parser = subparsers.add_parser("compare", help="diff two result files, exit 1 on regression")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--threshold", type=float, default=10.0,
+                                help="allowed regression in percent (default: %(default)s)")
+    compare_parser.add_argument("--metrics", default="p50_ms,p95_ms,p99_ms,throughput,error_rate",
+                                help="comma-separated summary metrics to compare (default: %(default)s)")
+    compare_parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                                help="ignore latency changes smaller than this (default: %(default)s)")
+
+    args = parser.parse_args()
+
+    if args.mode == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.candidate) as f:
+            candidate = json.load(f)
+        metrics = [m.strip() for m in args.metrics.split(",") if m.strip()]
+        regressions = compare_results(baseline, candidate, args.threshold, metrics, args.min_delta_ms)
+        sys.exit(1 if regressions else 0)
+
     tester = StreamHouseAPITester()
-    results = tester.run_comprehensive_mongodb_test()
\ No newline at end of file
+
+    if args.mode == "load":
+        tester.run_load_test(users=args.users, duration=args.duration, rate=args.rate,
+                             base_url=args.base_url, timeout=args.timeout, output=args.output,
+                             mongo_url=args.mongo_url, db_name=args.db_name)
+    elif args.mode == "house-bench":
+        tester.run_house_benchmark(users=args.users, houses_per_user=args.houses_per_user,
+                                   race_houses=args.race_houses, page_size=args.page_size,
+                                   base_url=args.base_url, timeout=args.timeout, output=args.output,
+                                   mongo_url=args.mongo_url, db_name=args.db_name)
+    elif args.mode == "message-bench":
+        tester.run_message_benchmark(users=args.users, duration=args.duration, send_interval=args.send_interval,
+                                     grace=args.grace, base_url=args.base_url, timeout=args.timeout,
+                                     output=args.output, mongo_url=args.mongo_url, db_name=args.db_name)
+    elif args.mode == "auth-bench":
+        tester.run_auth_benchmark(users=args.users, duration=args.duration, probe_interval=args.probe_interval,
+                                  base_url=args.base_url, timeout=args.timeout, output=args.output,
+                                  mongo_url=args.mongo_url, db_name=args.db_name)
+    elif args.mode == "seed":
+        tester.run_seed(users=args.users, batch_size=args.batch_size, opt_in_ratio=args.opt_in_ratio,
+                        random_seed=args.random_seed, teardown=args.teardown, run=args.run,
+                        mongo_url=args.mongo_url, db_name=args.db_name)
+    elif args.mode == "scale-bench":
+        tester.run_scale_benchmark(users=args.users, duration=args.duration, profile_reads=args.profile_reads,
+                                   sample=args.sample, base_url=args.base_url, timeout=args.timeout,
+                                   output=args.output, mongo_url=args.mongo_url, db_name=args.db_name)
+    elif args.mode == "soak":
+        tester.run_soak_test(users=args.users, duration=args.duration, ramp=args.ramp, window=args.window,
+                             think_time=args.think_time, mix=args.mix, connections=args.connections,
+                             metrics_token=args.metrics_token, base_url=args.base_url, timeout=args.timeout,
+                             output=args.output, mongo_url=args.mongo_url, db_name=args.db_name)
+    elif args.mode == "export":
+        tester.run_export(path=args.output, fields=args.fields, include_password_hash=args.include_password_hash,
+                          admin_token=args.admin_token, metrics_token=args.metrics_token,
+                          sample_mb=args.sample_mb, base_url=args.base_url, timeout=args.timeout)
+    elif args.mode == "import":
+        tester.run_import(path=args.input, replace=args.replace, admin_token=args.admin_token,
+                          metrics_token=args.metrics_token, sample_mb=args.sample_mb, base_url=args.base_url,
+                          timeout=args.timeout)
+    else:
+        results = tester.run_comprehensive_mongodb_test()
\ No newline at end of file
@@ -0,0 +1,7 @@
+// Next.js calls register() once when a server instance starts.
+export async function register() {
+  if (process.env.NEXT_RUNTIME === "nodejs") {
+    const { warmup } = await import("./lib/warmup.js");
+    await warmup();
+  }
+}
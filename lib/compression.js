@@ -0,0 +1,100 @@
+import { promisify } from "node:util";
+import { brotliCompress, gzip, constants } from "node:zlib";
+import { NextResponse } from "next/server";
+import { measure } from "./request-timing.js";
+
+// Compressed JSON responses for API routes. The body is sent with brotli or
+// gzip, whichever the client's Accept-Encoding prefers (brotli on a tie).
+//
+//   RESPONSE_COMPRESSION_MIN_BYTES  (default 1024) smaller bodies go out
+//                                   as-is; under about one packet the saving
+//                                   doesn't pay for the CPU
+//   RESPONSE_BROTLI_QUALITY         (default 4) brotli's own default of 11
+//                                   is meant for static assets and is far
+//                                   too slow per request
+//   RESPONSE_GZIP_LEVEL             (default 6)
+//
+// Next's built-in compression is gzip only and leaves a response that
+// already has a Content-Encoding alone, so the two never stack. Compression
+// runs on the libuv thread pool, off the event loop.
+
+const MIN_BYTES = parseInt(
+  process.env.RESPONSE_COMPRESSION_MIN_BYTES || "1024",
+  10,
+);
+const BROTLI_QUALITY = parseInt(process.env.RESPONSE_BROTLI_QUALITY || "4", 10);
+const GZIP_LEVEL = parseInt(process.env.RESPONSE_GZIP_LEVEL || "6", 10);
+
+const brotliAsync = promisify(brotliCompress);
+const gzipAsync = promisify(gzip);
+
+const ENCODERS = {
+  br: (body) =>
+    brotliAsync(body, {
+      params: {
+        [constants.BROTLI_PARAM_MODE]: constants.BROTLI_MODE_TEXT,
+        [constants.BROTLI_PARAM_QUALITY]: BROTLI_QUALITY,
+        [constants.BROTLI_PARAM_SIZE_HINT]: body.length,
+      },
+    }),
+  gzip: (body) => gzipAsync(body, { level: GZIP_LEVEL }),
+};
+
+const stats = {
+  compressed: 0,
+  uncompressed: 0,
+  bytesIn: 0,
+  bytesOut: 0,
+};
+
+// "br", "gzip" or null for an Accept-Encoding header
+export function negotiateEncoding(header) {
+  if (!header) return null;
+
+  const weights = new Map();
+  for (const part of header.toLowerCase().split(",")) {
+    const [name, ...params] = part.split(";").map((s) => s.trim());
+    const q = params.find((param) => param.startsWith("q="));
+    weights.set(name, q ? parseFloat(q.slice(2)) || 0 : 1);
+  }
+
+  const weight = (name) => weights.get(name) ?? weights.get("*") ?? 0;
+  const br = weight("br");
+  const gz = weight("gzip");
+
+  if (br > 0 && br >= gz) return "br";
+  if (gz > 0) return "gzip";
+  return null;
+}
+
+// Drop-in for NextResponse.json(data, init) that compresses large bodies.
+// Returns a NextResponse, so callers can still set cookies on it.
+export async function compressedJson(request, data, init = {}) {
+  const body = Buffer.from(measure("serialize", () => JSON.stringify(data)));
+
+  const headers = new Headers(init.headers);
+  headers.set("Content-Type", "application/json");
+  headers.append("Vary", "Accept-Encoding");
+
+  const encoding =
+    body.length >= MIN_BYTES
+      ? negotiateEncoding(request.headers.get("accept-encoding"))
+      : null;
+
+  if (!encoding) {
+    stats.uncompressed++;
+    return new NextResponse(body, { ...init, headers });
+  }
+
+  const compressed = await measure("compress", () => ENCODERS[encoding](body));
+  stats.compressed++;
+  stats.bytesIn += body.length;
+  stats.bytesOut += compressed.length;
+
+  headers.set("Content-Encoding", encoding);
+  return new NextResponse(compressed, { ...init, headers });
+}
+
+export function getCompressionStats() {
+  return { ...stats, minBytes: MIN_BYTES };
+}
@@ -0,0 +1,19 @@
+// Opaque keyset cursors for paginated list endpoints. A cursor is the sort
+// key of the last item on a page, encoded so clients treat it as a token.
+
+export function encodeCursor(values) {
+  return Buffer.from(JSON.stringify(values)).toString("base64url");
+}
+
+export function decodeCursor(cursor) {
+  if (!cursor) return null;
+
+  try {
+    const values = JSON.parse(
+      Buffer.from(cursor, "base64url").toString("utf8"),
+    );
+    return Array.isArray(values) ? values : null;
+  } catch (error) {
+    return null;
+  }
+}
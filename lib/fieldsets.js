@@ -0,0 +1,114 @@
+// Sparse fieldsets. A client sends ?fields=displayName,avatarUrl,points.engage
+// to get only those fields back. The list is turned into a MongoDB
+// projection, so fields nobody asked for are never read, sent over the
+// connection or serialized. Dotted paths reach into embedded documents.
+// `id` is always included.
+
+const MAX_FIELDS = 50;
+const FIELD_PATH = /^[A-Za-z][A-Za-z0-9_]*(\.[A-Za-z0-9_]+)*$/;
+
+// Never returned, whatever is asked for
+const PRIVATE_FIELDS = ["passwordHash"];
+
+export class FieldsetError extends Error {
+  constructor(message) {
+    super(message);
+    this.name = "FieldsetError";
+    this.status = 400;
+  }
+}
+
+// Parses a comma-separated fields parameter. Returns null when it is absent,
+// so the caller keeps its usual response, or the list of paths. `allowed`
+// limits the top-level names; private fields are always refused. Throws
+// FieldsetError for anything else.
+export function parseFields(value, allowed = null) {
+  if (value === null || value === undefined) return null;
+
+  const fields = [
+    ...new Set(
+      value
+        .split(",")
+        .map((field) => field.trim())
+        .filter(Boolean),
+    ),
+  ];
+
+  if (fields.length === 0 || fields.length > MAX_FIELDS) {
+    throw new FieldsetError(`fields must list 1 to ${MAX_FIELDS} field names`);
+  }
+
+  for (const field of fields) {
+    const root = field.split(".")[0];
+    if (
+      !FIELD_PATH.test(field) ||
+      PRIVATE_FIELDS.includes(root) ||
+      (allowed && !allowed.includes(root))
+    ) {
+      throw new FieldsetError(`Unknown field: ${field}`);
+    }
+  }
+
+  return fields;
+}
+
+// Inclusion projection for a field list. A path inside another requested
+// path is dropped, since MongoDB rejects the pair as a path collision.
+export function fieldsProjection(fields) {
+  const paths = ["id", ...fields];
+  const projection = { _id: 0 };
+
+  for (const path of paths) {
+    const covered = paths.some((other) => path.startsWith(`${other}.`));
+    if (!covered) projection[path] = 1;
+  }
+
+  return projection;
+}
+
+// Applies a projection to a document already in memory (a cached user, a
+// freshly inserted one), matching what MongoDB would have returned for
+// plain and dotted paths. Exclusion projections ({ passwordHash: 0 }) copy
+// the document without those fields.
+export function applyProjection(doc, projection) {
+  const entries = Object.entries(projection).filter(([key]) => key !== "_id");
+
+  if (entries.length > 0 && entries.every(([, value]) => !value)) {
+    const copy = { ...doc };
+    for (const [key] of entries) delete copy[key];
+    if (projection._id === 0) delete copy._id;
+    return copy;
+  }
+
+  const picked = {};
+  if (projection._id !== 0 && "_id" in doc) picked._id = doc._id;
+
+  for (const [path] of entries) {
+    const parts = path.split(".");
+    let source = doc;
+    let target = picked;
+
+    for (let i = 0; i < parts.length; i++) {
+      const key = parts[i];
+      if (!(key in source)) break;
+
+      // Arrays of embedded documents are returned whole
+      const value = source[key];
+      if (i === parts.length - 1 || Array.isArray(value)) {
+        target[key] = value;
+        break;
+      }
+      if (!isPlainObject(value) || target[key] === value) break;
+
+      if (!isPlainObject(target[key])) target[key] = {};
+      source = value;
+      target = target[key];
+    }
+  }
+
+  return picked;
+}
+
+function isPlainObject(value) {
+  return value !== null && typeof value === "object" && !Array.isArray(value);
+}
@@ -0,0 +1,183 @@
+import os from "os";
+import { measure } from "./request-timing.js";
+import { WorkerPool } from "./worker-pool.js";
+
+// Avatar images are decoded and re-encoded as fixed-size square WebP
+// thumbnails on a bounded pool of worker threads, so a large upload never
+// holds the event loop and only a few decodes run at once. Re-encoding also
+// drops EXIF and other metadata (after applying its orientation).
+//
+//   AVATAR_SIZES         default "96,192,512"; the largest is the avatarUrl
+//   AVATAR_WEBP_QUALITY  default 80
+//   AVATAR_MAX_PIXELS    default 40000000, larger inputs are rejected
+//   AVATAR_WORKERS       default 2, at most one per spare CPU. 0 disables
+//                        processing and stores uploads as they are.
+//   AVATAR_MAX_QUEUE     default 20
+//
+// Decoding needs the optional `sharp` package, which deployments install
+// themselves (see STORAGE_CONFIG.md). Without it the pool reports
+// itself unavailable and uploads are stored unprocessed.
+
+function intFromEnv(name, fallback) {
+  const value = parseInt(process.env[name], 10);
+  return Number.isNaN(value) ? fallback : value;
+}
+
+export const AVATAR_SIZES = (process.env.AVATAR_SIZES || "96,192,512")
+  .split(",")
+  .map((size) => parseInt(size, 10))
+  .filter((size) => size > 0)
+  .sort((a, b) => a - b);
+
+const WEBP_QUALITY = intFromEnv("AVATAR_WEBP_QUALITY", 80);
+const MAX_PIXELS = intFromEnv("AVATAR_MAX_PIXELS", 40000000);
+const POOL_SIZE = intFromEnv(
+  "AVATAR_WORKERS",
+  Math.max(1, Math.min(2, os.cpus().length - 1)),
+);
+const MAX_QUEUE = intFromEnv("AVATAR_MAX_QUEUE", 20);
+
+const UNAVAILABLE = "Image processing unavailable";
+const INVALID_IMAGE = "Invalid image";
+
+const WORKER_SOURCE = `
+const { parentPort } = require("worker_threads");
+
+let sharp = null;
+try {
+  sharp = require("sharp");
+  // The pool bounds parallelism, so each worker encodes on one thread
+  sharp.concurrency(1);
+  sharp.cache(false);
+} catch (error) {}
+
+parentPort.on("message", async ({ id, input, sizes, quality, maxPixels }) => {
+  if (!sharp) {
+    parentPort.postMessage({ id, error: ${JSON.stringify(UNAVAILABLE)} });
+    return;
+  }
+
+  try {
+    const source = Buffer.from(input.buffer, input.byteOffset, input.length);
+    const image = sharp(source, { limitInputPixels: maxPixels }).rotate();
+    const { width, height } = await image.metadata();
+
+    const variants = [];
+    for (const size of sizes) {
+      const data = await image
+        .clone()
+        .resize(size, size, { fit: "cover" })
+        .webp({ quality })
+        .toBuffer();
+      variants.push({ size, data });
+    }
+
+    parentPort.postMessage({ id, result: { width, height, variants } });
+  } catch (error) {
+    parentPort.postMessage({
+      id,
+      error: ${JSON.stringify(INVALID_IMAGE)} + ": " + error.message,
+    });
+  }
+});
+`;
+
+export class ImageQueueFullError extends Error {
+  constructor() {
+    super("Image processing queue is full");
+    this.name = "ImageQueueFullError";
+  }
+}
+
+export class InvalidImageError extends Error {
+  constructor(message) {
+    super(message);
+    this.name = "InvalidImageError";
+  }
+}
+
+export class ImageProcessingUnavailableError extends Error {
+  constructor() {
+    super(UNAVAILABLE);
+    this.name = "ImageProcessingUnavailableError";
+  }
+}
+
+class ImageProcessorPool extends WorkerPool {
+  constructor({ size, maxQueue }) {
+    super({
+      name: "Image processor",
+      source: WORKER_SOURCE,
+      size,
+      maxQueue,
+      queueFullError: () => new ImageQueueFullError(),
+    });
+    this.available = size > 0;
+  }
+
+  // Resolves to { width, height, variants: [{ size, data }] } with one WebP
+  // buffer per AVATAR_SIZES entry. Timed as one "image" phase, including any
+  // wait for a free worker.
+  async processAvatar(bytes) {
+    if (!this.available) throw new ImageProcessingUnavailableError();
+
+    try {
+      const result = await measure("image", () =>
+        this.run({
+          input: bytes,
+          sizes: AVATAR_SIZES,
+          quality: WEBP_QUALITY,
+          maxPixels: MAX_PIXELS,
+        }),
+      );
+
+      return {
+        ...result,
+        variants: result.variants.map(({ size, data }) => ({
+          size,
+          data: Buffer.from(data.buffer, data.byteOffset, data.length),
+        })),
+      };
+    } catch (error) {
+      if (error.message === UNAVAILABLE) {
+        this.available = false;
+        throw new ImageProcessingUnavailableError();
+      }
+      if (error.message.startsWith(INVALID_IMAGE)) {
+        throw new InvalidImageError(error.message);
+      }
+      throw error;
+    }
+  }
+
+  getStats() {
+    return { ...super.getStats(), available: this.available };
+  }
+}
+
+// The smallest stored variant at least `size` pixels wide, falling back to
+// the full avatar for users whose upload predates processing.
+export function avatarUrlFor(user, size) {
+  const variants = user?.avatarVariants;
+  if (!variants) return user?.avatarUrl ?? null;
+
+  const fit = AVATAR_SIZES.find((s) => s >= size && variants[s]);
+  return (fit && variants[fit]) || user.avatarUrl;
+}
+
+function createImageProcessor() {
+  return new ImageProcessorPool({ size: POOL_SIZE, maxQueue: MAX_QUEUE });
+}
+
+// In development, keep one pool across HMR reloads instead of leaking workers.
+let processor;
+if (process.env.NODE_ENV === "development") {
+  if (!global._imageProcessor) {
+    global._imageProcessor = createImageProcessor();
+  }
+  processor = global._imageProcessor;
+} else {
+  processor = createImageProcessor();
+}
+
+export const imageProcessor = processor;
@@ -0,0 +1,234 @@
+import { mongoUserRepo } from "./repositories/mongodb-user.js";
+import { logger } from "./logger.js";
+
+// Rank lookups for the points leaderboard.
+//
+// The order itself comes from MongoDB: the points_rank index on
+// { totalPoints: -1, id: 1 } serves any leaderboard page as a seek plus a
+// short scan. A user's position is harder, since it needs a count of
+// everyone ahead of them, and an indexed count still walks those entries.
+// So each instance also keeps a Fenwick tree holding how many users have
+// each points total. "How many users have more than p points" then takes
+// O(log P) steps, whatever the number of users.
+//
+// Ranks are competition ranks: users with the same points share a rank, and
+// the next distinct total skips ahead by the size of the tie.
+//
+// The tree is streamed from a batched cursor in the background from boot
+// (lib/warmup.js) and updated in place by awards made through this
+// instance. LEADERBOARD_REBUILD_MS (default 60000) sets a periodic rebuild
+// that picks up signups, deletions and awards from other instances. Until
+// the first build finishes, ranks fall back to an indexed count. Totals
+// above LEADERBOARD_MAX_POINTS (default 2^24) share the top bucket.
+
+const REBUILD_INTERVAL_MS = parseInt(
+  process.env.LEADERBOARD_REBUILD_MS || "60000",
+  10,
+);
+const MAX_POINTS = parseInt(
+  process.env.LEADERBOARD_MAX_POINTS || String(2 ** 24),
+  10,
+);
+
+// The tree starts this size and doubles as totals grow, up to MAX_POINTS
+const MIN_TREE_SIZE = 1024;
+
+function bucket(points) {
+  return Math.min(Math.max(0, Math.floor(points) || 0), MAX_POINTS - 1);
+}
+
+// Binary indexed tree of user counts per points total
+class PointsTree {
+  constructor(size) {
+    this.size = size;
+    this.counts = new Int32Array(size + 1);
+    this.total = 0;
+  }
+
+  // Sized for totals up to `max`, built in O(size) from raw counts
+  static from(pointsById, max) {
+    let size = MIN_TREE_SIZE;
+    while (size <= max && size < MAX_POINTS) size *= 2;
+
+    const tree = new PointsTree(Math.min(size, MAX_POINTS));
+    for (const points of pointsById.values()) tree.counts[points + 1]++;
+    for (let i = 1; i <= tree.size; i++) {
+      const parent = i + (i & -i);
+      if (parent <= tree.size) tree.counts[parent] += tree.counts[i];
+    }
+    tree.total = pointsById.size;
+    return tree;
+  }
+
+  add(points, delta) {
+    for (let i = points + 1; i <= this.size; i += i & -i) {
+      this.counts[i] += delta;
+    }
+    this.total += delta;
+  }
+
+  // Users with more than `points`
+  countAbove(points) {
+    let atMost = 0;
+    for (let i = Math.min(points + 1, this.size); i > 0; i -= i & -i) {
+      atMost += this.counts[i];
+    }
+    return this.total - atMost;
+  }
+}
+
+class Leaderboard {
+  constructor() {
+    this.pointsById = null;
+    this.tree = null;
+    this.started = false;
+    this.firstBuild = null;
+    this.rebuildTimer = null;
+
+    // Awards made while a rebuild reads the snapshot, replayed onto it
+    this.duringRebuild = null;
+
+    this.rebuilds = 0;
+    this.lastRebuildMs = 0;
+    this.awards = 0;
+    this.rankLookups = 0;
+    this.fallbackLookups = 0;
+  }
+
+  // Loads the tree and schedules periodic rebuilds. Returns the first
+  // build; later calls are no-ops.
+  start() {
+    if (this.started) return this.firstBuild;
+    this.started = true;
+
+    this.firstBuild = this.rebuild();
+
+    if (REBUILD_INTERVAL_MS > 0) {
+      this.rebuildTimer = setInterval(
+        () => this.rebuild(),
+        REBUILD_INTERVAL_MS,
+      );
+      this.rebuildTimer.unref?.();
+    }
+
+    return this.firstBuild;
+  }
+
+  get ready() {
+    return this.tree !== null;
+  }
+
+  async rebuild() {
+    if (this.duringRebuild) return;
+    this.duringRebuild = new Map();
+
+    try {
+      const startedAt = performance.now();
+      const pointsById = new Map();
+      let max = 0;
+      // A failed read throws and keeps the old tree; the next tick retries
+      for await (const user of mongoUserRepo.iteratePointsSnapshot()) {
+        const points = bucket(user.totalPoints);
+        pointsById.set(user.id, points);
+        if (points > max) max = points;
+      }
+      for (const [id, points] of this.duringRebuild) {
+        pointsById.set(id, points);
+        if (points > max) max = points;
+      }
+
+      this.pointsById = pointsById;
+      this.tree = PointsTree.from(pointsById, max);
+      this.rebuilds++;
+      this.lastRebuildMs = Math.round(performance.now() - startedAt);
+
+      logger.info("leaderboard built", {
+        users: pointsById.size,
+        treeSize: this.tree.size,
+        durationMs: this.lastRebuildMs,
+      });
+    } catch (error) {
+      console.error("Leaderboard rebuild error:", error);
+    } finally {
+      this.duringRebuild = null;
+    }
+  }
+
+  // Records a user's current total. Idempotent, so replaying a value that
+  // a rebuild already read is harmless.
+  set(id, totalPoints) {
+    const points = bucket(totalPoints);
+    this.duringRebuild?.set(id, points);
+    if (!this.tree) return;
+
+    const previous = this.pointsById.get(id);
+    if (previous === points) return;
+
+    this.pointsById.set(id, points);
+    if (points >= this.tree.size && this.tree.size < MAX_POINTS) {
+      this.tree = PointsTree.from(this.pointsById, points);
+      return;
+    }
+
+    if (previous !== undefined) this.tree.add(previous, -1);
+    this.tree.add(points, 1);
+  }
+
+  // Adds points in one atomic update and moves the user in the tree.
+  // Returns { id, totalPoints, points }, or null if the user wasn't found.
+  async award(userId, kind, amount) {
+    const user = await mongoUserRepo.awardPoints(userId, kind, amount);
+    if (user) {
+      this.awards++;
+      this.set(user.id, user.totalPoints);
+    }
+    return user;
+  }
+
+  // Competition rank of a points total: one more than the number of users
+  // ahead of it. Returns null only if the database count fails too.
+  async rankOf(totalPoints) {
+    if (!this.started) this.start();
+    const points = bucket(totalPoints);
+
+    if (this.tree) {
+      this.rankLookups++;
+      return this.tree.countAbove(points) + 1;
+    }
+
+    this.fallbackLookups++;
+    const ahead = await mongoUserRepo.countUsersAbove(points);
+    return ahead === null ? null : ahead + 1;
+  }
+
+  // Number of ranked users, or null until the tree is loaded
+  get size() {
+    return this.tree ? this.tree.total : null;
+  }
+
+  stats() {
+    return {
+      ready: this.ready,
+      users: this.size ?? 0,
+      treeSize: this.tree?.size ?? 0,
+      rebuilds: this.rebuilds,
+      lastRebuildMs: this.lastRebuildMs,
+      awards: this.awards,
+      rankLookups: this.rankLookups,
+      fallbackLookups: this.fallbackLookups,
+    };
+  }
+}
+
+// In development, keep one tree across HMR reloads.
+let board;
+if (process.env.NODE_ENV === "development") {
+  if (!global._leaderboard) {
+    global._leaderboard = new Leaderboard();
+  }
+  board = global._leaderboard;
+} else {
+  board = new Leaderboard();
+}
+
+export const leaderboard = board;
@@ -0,0 +1,36 @@
+// Structured JSON logging, one object per line.
+//
+// LOG_LEVEL picks the minimum level written: debug, info (default), warn,
+// error or silent. Check logger.enabled(level) before building expensive
+// fields on hot paths.
+
+const LEVELS = { debug: 10, info: 20, warn: 30, error: 40, silent: 100 };
+
+const threshold = LEVELS[process.env.LOG_LEVEL] ?? LEVELS.info;
+
+function serializeError(error) {
+  if (!(error instanceof Error)) return error;
+  return { name: error.name, message: error.message, stack: error.stack };
+}
+
+function write(level, msg, fields) {
+  if (LEVELS[level] < threshold) return;
+
+  const entry = { time: new Date().toISOString(), level, msg, ...fields };
+  if (entry.error) entry.error = serializeError(entry.error);
+
+  const line = JSON.stringify(entry);
+  if (LEVELS[level] >= LEVELS.warn) {
+    console.error(line);
+  } else {
+    console.log(line);
+  }
+}
+
+export const logger = {
+  enabled: (level) => LEVELS[level] >= threshold,
+  debug: (msg, fields) => write("debug", msg, fields),
+  info: (msg, fields) => write("info", msg, fields),
+  warn: (msg, fields) => write("warn", msg, fields),
+  error: (msg, fields) => write("error", msg, fields),
+};
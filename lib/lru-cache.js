@@ -0,0 +1,93 @@
+// Bounded in-process cache with least-recently-used eviction and an optional
+// per-entry time-to-live. Counts hits, misses and evictions so it can be sized.
+export class LRUCache {
+  constructor({ max = 1000, ttlMs = 0, onRemove = null } = {}) {
+    this.max = max;
+    this.ttlMs = ttlMs;
+    this.onRemove = onRemove;
+    this.entries = new Map();
+    this.hits = 0;
+    this.misses = 0;
+    this.evictions = 0;
+    this.expirations = 0;
+  }
+
+  get size() {
+    return this.entries.size;
+  }
+
+  get(key) {
+    const entry = this.entries.get(key);
+
+    if (!entry) {
+      this.misses++;
+      return undefined;
+    }
+
+    if (entry.expiresAt && entry.expiresAt <= Date.now()) {
+      this.remove(key, entry);
+      this.expirations++;
+      this.misses++;
+      return undefined;
+    }
+
+    // Map preserves insertion order, so re-inserting marks the key as newest.
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    this.hits++;
+
+    return entry.value;
+  }
+
+  set(key, value) {
+    if (this.max <= 0) return;
+
+    const existing = this.entries.get(key);
+    if (existing) this.remove(key, existing);
+
+    this.entries.set(key, {
+      value,
+      expiresAt: this.ttlMs > 0 ? Date.now() + this.ttlMs : 0,
+    });
+
+    while (this.entries.size > this.max) {
+      const [oldestKey, oldest] = this.entries.entries().next().value;
+      this.remove(oldestKey, oldest);
+      this.evictions++;
+    }
+  }
+
+  delete(key) {
+    const entry = this.entries.get(key);
+    if (!entry) return false;
+
+    this.remove(key, entry);
+    return true;
+  }
+
+  clear() {
+    for (const [key, entry] of this.entries) {
+      this.remove(key, entry);
+    }
+  }
+
+  stats() {
+    const lookups = this.hits + this.misses;
+
+    return {
+      size: this.entries.size,
+      max: this.max,
+      ttlMs: this.ttlMs,
+      hits: this.hits,
+      misses: this.misses,
+      evictions: this.evictions,
+      expirations: this.expirations,
+      hitRate: lookups > 0 ? this.hits / lookups : 0,
+    };
+  }
+
+  remove(key, entry) {
+    this.entries.delete(key);
+    if (this.onRemove) this.onRemove(key, entry.value);
+  }
+}
@@ -0,0 +1,235 @@
+import { getDb } from "./mongodb.js";
+
+// Pushes new messages to open Server-Sent Events streams on this node.
+// Memory is bounded three ways: a cap on streams per node and per user, and
+// a small per-stream queue. A client that stops reading is disconnected
+// instead of buffering without limit; EventSource reconnects on its own.
+//
+// With MESSAGE_CHANGE_STREAM=true, delivery is driven by a change stream on
+// the messages collection so every node sees messages sent through any
+// other node (requires a replica set).
+
+const MAX_STREAMS = parseInt(process.env.MESSAGE_STREAMS_MAX || "10000", 10);
+const MAX_STREAMS_PER_USER = parseInt(
+  process.env.MESSAGE_STREAMS_PER_USER || "5",
+  10,
+);
+const MAX_QUEUED_EVENTS = 64;
+const HEARTBEAT_MS = 25000;
+const USE_CHANGE_STREAM = process.env.MESSAGE_CHANGE_STREAM === "true";
+
+const encoder = new TextEncoder();
+const HEARTBEAT = encoder.encode(": ping\n\n");
+
+function encodeEvent(event, data) {
+  return encoder.encode(`event: ${event}\ndata: ${JSON.stringify(data)}\n\n`);
+}
+
+class MessageHub {
+  constructor() {
+    this.subscribers = new Map();
+    this.streamCount = 0;
+    this.heartbeat = null;
+    this.changeStream = null;
+    // The change stream being opened, so concurrent subscribers share it
+    this.watching = null;
+
+    this.delivered = 0;
+    this.dropped = 0;
+    this.refused = 0;
+  }
+
+  // Returns { stream, close } for a new SSE connection, or null when this
+  // node or this user is already at the stream limit.
+  subscribe(userId) {
+    const userSubscribers = this.subscribers.get(userId);
+
+    if (
+      this.streamCount >= MAX_STREAMS ||
+      (userSubscribers && userSubscribers.size >= MAX_STREAMS_PER_USER)
+    ) {
+      this.refused++;
+      return null;
+    }
+
+    const subscriber = { userId, controller: null, closed: false };
+
+    const stream = new ReadableStream(
+      {
+        start: (controller) => {
+          subscriber.controller = controller;
+          controller.enqueue(encodeEvent("ready", { userId }));
+        },
+        cancel: () => this.remove(subscriber),
+      },
+      new CountQueuingStrategy({ highWaterMark: MAX_QUEUED_EVENTS }),
+    );
+
+    if (!this.subscribers.has(userId)) {
+      this.subscribers.set(userId, new Set());
+    }
+    this.subscribers.get(userId).add(subscriber);
+    this.streamCount++;
+    this.startBackgroundWork();
+
+    return { stream, close: () => this.remove(subscriber) };
+  }
+
+  remove(subscriber) {
+    if (subscriber.closed) return;
+    subscriber.closed = true;
+
+    try {
+      subscriber.controller?.close();
+    } catch (error) {
+      // Already closed or errored by the runtime
+    }
+
+    const userSubscribers = this.subscribers.get(subscriber.userId);
+    if (userSubscribers) {
+      userSubscribers.delete(subscriber);
+      if (userSubscribers.size === 0) {
+        this.subscribers.delete(subscriber.userId);
+      }
+    }
+
+    this.streamCount--;
+    if (this.streamCount === 0) this.stopBackgroundWork();
+  }
+
+  // Returns whether the chunk was queued for the subscriber
+  send(subscriber, chunk) {
+    // desiredSize reaches zero once MAX_QUEUED_EVENTS are waiting unread
+    if (subscriber.controller.desiredSize <= 0) {
+      this.dropped++;
+      this.remove(subscriber);
+      return false;
+    }
+
+    try {
+      subscriber.controller.enqueue(chunk);
+      return true;
+    } catch (error) {
+      this.remove(subscriber);
+      return false;
+    }
+  }
+
+  publish(userIds, event, data) {
+    let chunk = null;
+
+    for (const userId of userIds) {
+      const userSubscribers = this.subscribers.get(userId);
+      if (!userSubscribers) continue;
+
+      // Serialize once, and only if someone on this node is listening
+      chunk = chunk || encodeEvent(event, data);
+      for (const subscriber of userSubscribers) {
+        if (this.send(subscriber, chunk)) this.delivered++;
+      }
+    }
+  }
+
+  publishMessage(message) {
+    const { participantIds, ...payload } = message;
+    this.publish(participantIds, "message", payload);
+  }
+
+  // Called by the route that stored the message. In change-stream mode the
+  // stream delivers it instead, so it isn't pushed twice.
+  deliver(message) {
+    if (!USE_CHANGE_STREAM) this.publishMessage(message);
+  }
+
+  startBackgroundWork() {
+    if (!this.heartbeat) {
+      // Keeps idle connections open through proxies
+      this.heartbeat = setInterval(() => {
+        for (const userSubscribers of this.subscribers.values()) {
+          for (const subscriber of userSubscribers) {
+            this.send(subscriber, HEARTBEAT);
+          }
+        }
+      }, HEARTBEAT_MS);
+      this.heartbeat.unref?.();
+    }
+
+    if (USE_CHANGE_STREAM && !this.changeStream) {
+      this.watchMessages();
+    }
+  }
+
+  stopBackgroundWork() {
+    clearInterval(this.heartbeat);
+    this.heartbeat = null;
+
+    if (this.changeStream) {
+      this.changeStream.close().catch(() => {});
+      this.changeStream = null;
+    }
+  }
+
+  watchMessages() {
+    if (!this.watching) {
+      this.watching = this.openChangeStream().finally(() => {
+        this.watching = null;
+      });
+    }
+    return this.watching;
+  }
+
+  async openChangeStream() {
+    try {
+      const db = await getDb();
+      const changeStream = db
+        .collection("messages")
+        .watch([{ $match: { operationType: "insert" } }]);
+
+      // Everyone left while it was opening
+      if (this.streamCount === 0) {
+        changeStream.close().catch(() => {});
+        return;
+      }
+      this.changeStream = changeStream;
+
+      changeStream.on("change", ({ fullDocument }) => {
+        const { _id, ...message } = fullDocument;
+        this.publishMessage(message);
+      });
+
+      changeStream.on("error", (error) => {
+        console.error("MongoDB: Message change stream error:", error);
+        changeStream.close().catch(() => {});
+        if (this.changeStream === changeStream) this.changeStream = null;
+        // Retry on the next subscription
+      });
+    } catch (error) {
+      console.error("MongoDB: Error watching messages:", error);
+    }
+  }
+
+  getStats() {
+    return {
+      streams: this.streamCount,
+      users: this.subscribers.size,
+      maxStreams: MAX_STREAMS,
+      delivered: this.delivered,
+      dropped: this.dropped,
+      refused: this.refused,
+      changeStream: Boolean(this.changeStream),
+    };
+  }
+}
+
+// In development, keep one hub across HMR reloads so open streams survive.
+let hub;
+if (process.env.NODE_ENV === "development") {
+  if (!global._messageHub) {
+    global._messageHub = new MessageHub();
+  }
+  hub = global._messageHub;
+} else {
+  hub = new MessageHub();
+}
+
+export const messageHub = hub;
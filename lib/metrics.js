@@ -0,0 +1,176 @@
+import { monitorEventLoopDelay } from "node:perf_hooks";
+
+// In-process Prometheus metrics, rendered by /api/metrics.
+//
+// Request counts and latency histograms are recorded by withTiming() in
+// lib/request-timing.js; METRICS_ENABLED=false turns that off. Everything
+// else (pool, caches, queues) is read from its owner at scrape time.
+
+export const METRICS_ENABLED = process.env.METRICS_ENABLED !== "false";
+
+// Request latency histogram bounds, in seconds
+const DURATION_BUCKETS = [
+  0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+];
+
+// Event-loop delay is reported over a window that restarts this often
+const EVENT_LOOP_WINDOW_MS = 60000;
+
+function formatLabels(labels) {
+  const pairs = Object.entries(labels).map(
+    ([key, value]) =>
+      `${key}="${String(value).replace(/\\/g, "\\\\").replace(/"/g, '\\"')}"`,
+  );
+  return pairs.length > 0 ? `{${pairs.join(",")}}` : "";
+}
+
+// Renders one metric family. samples is [[labels, value, suffix?], ...];
+// histograms use the suffix for their _bucket, _sum and _count series.
+export function formatMetric(name, type, help, samples) {
+  const lines = [`# HELP ${name} ${help}`, `# TYPE ${name} ${type}`];
+  for (const [labels, value, suffix = ""] of samples) {
+    lines.push(`${name}${suffix}${formatLabels(labels)} ${value}`);
+  }
+  return lines.join("\n");
+}
+
+class MetricsRegistry {
+  constructor() {
+    // "route method" -> { route, method, statuses, buckets, sum, count }
+    this.requests = new Map();
+
+    this.eventLoop = monitorEventLoopDelay({ resolution: 10 });
+    this.eventLoop.enable();
+    this.eventLoopTimer = setInterval(
+      () => this.eventLoop.reset(),
+      EVENT_LOOP_WINDOW_MS,
+    );
+    this.eventLoopTimer.unref?.();
+  }
+
+  observeRequest(route, method, status, seconds) {
+    const key = `${route} ${method}`;
+    let series = this.requests.get(key);
+
+    if (!series) {
+      series = {
+        route,
+        method,
+        statuses: new Map(),
+        buckets: new Array(DURATION_BUCKETS.length).fill(0),
+        sum: 0,
+        count: 0,
+      };
+      this.requests.set(key, series);
+    }
+
+    series.statuses.set(status, (series.statuses.get(status) || 0) + 1);
+    series.sum += seconds;
+    series.count++;
+
+    // Buckets are stored non-cumulative and summed at render time
+    const bucket = DURATION_BUCKETS.findIndex((bound) => seconds <= bound);
+    if (bucket !== -1) series.buckets[bucket]++;
+  }
+
+  renderRequests() {
+    const counts = [];
+    const histogram = [];
+
+    for (const series of this.requests.values()) {
+      const labels = { route: series.route, method: series.method };
+
+      for (const [status, count] of series.statuses) {
+        counts.push([{ ...labels, status }, count]);
+      }
+
+      let cumulative = 0;
+      DURATION_BUCKETS.forEach((bound, i) => {
+        cumulative += series.buckets[i];
+        histogram.push([{ ...labels, le: bound }, cumulative, "_bucket"]);
+      });
+      histogram.push([{ ...labels, le: "+Inf" }, series.count, "_bucket"]);
+      histogram.push([labels, series.sum, "_sum"]);
+      histogram.push([labels, series.count, "_count"]);
+    }
+
+    return [
+      formatMetric(
+        "http_requests_total",
+        "counter",
+        "API requests by route, method and status",
+        counts,
+      ),
+      formatMetric(
+        "http_request_duration_seconds",
+        "histogram",
+        "API request latency",
+        histogram,
+      ),
+    ];
+  }
+
+  renderProcess() {
+    const toSeconds = (ns) => (Number.isFinite(ns) ? ns / 1e9 : 0);
+    const memory = process.memoryUsage();
+
+    return [
+      formatMetric(
+        "nodejs_eventloop_lag_seconds",
+        "gauge",
+        "Event-loop delay over the current window",
+        [
+          [{ quantile: "0.5" }, toSeconds(this.eventLoop.percentile(50))],
+          [{ quantile: "0.9" }, toSeconds(this.eventLoop.percentile(90))],
+          [{ quantile: "0.99" }, toSeconds(this.eventLoop.percentile(99))],
+        ],
+      ),
+      formatMetric(
+        "nodejs_eventloop_lag_max_seconds",
+        "gauge",
+        "Longest event-loop delay over the current window",
+        [[{}, toSeconds(this.eventLoop.max)]],
+      ),
+      formatMetric(
+        "process_resident_memory_bytes",
+        "gauge",
+        "Resident set size",
+        [[{}, memory.rss]],
+      ),
+      formatMetric(
+        "nodejs_heap_used_bytes",
+        "gauge",
+        "V8 heap in use",
+        [[{}, memory.heapUsed]],
+      ),
+      formatMetric(
+        "process_uptime_seconds",
+        "gauge",
+        "Seconds since the process started",
+        [[{}, process.uptime()]],
+      ),
+    ];
+  }
+
+  // Pass extra metric families (already formatted) to append
+  render(extra = []) {
+    return (
+      [...this.renderRequests(), ...this.renderProcess(), ...extra].join(
+        "\n\n",
+      ) + "\n"
+    );
+  }
+}
+
+// In development, keep one registry across HMR reloads.
+let registry;
+if (process.env.NODE_ENV === "development") {
+  if (!global._metricsRegistry) {
+    global._metricsRegistry = new MetricsRegistry();
+  }
+  registry = global._metricsRegistry;
+} else {
+  registry = new MetricsRegistry();
+}
+
+export const metrics = registry;
@@ -1,30 +1,167 @@
 import { MongoClient } from "mongodb";
 
 const uri = process.env.MONGO_URL;
-const options = {};
+
+function intFromEnv(name, fallback) {
+  const value = parseInt(process.env[name], 10);
+  return Number.isNaN(value) ? fallback : value;
+}
+
+// Pool sizing is per server and per app instance. MONGO_MIN_POOL_SIZE
+// connections are opened at boot (see lib/warmup.js) and kept open, so the
+// first requests after a deploy skip the connect and handshake.
+export const poolOptions = {
+  maxPoolSize: intFromEnv("MONGO_MAX_POOL_SIZE", 100),
+  minPoolSize: intFromEnv("MONGO_MIN_POOL_SIZE", 2),
+  maxIdleTimeMS: intFromEnv("MONGO_MAX_IDLE_TIME_MS", 60000),
+  maxConnecting: intFromEnv("MONGO_MAX_CONNECTING", 2),
+  waitQueueTimeoutMS: intFromEnv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 0),
+};
+
+const options = { ...poolOptions };
+
+const CHECKOUT_SAMPLES = 1024;
+
+function percentile(sorted, pct) {
+  if (sorted.length === 0) return 0;
+  const index = Math.min(
+    sorted.length - 1,
+    Math.ceil((pct / 100) * sorted.length) - 1,
+  );
+  return sorted[Math.max(0, index)];
+}
+
+// Live pool state built from the driver's connection pool (CMAP) events.
+// Counts are summed over every server the client talks to.
+class PoolStats {
+  constructor() {
+    this.open = 0;
+    this.checkedOut = 0;
+    this.waiting = 0;
+
+    this.created = 0;
+    this.closed = 0;
+    this.checkouts = 0;
+    this.checkoutFailures = 0;
+    this.cleared = 0;
+
+    // Ring buffer of recent checkout latencies, in ms
+    this.checkoutSamples = new Float64Array(CHECKOUT_SAMPLES);
+    this.sampleCount = 0;
+  }
+
+  attach(client) {
+    client.on("connectionCreated", () => {
+      this.open++;
+      this.created++;
+    });
+    client.on("connectionClosed", () => {
+      this.open--;
+      this.closed++;
+    });
+    client.on("connectionCheckOutStarted", () => {
+      this.waiting++;
+    });
+    client.on("connectionCheckedOut", (event) => {
+      this.waiting--;
+      this.checkedOut++;
+      this.checkouts++;
+      this.checkoutSamples[this.sampleCount++ % CHECKOUT_SAMPLES] =
+        event.durationMS ?? 0;
+    });
+    client.on("connectionCheckOutFailed", () => {
+      this.waiting--;
+      this.checkoutFailures++;
+    });
+    client.on("connectionCheckedIn", () => {
+      this.checkedOut--;
+    });
+    client.on("connectionPoolCleared", () => {
+      this.cleared++;
+    });
+  }
+
+  snapshot() {
+    const samples = Array.from(
+      this.checkoutSamples.subarray(
+        0,
+        Math.min(this.sampleCount, CHECKOUT_SAMPLES),
+      ),
+    ).sort((a, b) => a - b);
+
+    return {
+      ...poolOptions,
+      open: this.open,
+      checkedOut: this.checkedOut,
+      available: this.open - this.checkedOut,
+      waitQueue: this.waiting,
+      created: this.created,
+      closed: this.closed,
+      checkouts: this.checkouts,
+      checkoutFailures: this.checkoutFailures,
+      cleared: this.cleared,
+      checkoutMs: {
+        samples: samples.length,
+        p50: percentile(samples, 50),
+        p95: percentile(samples, 95),
+        p99: percentile(samples, 99),
+        max: samples[samples.length - 1] || 0,
+      },
+    };
+  }
+}
 
 let client;
 let clientPromise;
+let poolStats;
 
 if (process.env.NODE_ENV === "development") {
   // In development mode, use a global variable so that the value
   // is preserved across module reloads caused by HMR (Hot Module Reloading).
   if (!global._mongoClientPromise) {
     client = new MongoClient(uri, options);
+    global._mongoPoolStats = new PoolStats();
+    global._mongoPoolStats.attach(client);
     global._mongoClientPromise = client.connect();
   }
   clientPromise = global._mongoClientPromise;
+  poolStats = global._mongoPoolStats;
 } else {
   // In production mode, it's best to not use a global variable.
   client = new MongoClient(uri, options);
+  poolStats = new PoolStats();
+  poolStats.attach(client);
   clientPromise = client.connect();
 }
 
 export default clientPromise;
 
-export async function getDb() {
-  const client = await clientPromise;
-  return client.db(process.env.DB_NAME || "stream_house");
+let dbPromise;
+
+// Resolved once; repositories call this on every operation.
+export function getDb() {
+  if (!dbPromise) {
+    dbPromise = clientPromise.then((client) =>
+      client.db(process.env.DB_NAME || "stream_house"),
+    );
+  }
+  return dbPromise;
+}
+
+export function getPoolStats() {
+  return poolStats.snapshot();
+}
+
+// Opens minPoolSize connections now rather than on first use. Concurrent
+// pings each need their own connection, so the pool has to grow to fit them.
+export async function warmPool(connections = poolOptions.minPoolSize) {
+  const db = await getDb();
+  await Promise.all(
+    Array.from({ length: Math.max(1, connections) }, () =>
+      db.admin().ping(),
+    ),
+  );
+  return poolStats.open;
 }
 
 export async function connectDB() {
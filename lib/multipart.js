@@ -0,0 +1,207 @@
+import { Readable } from "stream";
+
+// Minimal streaming multipart/form-data reader. It hands back one file field
+// as a Node stream without buffering the body, so uploads can be piped
+// straight into storage with size limits enforced as bytes arrive.
+
+const HEADER_END = Buffer.from("\r\n\r\n");
+const MAX_HEADER_BYTES = 16 * 1024;
+
+// Room for boundaries and part headers on top of the file itself
+const MULTIPART_OVERHEAD_BYTES = 64 * 1024;
+
+export class MultipartError extends Error {
+  constructor(message, status = 400) {
+    super(message);
+    this.name = "MultipartError";
+    this.status = status;
+  }
+}
+
+function getBoundary(contentType) {
+  const match = /boundary=(?:"([^"]+)"|([^;]+))/i.exec(contentType || "");
+  return match ? match[1] || match[2].trim() : null;
+}
+
+function parsePartHeaders(raw) {
+  const headers = {};
+  for (const line of raw.split("\r\n")) {
+    const separator = line.indexOf(":");
+    if (separator > 0) {
+      headers[line.slice(0, separator).trim().toLowerCase()] = line
+        .slice(separator + 1)
+        .trim();
+    }
+  }
+
+  const disposition = headers["content-disposition"] || "";
+
+  return {
+    name: /\bname="([^"]*)"/i.exec(disposition)?.[1] ?? null,
+    filename: /\bfilename="([^"]*)"/i.exec(disposition)?.[1] ?? null,
+    contentType: headers["content-type"] || "application/octet-stream",
+  };
+}
+
+class BodyReader {
+  constructor(body) {
+    this.reader = body.getReader();
+    this.buffer = Buffer.alloc(0);
+  }
+
+  async fill() {
+    const { value, done } = await this.reader.read();
+    if (done) return false;
+
+    const chunk = Buffer.from(value.buffer, value.byteOffset, value.byteLength);
+    this.buffer =
+      this.buffer.length > 0 ? Buffer.concat([this.buffer, chunk]) : chunk;
+    return true;
+  }
+
+  async take(length) {
+    while (this.buffer.length < length) {
+      if (!(await this.fill())) {
+        throw new MultipartError("Malformed multipart body");
+      }
+    }
+
+    const bytes = this.buffer.subarray(0, length);
+    this.buffer = this.buffer.subarray(length);
+    return bytes;
+  }
+
+  async readUntil(delimiter, maxBytes) {
+    for (;;) {
+      const index = this.buffer.indexOf(delimiter);
+      if (index !== -1) {
+        const bytes = this.buffer.subarray(0, index);
+        this.buffer = this.buffer.subarray(index + delimiter.length);
+        return bytes;
+      }
+
+      if (this.buffer.length > maxBytes || !(await this.fill())) {
+        throw new MultipartError("Malformed multipart body");
+      }
+    }
+  }
+
+  // Discards bytes up to and including the delimiter, holding on to no more
+  // than a delimiter's worth of data between chunks.
+  async skipUntil(delimiter) {
+    for (;;) {
+      const index = this.buffer.indexOf(delimiter);
+      if (index !== -1) {
+        this.buffer = this.buffer.subarray(index + delimiter.length);
+        return;
+      }
+
+      const keep = delimiter.length - 1;
+      if (this.buffer.length > keep) {
+        this.buffer = this.buffer.subarray(this.buffer.length - keep);
+      }
+
+      if (!(await this.fill())) {
+        throw new MultipartError("Malformed multipart body");
+      }
+    }
+  }
+
+  cancel() {
+    this.reader.cancel().catch(() => {});
+  }
+}
+
+async function* streamPart(reader, delimiter, maxBytes, upload) {
+  const tail = delimiter.length - 1;
+
+  try {
+    for (;;) {
+      const index = reader.buffer.indexOf(delimiter);
+      const end = index !== -1 ? index : reader.buffer.length - tail;
+
+      if (end > 0) {
+        const chunk = reader.buffer.subarray(0, end);
+        reader.buffer = reader.buffer.subarray(end);
+
+        upload.size += chunk.length;
+        if (upload.size > maxBytes) {
+          upload.tooLarge = true;
+          throw new MultipartError("File is too large", 413);
+        }
+
+        yield chunk;
+      }
+
+      if (index !== -1) return;
+
+      if (!(await reader.fill())) {
+        throw new MultipartError("Unexpected end of upload");
+      }
+    }
+  } finally {
+    // Anything after the file field is ignored
+    reader.cancel();
+  }
+}
+
+// Returns { filename, contentType, stream, size, tooLarge, cancel } for the
+// named file field, or null if the body has no such field. `size` and
+// `tooLarge` update as the stream is consumed; the stream errors once
+// maxBytes is exceeded so the consumer can abort. Call cancel() to reject
+// the upload without reading it.
+export async function openMultipartFile(request, { field, maxBytes }) {
+  const boundary = getBoundary(request.headers.get("content-type"));
+  if (!boundary || !request.body) {
+    throw new MultipartError("Expected a multipart/form-data body");
+  }
+
+  const contentLength = parseInt(request.headers.get("content-length"), 10);
+  if (contentLength > maxBytes + MULTIPART_OVERHEAD_BYTES) {
+    throw new MultipartError("File is too large", 413);
+  }
+
+  const reader = new BodyReader(request.body);
+  const delimiter = Buffer.from(`\r\n--${boundary}`);
+
+  try {
+    await reader.skipUntil(Buffer.from(`--${boundary}`));
+
+    for (;;) {
+      // "--" after a boundary closes the body; otherwise a part follows
+      if ((await reader.take(2)).toString() === "--") {
+        reader.cancel();
+        return null;
+      }
+
+      const part = parsePartHeaders(
+        (await reader.readUntil(HEADER_END, MAX_HEADER_BYTES)).toString("utf8"),
+      );
+
+      if (part.name === field && part.filename !== null) {
+        const upload = {
+          filename: part.filename,
+          contentType: part.contentType,
+          size: 0,
+          tooLarge: false,
+        };
+        upload.stream = Readable.from(
+          streamPart(reader, delimiter, maxBytes, upload),
+          { objectMode: false },
+        );
+        // Destroying a stream that was never read doesn't run streamPart's
+        // finally, so release the body here too
+        upload.cancel = () => {
+          upload.stream.destroy();
+          reader.cancel();
+        };
+        return upload;
+      }
+
+      await reader.skipUntil(delimiter);
+    }
+  } catch (error) {
+    reader.cancel();
+    throw error;
+  }
+}
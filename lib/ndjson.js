@@ -0,0 +1,125 @@
+// Newline-delimited JSON over web streams, for bulk transfers that must not
+// hold a whole collection in memory. Both directions are pull-driven: the
+// export only reads from its source when the client is ready for more, and
+// the import only reads more of the request body once the caller has
+// handled the lines it already has.
+
+const encoder = new TextEncoder();
+
+// Roughly how much text is gathered into each chunk sent to the client
+const CHUNK_CHARS = 64 * 1024;
+
+export class NdjsonError extends Error {
+  constructor(message, status = 400) {
+    super(message);
+    this.name = "NdjsonError";
+    this.status = status;
+  }
+}
+
+// A byte stream with one JSON document per line, taken from an async
+// iterator. onEnd receives { count, bytes, error } once the stream finishes,
+// fails or is cancelled by the client. A failure after the first chunk can
+// only abort the response, so clients should treat a missing final newline
+// as a truncated export.
+export function toNdjsonStream(iterator, { onEnd = () => {} } = {}) {
+  let count = 0;
+  let bytes = 0;
+  let ended = false;
+
+  const end = (error = null) => {
+    if (ended) return;
+    ended = true;
+    onEnd({ count, bytes, error });
+  };
+
+  const send = (controller, text) => {
+    const chunk = encoder.encode(text);
+    bytes += chunk.byteLength;
+    controller.enqueue(chunk);
+  };
+
+  return new ReadableStream({
+    async pull(controller) {
+      try {
+        let text = "";
+        while (text.length < CHUNK_CHARS) {
+          const { value, done } = await iterator.next();
+          if (done) {
+            if (text) send(controller, text);
+            controller.close();
+            end();
+            return;
+          }
+
+          text += JSON.stringify(value) + "\n";
+          count++;
+        }
+        send(controller, text);
+      } catch (error) {
+        end(error);
+        controller.error(error);
+      }
+    },
+
+    async cancel() {
+      end();
+      await iterator.return?.();
+    },
+  });
+}
+
+// Yields { lineNumber, value } for each non-blank line of a byte stream, or
+// { lineNumber, error } for a line that isn't valid JSON. A line longer than
+// maxLineLength characters throws NdjsonError with status 413.
+export async function* readNdjson(body, { maxLineLength = 1024 * 1024 } = {}) {
+  const reader = body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let lineNumber = 0;
+  let finished = false;
+
+  const parse = (line) => {
+    lineNumber++;
+    const text = line.trim();
+    if (!text) return null;
+
+    try {
+      return { lineNumber, value: JSON.parse(text) };
+    } catch (error) {
+      return { lineNumber, error: "Invalid JSON" };
+    }
+  };
+
+  try {
+    while (!finished) {
+      const { value, done } = await reader.read();
+      finished = done;
+      buffer += done
+        ? decoder.decode()
+        : decoder.decode(value, { stream: true });
+
+      let start = 0;
+      let newline;
+      while ((newline = buffer.indexOf("\n", start)) !== -1) {
+        const entry = parse(buffer.slice(start, newline));
+        start = newline + 1;
+        if (entry) yield entry;
+      }
+      buffer = buffer.slice(start);
+
+      if (buffer.length > maxLineLength) {
+        throw new NdjsonError(
+          `Line ${lineNumber + 1} is longer than ${maxLineLength} characters`,
+          413,
+        );
+      }
+    }
+
+    const last = parse(buffer);
+    if (last) yield last;
+  } finally {
+    // Stop the upload if the caller gave up before the end
+    if (!finished) await reader.cancel().catch(() => {});
+  }
+}
@@ -0,0 +1,94 @@
+import os from "os";
+import bcrypt from "bcryptjs";
+import { measure } from "./request-timing.js";
+import { WorkerPool } from "./worker-pool.js";
+
+// bcryptjs is pure JS, so a cost-12 hash or compare holds the event loop for
+// tens of milliseconds. Run them on a bounded pool of worker threads instead.
+// PASSWORD_HASH_WORKERS=0 falls back to hashing inline on the main thread.
+// The worker requires bcryptjs from eval'd source, which output tracing can't
+// follow; next.config.js copies it into standalone builds.
+const POOL_SIZE = parseInt(
+  process.env.PASSWORD_HASH_WORKERS ||
+    String(Math.max(1, Math.min(4, os.cpus().length - 1))),
+  10,
+);
+const MAX_QUEUE = parseInt(process.env.PASSWORD_HASH_MAX_QUEUE || "100", 10);
+
+const WORKER_SOURCE = `
+const { parentPort } = require("worker_threads");
+const bcrypt = require("bcryptjs");
+
+parentPort.on("message", ({ id, op, password, hash, rounds }) => {
+  try {
+    const result =
+      op === "hash"
+        ? bcrypt.hashSync(password, rounds)
+        : bcrypt.compareSync(password, hash);
+    parentPort.postMessage({ id, result });
+  } catch (error) {
+    parentPort.postMessage({ id, error: error.message });
+  }
+});
+`;
+
+export class HashQueueFullError extends Error {
+  constructor() {
+    super("Password hashing queue is full");
+    this.name = "HashQueueFullError";
+  }
+}
+
+class PasswordHasherPool extends WorkerPool {
+  constructor({ size, maxQueue }) {
+    super({
+      name: "Password hasher",
+      source: WORKER_SOURCE,
+      size,
+      maxQueue,
+      queueFullError: () => new HashQueueFullError(),
+    });
+  }
+
+  // Timed as one "bcrypt" phase, including any wait for a free worker
+  hash(password, rounds) {
+    return measure("bcrypt", () => this.run({ op: "hash", password, rounds }));
+  }
+
+  compare(password, hash) {
+    return measure("bcrypt", () => this.run({ op: "compare", password, hash }));
+  }
+
+  async run(task) {
+    if (this.size <= 0) return this.runInline(task);
+    return super.run(task);
+  }
+
+  async runInline({ op, password, hash, rounds }) {
+    const startedAt = performance.now();
+    const result =
+      op === "hash"
+        ? await bcrypt.hash(password, rounds)
+        : await bcrypt.compare(password, hash);
+    this.totalRunMs += performance.now() - startedAt;
+    this.completed++;
+    return result;
+  }
+}
+
+function createPasswordHasher() {
+  return new PasswordHasherPool({ size: POOL_SIZE, maxQueue: MAX_QUEUE });
+}
+
+// In development, keep one pool across HMR reloads instead of leaking workers.
+let hasher;
+if (process.env.NODE_ENV === "development") {
+  if (!global._passwordHasher) {
+    global._passwordHasher = createPasswordHasher();
+  }
+  hasher = global._passwordHasher;
+} else {
+  hasher = createPasswordHasher();
+}
+
+export const passwordHasher = hasher;
@@ -0,0 +1,83 @@
+import { LRUCache } from "./lru-cache.js";
+import { mongoUserRepo } from "./repositories/mongodb-user.js";
+
+// Serialized public profile responses keyed by lowercase username, so a
+// repeat view is a Map lookup with no database read or JSON.stringify.
+// Entries are dropped whenever the user repository invalidates that user
+// (settings and avatar updates, and change-stream events when enabled), and
+// PROFILE_CACHE_TTL_MS bounds staleness from writes on other instances.
+// PROFILE_CACHE_MAX=0 disables it.
+
+const PROFILE_CACHE_MAX = parseInt(process.env.PROFILE_CACHE_MAX || "2000", 10);
+const PROFILE_CACHE_TTL_MS = parseInt(
+  process.env.PROFILE_CACHE_TTL_MS || "60000",
+  10,
+);
+
+class ProfileCache {
+  constructor() {
+    // Invalidations arrive by user id; entries are keyed by username
+    this.usernamesById = new Map();
+    this.generation = 0;
+    this.notModified = 0;
+    this.entries = new LRUCache({
+      max: PROFILE_CACHE_MAX,
+      ttlMs: PROFILE_CACHE_TTL_MS,
+      onRemove: (username, entry) => this.usernamesById.delete(entry.userId),
+    });
+  }
+
+  get(username) {
+    return this.entries.get(username);
+  }
+
+  // generation is read before the database lookup; if an invalidation
+  // happened in between, the entry may predate the write and isn't kept.
+  set(username, entry, generation) {
+    if (generation !== this.generation) return;
+
+    this.entries.set(username, entry);
+    this.usernamesById.set(entry.userId, username);
+  }
+
+  invalidateUser(id) {
+    this.generation++;
+    const username = this.usernamesById.get(id);
+    if (username) this.entries.delete(username);
+  }
+
+  clear() {
+    this.generation++;
+    this.entries.clear();
+  }
+
+  recordNotModified() {
+    this.notModified++;
+  }
+
+  stats() {
+    return { ...this.entries.stats(), notModified: this.notModified };
+  }
+}
+
+// In development, keep one cache across HMR reloads.
+let cache;
+if (process.env.NODE_ENV === "development") {
+  if (!global._profileCache) {
+    global._profileCache = new ProfileCache();
+  }
+  cache = global._profileCache;
+} else {
+  cache = new ProfileCache();
+}
+
+// Subscribed per module load so it follows the current repository instance
+mongoUserRepo.onInvalidate((id) => {
+  if (id) {
+    cache.invalidateUser(id);
+  } else {
+    cache.clear();
+  }
+});
+
+export const profileCache = cache;
@@ -0,0 +1,236 @@
+import { createHash } from "node:crypto";
+import { NextResponse } from "next/server";
+import { LRUCache } from "./lru-cache.js";
+import { passwordHasher } from "./password-hasher.js";
+import { mongoRateLimitRepo } from "./repositories/mongodb-rate-limit.js";
+
+// Admission control for the bcrypt-backed auth routes (login and signup).
+//
+// A global in-flight cap sheds load with 503 once AUTH_MAX_IN_FLIGHT
+// requests are running, so a burst can't queue enough bcrypt work to starve
+// other routes. Admitted attempts then take a token from two buckets, one
+// per client IP and one per email address, before the database or the
+// hasher is touched; an empty bucket is answered with 429 and Retry-After.
+//
+//   AUTH_IP_BURST / AUTH_IP_PER_MINUTE        default 20 / 10
+//   AUTH_EMAIL_BURST / AUTH_EMAIL_PER_MINUTE  default 5 / 2
+//   AUTH_MAX_IN_FLIGHT       default 4 per hashing worker, at least 4
+//   AUTH_RATE_LIMIT_STORE    "memory" (default, per instance) or "mongo"
+//                            to share buckets across instances
+//   TRUSTED_PROXY_HOPS       proxies in front of the app that append to
+//                            X-Forwarded-For, default 0
+//   TRUST_X_REAL_IP          "true" if the proxy overwrites X-Real-IP
+//
+// Per-IP limiting needs one of the last two; without them the client IP
+// can't be trusted, so only the per-email buckets and the in-flight cap
+// apply.
+//
+// With the mongo store, a failed database call falls back to the local
+// bucket rather than letting the request through unlimited.
+
+function intFromEnv(name, fallback) {
+  const value = parseInt(process.env[name], 10);
+  return Number.isNaN(value) ? fallback : value;
+}
+
+const RATE_LIMIT_STORE = process.env.AUTH_RATE_LIMIT_STORE || "memory";
+const MAX_KEYS = intFromEnv("AUTH_RATE_LIMIT_MAX_KEYS", 50000);
+
+// Buckets held in this process. An entry expires once it would be full
+// again, which is the same as not having one.
+export class MemoryBucketStore {
+  constructor({ max, ttlMs }) {
+    this.buckets = new LRUCache({ max, ttlMs });
+  }
+
+  takeToken(key, { capacity, refillPerMs }, cost = 1) {
+    const now = Date.now();
+    const bucket = this.buckets.get(key);
+    const tokens = bucket
+      ? Math.min(capacity, bucket.tokens + (now - bucket.at) * refillPerMs)
+      : capacity;
+
+    const allowed = tokens >= cost;
+    const remaining = allowed ? tokens - cost : tokens;
+    this.buckets.set(key, { tokens: remaining, at: now });
+
+    return { allowed, tokens: remaining };
+  }
+}
+
+export class TokenBucket {
+  constructor({ capacity, perMinute, store = null }) {
+    this.capacity = capacity;
+    this.refillPerMs = perMinute / 60000;
+    this.store = store;
+    this.local = new MemoryBucketStore({
+      max: MAX_KEYS,
+      ttlMs: Math.ceil(capacity / this.refillPerMs),
+    });
+  }
+
+  // Returns 0 if a token was taken, otherwise the seconds until one is free
+  async take(key) {
+    const bucket = { capacity: this.capacity, refillPerMs: this.refillPerMs };
+    const result =
+      (this.store && (await this.store.takeToken(key, bucket))) ||
+      this.local.takeToken(key, bucket);
+
+    if (result.allowed) return 0;
+    const waitMs = (1 - result.tokens) / this.refillPerMs;
+    return Math.max(1, Math.ceil(waitMs / 1000));
+  }
+}
+
+// Counts requests in progress and refuses new ones past `max`
+export class ConcurrencyLimiter {
+  constructor(max) {
+    this.max = max;
+    this.active = 0;
+    this.shed = 0;
+  }
+
+  // Returns a release function, or null if the limit is reached
+  tryAcquire() {
+    if (this.active >= this.max) {
+      this.shed++;
+      return null;
+    }
+
+    this.active++;
+    let released = false;
+    return () => {
+      if (released) return;
+      released = true;
+      this.active--;
+    };
+  }
+}
+
+const TRUSTED_PROXY_HOPS = Math.max(0, intFromEnv("TRUSTED_PROXY_HOPS", 0));
+const TRUST_X_REAL_IP = process.env.TRUST_X_REAL_IP === "true";
+// Proxies append to X-Forwarded-For, so only the entries they wrote, counted
+// from the right, can be trusted; anything left of them came from the client.
+// With TRUSTED_PROXY_HOPS=N the client is the Nth entry from the right, the
+// address the outermost proxy saw. Otherwise X-Real-IP is used if the proxy
+// is known to overwrite it (nginx `$remote_addr`, Vercel). Returns null when
+// neither can be trusted.
+export function clientIp(request) {
+  if (TRUSTED_PROXY_HOPS > 0) {
+    const hops = (request.headers.get("x-forwarded-for") || "")
+      .split(",")
+      .map((hop) => hop.trim())
+      .filter(Boolean);
+    if (hops.length < TRUSTED_PROXY_HOPS) return null;
+    return hops[hops.length - TRUSTED_PROXY_HOPS];
+  }
+
+  if (TRUST_X_REAL_IP) {
+    return request.headers.get("x-real-ip")?.trim() || null;
+  }
+
+  return null;
+}
+
+// Email keys are hashed so the shared store holds no addresses
+function emailKey(email) {
+  return createHash("sha256")
+    .update(String(email).trim().toLowerCase())
+    .digest("base64url");
+}
+
+class AuthAdmission {
+  constructor() {
+    const store = RATE_LIMIT_STORE === "mongo" ? mongoRateLimitRepo : null;
+
+    this.byIp = new TokenBucket({
+      capacity: intFromEnv("AUTH_IP_BURST", 20),
+      perMinute: intFromEnv("AUTH_IP_PER_MINUTE", 10),
+      store,
+    });
+    this.byEmail = new TokenBucket({
+      capacity: intFromEnv("AUTH_EMAIL_BURST", 5),
+      perMinute: intFromEnv("AUTH_EMAIL_PER_MINUTE", 2),
+      store,
+    });
+    this.inFlight = new ConcurrencyLimiter(
+      intFromEnv(
+        "AUTH_MAX_IN_FLIGHT",
+        Math.max(4, passwordHasher.getStats().poolSize * 4),
+      ),
+    );
+
+    this.limitedByIp = 0;
+    this.limitedByEmail = 0;
+    this.unresolvedIp = 0;
+  }
+
+  // Takes a token for the client IP if it can be resolved, then for the
+  // email if one was given. Unresolved clients skip the IP bucket rather
+  // than share one, which anyone could drain to lock everyone out. Returns
+  // 0 if the attempt may proceed, otherwise the Retry-After seconds.
+  async check(action, request, email) {
+    const ip = clientIp(request);
+    if (ip) {
+      const ipRetry = await this.byIp.take(`${action}:ip:${ip}`);
+      if (ipRetry > 0) {
+        this.limitedByIp++;
+        return ipRetry;
+      }
+    } else {
+      this.unresolvedIp++;
+    }
+
+    if (!email) return 0;
+
+    const emailRetry = await this.byEmail.take(
+      `${action}:email:${emailKey(email)}`,
+    );
+    if (emailRetry > 0) this.limitedByEmail++;
+    return emailRetry;
+  }
+
+  // Wraps a route handler so it only runs while holding an in-flight slot
+  limit(handler) {
+    return async (request, context) => {
+      const release = this.inFlight.tryAcquire();
+      if (!release) {
+        return NextResponse.json(
+          { error: "Server is busy, please try again" },
+          { status: 503, headers: { "Retry-After": "1" } },
+        );
+      }
+
+      try {
+        return await handler(request, context);
+      } finally {
+        release();
+      }
+    };
+  }
+
+  getStats() {
+    return {
+      store: RATE_LIMIT_STORE,
+      inFlight: this.inFlight.active,
+      maxInFlight: this.inFlight.max,
+      shed: this.inFlight.shed,
+      limitedByIp: this.limitedByIp,
+      limitedByEmail: this.limitedByEmail,
+      unresolvedIp: this.unresolvedIp,
+    };
+  }
+}
+
+// In development, keep one set of buckets across HMR reloads.
+let admission;
+if (process.env.NODE_ENV === "development") {
+  if (!global._authAdmission) {
+    global._authAdmission = new AuthAdmission();
+  }
+  admission = global._authAdmission;
+} else {
+  admission = new AuthAdmission();
+}
+
+export const authAdmission = admission;
@@ -0,0 +1,47 @@
+import { getDb } from "../mongodb.js";
+
+// Processed avatar uploads keyed by the SHA-256 of the original bytes, so an
+// image that was already processed and stored (by anyone) is reused without
+// decoding or writing it again. Documents look like
+//   { _id: hash, url, variants: { [size]: url }, width, height, createdAt }
+
+export class MongoAvatarRepository {
+  constructor() {
+    this.collectionName = "avatar_assets";
+    this.collection = null;
+  }
+
+  async getCollection() {
+    if (!this.collection) {
+      const db = await getDb();
+      this.collection = db.collection(this.collectionName);
+    }
+    return this.collection;
+  }
+
+  async getAsset(hash) {
+    try {
+      const collection = await this.getCollection();
+      return await collection.findOne({ _id: hash });
+    } catch (error) {
+      console.error("MongoDB: Error getting avatar asset:", error);
+      return null;
+    }
+  }
+
+  // Two uploads of the same new image can both get here; they wrote the same
+  // keys, so whichever replaces last is equally correct.
+  async saveAsset(asset) {
+    try {
+      const collection = await this.getCollection();
+      await collection.replaceOne({ _id: asset._id }, asset, { upsert: true });
+      return true;
+    } catch (error) {
+      console.error("MongoDB: Error saving avatar asset:", error);
+      return false;
+    }
+  }
+}
+
+// Create a singleton instance
+export const mongoAvatarRepo = new MongoAvatarRepository();
@@ -0,0 +1,175 @@
+import { getDb } from "../mongodb.js";
+import { encodeCursor } from "../cursor.js";
+
+const HOUSE_SORT = { createdAt: -1, id: -1 };
+
+// List views show member counts, not the member ids themselves
+const HOUSE_LIST_PROJECTION = { _id: 0, members: 0 };
+
+const HOUSE_INDEXES = [
+  { key: { id: 1 }, options: { name: "id_unique", unique: true } },
+  {
+    key: { members: 1, ...HOUSE_SORT },
+    options: { name: "members_recent" },
+  },
+  { key: { ownerId: 1, ...HOUSE_SORT }, options: { name: "owner_recent" } },
+];
+
+export class MongoHouseRepository {
+  constructor() {
+    this.collectionName = "houses";
+    this.collection = null;
+    this.indexesPromise = null;
+  }
+
+  async getCollection() {
+    if (!this.collection) {
+      const db = await getDb();
+      this.collection = db.collection(this.collectionName);
+    }
+    const collection = this.collection;
+
+    if (!this.indexesPromise) {
+      // Index builds run in the background; requests don't wait on them.
+      this.indexesPromise = this.ensureIndexes(collection);
+    }
+
+    return collection;
+  }
+
+  async ensureIndexes(collection) {
+    const results = await Promise.allSettled(
+      HOUSE_INDEXES.map(({ key, options }) =>
+        collection.createIndex(key, options),
+      ),
+    );
+
+    results.forEach((result, i) => {
+      if (result.status === "rejected") {
+        console.error(
+          "MongoDB: Error creating index:",
+          HOUSE_INDEXES[i].options.name,
+          result.reason,
+        );
+      }
+    });
+  }
+
+  async createHouse(houseData) {
+    try {
+      const collection = await this.getCollection();
+
+      const house = {
+        ...houseData,
+        members: [houseData.ownerId], // Creator is automatically a member
+        memberCount: 1,
+        totalPoints: 0,
+        createdAt: new Date().toISOString(),
+      };
+
+      await collection.insertOne(house);
+      const { _id, ...created } = house;
+      return created;
+    } catch (error) {
+      console.error("MongoDB: Error creating house:", error);
+      return null;
+    }
+  }
+
+  async getHouseById(id) {
+    try {
+      const collection = await this.getCollection();
+      return await collection.findOne({ id }, { projection: { _id: 0 } });
+    } catch (error) {
+      console.error("MongoDB: Error getting house by ID:", error);
+      return null;
+    }
+  }
+
+  // Newest first, keyset-paginated on (createdAt, id) over the members index
+  async getHousesForUser(
+    userId,
+    { after = null, limit = 20, withTotal = false } = {},
+  ) {
+    try {
+      const collection = await this.getCollection();
+      const filter = { members: userId };
+
+      const pageFilter = after
+        ? {
+            ...filter,
+            $or: [
+              { createdAt: { $lt: after[0] } },
+              { createdAt: after[0], id: { $lt: after[1] } },
+            ],
+          }
+        : filter;
+
+      const [houses, total] = await Promise.all([
+        collection
+          .find(pageFilter, {
+            projection: HOUSE_LIST_PROJECTION,
+            sort: HOUSE_SORT,
+            limit: limit + 1,
+          })
+          .toArray(),
+        withTotal ? collection.countDocuments(filter) : null,
+      ]);
+
+      const hasMore = houses.length > limit;
+      const page = hasMore ? houses.slice(0, limit) : houses;
+      const last = page[page.length - 1];
+
+      return {
+        houses: page,
+        nextCursor: hasMore ? encodeCursor([last.createdAt, last.id]) : null,
+        total,
+      };
+    } catch (error) {
+      console.error("MongoDB: Error getting houses for user:", error);
+      return null;
+    }
+  }
+
+  // Adds the user only if they aren't already a member and the house has
+  // room. The guard and the update are one atomic operation, so concurrent
+  // joins can't push memberCount past maxMembers. Returns null when the
+  // guard fails.
+  async addMember(houseId, userId) {
+    try {
+      const collection = await this.getCollection();
+
+      return await collection.findOneAndUpdate(
+        {
+          id: houseId,
+          members: { $ne: userId },
+          $expr: { $lt: ["$memberCount", "$maxMembers"] },
+        },
+        { $addToSet: { members: userId }, $inc: { memberCount: 1 } },
+        { returnDocument: "after", projection: HOUSE_LIST_PROJECTION },
+      );
+    } catch (error) {
+      console.error("MongoDB: Error adding house member:", error);
+      return null;
+    }
+  }
+
+  // The owner can't leave their own house
+  async removeMember(houseId, userId) {
+    try {
+      const collection = await this.getCollection();
+
+      return await collection.findOneAndUpdate(
+        { id: houseId, members: userId, ownerId: { $ne: userId } },
+        { $pull: { members: userId }, $inc: { memberCount: -1 } },
+        { returnDocument: "after", projection: HOUSE_LIST_PROJECTION },
+      );
+    } catch (error) {
+      console.error("MongoDB: Error removing house member:", error);
+      return null;
+    }
+  }
+}
+
+// Create a singleton instance
+export const mongoHouseRepo = new MongoHouseRepository();
@@ -0,0 +1,279 @@
+import { getDb } from "../mongodb.js";
+import { v4 as uuidv4 } from "uuid";
+import { encodeCursor } from "../cursor.js";
+
+const CONVERSATION_SORT = { updatedAt: -1, id: -1 };
+const MESSAGE_SORT = { createdAt: -1, id: -1 };
+
+const MAX_PREVIEW_LENGTH = 200;
+
+const COLLECTION_INDEXES = {
+  conversations: [
+    { key: { id: 1 }, options: { name: "id_unique", unique: true } },
+    { key: { key: 1 }, options: { name: "key_unique", unique: true } },
+    {
+      key: { participants: 1, ...CONVERSATION_SORT },
+      options: { name: "participants_recent" },
+    },
+  ],
+  messages: [
+    { key: { id: 1 }, options: { name: "id_unique", unique: true } },
+    {
+      key: { conversationId: 1, ...MESSAGE_SORT },
+      options: { name: "conversation_history" },
+    },
+  ],
+};
+
+function keysetFilter(filter, sortField, after) {
+  if (!after) return filter;
+
+  return {
+    ...filter,
+    $or: [
+      { [sortField]: { $lt: after[0] } },
+      { [sortField]: after[0], id: { $lt: after[1] } },
+    ],
+  };
+}
+
+export class MongoMessageRepository {
+  constructor() {
+    this.collections = null;
+    this.indexesPromise = null;
+  }
+
+  async getCollections() {
+    if (!this.collections) {
+      const db = await getDb();
+      this.collections = {
+        conversations: db.collection("conversations"),
+        messages: db.collection("messages"),
+      };
+    }
+    const collections = this.collections;
+
+    if (!this.indexesPromise) {
+      // Index builds run in the background; requests don't wait on them.
+      this.indexesPromise = this.ensureIndexes(collections);
+    }
+
+    return collections;
+  }
+
+  async ensureIndexes(collections) {
+    const specs = Object.entries(COLLECTION_INDEXES).flatMap(
+      ([name, indexes]) => indexes.map((index) => ({ name, ...index })),
+    );
+
+    const results = await Promise.allSettled(
+      specs.map(({ name, key, options }) =>
+        collections[name].createIndex(key, options),
+      ),
+    );
+
+    results.forEach((result, i) => {
+      if (result.status === "rejected") {
+        console.error(
+          "MongoDB: Error creating index:",
+          `${specs[i].name}.${specs[i].options.name}`,
+          result.reason,
+        );
+      }
+    });
+  }
+
+  // One conversation per pair of users, created on first use
+  async getOrCreateDirectConversation(userId, otherUserId) {
+    const participants = [userId, otherUserId].sort();
+    const key = `direct:${participants.join(":")}`;
+
+    try {
+      const { conversations } = await this.getCollections();
+      const now = new Date().toISOString();
+
+      try {
+        return await conversations.findOneAndUpdate(
+          { key },
+          {
+            // key itself comes from the upsert filter
+            $setOnInsert: {
+              id: uuidv4(),
+              participants,
+              createdAt: now,
+              updatedAt: now,
+              lastMessage: null,
+              unread: Object.fromEntries(participants.map((p) => [p, 0])),
+            },
+          },
+          { upsert: true, returnDocument: "after", projection: { _id: 0 } },
+        );
+      } catch (error) {
+        // Two first messages raced on the upsert; the other one won
+        if (error?.code !== 11000) throw error;
+        return await conversations.findOne(
+          { key },
+          { projection: { _id: 0 } },
+        );
+      }
+    } catch (error) {
+      console.error(
+        "MongoDB: Error getting or creating conversation:",
+        error,
+      );
+      return null;
+    }
+  }
+
+  async getConversationForParticipant(conversationId, userId) {
+    try {
+      const { conversations } = await this.getCollections();
+      return await conversations.findOne(
+        { id: conversationId, participants: userId },
+        { projection: { _id: 0 } },
+      );
+    } catch (error) {
+      console.error("MongoDB: Error getting conversation:", error);
+      return null;
+    }
+  }
+
+  // Most recently active first, keyset-paginated on (updatedAt, id)
+  async getConversationsForUser(userId, { after = null, limit = 20 } = {}) {
+    try {
+      const { conversations } = await this.getCollections();
+
+      const items = await conversations
+        .find(keysetFilter({ participants: userId }, "updatedAt", after), {
+          projection: { _id: 0, key: 0 },
+          sort: CONVERSATION_SORT,
+          limit: limit + 1,
+        })
+        .toArray();
+
+      const hasMore = items.length > limit;
+      const page = hasMore ? items.slice(0, limit) : items;
+      const last = page[page.length - 1];
+
+      return {
+        conversations: page,
+        nextCursor: hasMore ? encodeCursor([last.updatedAt, last.id]) : null,
+      };
+    } catch (error) {
+      console.error("MongoDB: Error getting conversations:", error);
+      return null;
+    }
+  }
+
+  // Newest first, keyset-paginated on (createdAt, id) for scrolling back
+  async getMessages(conversationId, { after = null, limit = 50 } = {}) {
+    try {
+      const { messages } = await this.getCollections();
+
+      const items = await messages
+        .find(keysetFilter({ conversationId }, "createdAt", after), {
+          projection: { _id: 0, participantIds: 0 },
+          sort: MESSAGE_SORT,
+          limit: limit + 1,
+        })
+        .toArray();
+
+      const hasMore = items.length > limit;
+      const page = hasMore ? items.slice(0, limit) : items;
+      const last = page[page.length - 1];
+
+      return {
+        messages: page,
+        nextCursor: hasMore ? encodeCursor([last.createdAt, last.id]) : null,
+      };
+    } catch (error) {
+      console.error("MongoDB: Error getting messages:", error);
+      return null;
+    }
+  }
+
+  // Stores the message and bumps every other participant's unread counter.
+  // participantIds rides along on the message so change-stream consumers
+  // know who to deliver to without reading the conversation.
+  async sendMessage(conversation, sender, body) {
+    try {
+      const { conversations, messages } = await this.getCollections();
+
+      const message = {
+        id: uuidv4(),
+        conversationId: conversation.id,
+        participantIds: conversation.participants,
+        senderId: sender.id,
+        senderName: sender.displayName,
+        body,
+        createdAt: new Date().toISOString(),
+      };
+
+      const unreadIncrements = Object.fromEntries(
+        conversation.participants
+          .filter((p) => p !== sender.id)
+          .map((p) => [`unread.${p}`, 1]),
+      );
+
+      await Promise.all([
+        messages.insertOne(message),
+        conversations.updateOne(
+          { id: conversation.id },
+          {
+            $set: {
+              updatedAt: message.createdAt,
+              lastMessage: {
+                id: message.id,
+                senderId: sender.id,
+                body: body.slice(0, MAX_PREVIEW_LENGTH),
+                createdAt: message.createdAt,
+              },
+            },
+            $inc: unreadIncrements,
+          },
+        ),
+      ]);
+
+      const { _id, ...created } = message;
+      return created;
+    } catch (error) {
+      console.error("MongoDB: Error sending message:", error);
+      return null;
+    }
+  }
+
+  async markRead(conversationId, userId) {
+    try {
+      const { conversations } = await this.getCollections();
+      const result = await conversations.updateOne(
+        { id: conversationId, participants: userId },
+        { $set: { [`unread.${userId}`]: 0 } },
+      );
+      return result.matchedCount > 0;
+    } catch (error) {
+      console.error("MongoDB: Error marking conversation read:", error);
+      return false;
+    }
+  }
+
+  // Unread messages across all of the user's conversations, or null if the
+  // count failed
+  async getUnreadCount(userId) {
+    try {
+      const { conversations } = await this.getCollections();
+      const [result] = await conversations
+        .aggregate([
+          { $match: { participants: userId } },
+          { $group: { _id: null, total: { $sum: `$unread.${userId}` } } },
+        ])
+        .toArray();
+      return result?.total || 0;
+    } catch (error) {
+      console.error("MongoDB: Error getting unread count:", error);
+      return null;
+    }
+  }
+}
+
+// Create a singleton instance
+export const mongoMessageRepo = new MongoMessageRepository();
@@ -0,0 +1,113 @@
+import { getDb } from "../mongodb.js";
+
+// Token buckets shared by every app instance. Each bucket is one document
+// keyed by the limiter key; a TTL index drops it once it would have refilled.
+
+const RATE_LIMIT_INDEXES = [
+  {
+    key: { expiresAt: 1 },
+    options: { name: "expires_ttl", expireAfterSeconds: 0 },
+  },
+];
+
+export class MongoRateLimitRepository {
+  constructor() {
+    this.collectionName = "rate_limits";
+    this.collection = null;
+    this.indexesPromise = null;
+  }
+
+  async getCollection() {
+    if (!this.collection) {
+      const db = await getDb();
+      this.collection = db.collection(this.collectionName);
+    }
+    const collection = this.collection;
+
+    if (!this.indexesPromise) {
+      // Index builds run in the background; requests don't wait on them.
+      this.indexesPromise = this.ensureIndexes(collection);
+    }
+
+    return collection;
+  }
+
+  async ensureIndexes(collection) {
+    const results = await Promise.allSettled(
+      RATE_LIMIT_INDEXES.map(({ key, options }) =>
+        collection.createIndex(key, options),
+      ),
+    );
+
+    results.forEach((result, i) => {
+      if (result.status === "rejected") {
+        console.error(
+          "MongoDB: Error creating index:",
+          RATE_LIMIT_INDEXES[i].options.name,
+          result.reason,
+        );
+      }
+    });
+  }
+
+  // Refills the bucket for the time since its last use and takes `cost`
+  // tokens if there are enough, in one atomic update. Uses the server clock
+  // ($$NOW) so instances with skewed clocks agree. Returns
+  // { allowed, tokens }, or null if the database is unavailable.
+  async takeToken(key, { capacity, refillPerMs }, cost = 1) {
+    const refilled = {
+      $min: [
+        capacity,
+        {
+          $add: [
+            { $ifNull: ["$tokens", capacity] },
+            {
+              $multiply: [
+                { $subtract: ["$$NOW", { $ifNull: ["$updatedAt", "$$NOW"] }] },
+                refillPerMs,
+              ],
+            },
+          ],
+        },
+      ],
+    };
+
+    const update = [
+      { $set: { tokens: refilled, updatedAt: "$$NOW" } },
+      { $set: { allowed: { $gte: ["$tokens", cost] } } },
+      {
+        $set: {
+          tokens: {
+            $cond: ["$allowed", { $subtract: ["$tokens", cost] }, "$tokens"],
+          },
+          expiresAt: { $add: ["$$NOW", Math.ceil(capacity / refillPerMs)] },
+        },
+      },
+    ];
+
+    try {
+      const collection = await this.getCollection();
+
+      // Two first requests for the same key can both try to insert; the
+      // loser retries as an update.
+      for (let attempt = 1; ; attempt++) {
+        try {
+          const bucket = await collection.findOneAndUpdate(
+            { _id: key },
+            update,
+            { upsert: true, returnDocument: "after" },
+          );
+          return { allowed: bucket.allowed, tokens: bucket.tokens };
+        } catch (error) {
+          if (error?.code !== 11000 || attempt >= 2) throw error;
+        }
+      }
+    } catch (error) {
+      console.error("MongoDB: Error taking rate limit token:", error);
+      return null;
+    }
+  }
+}
+
+// Create a singleton instance
+export const mongoRateLimitRepo = new MongoRateLimitRepository();
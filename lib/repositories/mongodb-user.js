@@ -1,48 +1,450 @@
+import { MongoBulkWriteError } from "mongodb";
 import { getDb } from "../mongodb.js";
+import { randomInt } from "node:crypto";
 import { v4 as uuidv4 } from "uuid";
+import { encodeCursor } from "../cursor.js";
+import { LRUCache } from "../lru-cache.js";
+import { applyProjection } from "../fieldsets.js";
+import { logger } from "../logger.js";
+
+// Documents read by id are cached for authenticated routes. Set
+// USER_CACHE_MAX=0 to disable, and USER_CACHE_CHANGE_STREAM=true to invalidate
+// on writes made by other instances (requires a replica set).
+const USER_CACHE_MAX = parseInt(process.env.USER_CACHE_MAX || "5000", 10);
+const USER_CACHE_TTL_MS = parseInt(
+  process.env.USER_CACHE_TTL_MS || "30000",
+  10,
+);
+const USER_CACHE_CHANGE_STREAM =
+  process.env.USER_CACHE_CHANGE_STREAM === "true";
+
+// Case-insensitive comparison for roommate filters. Queries must pass the
+// same collation as the index for MongoDB to use it.
+const CASE_INSENSITIVE = { locale: "en", strength: 2 };
+
+const ROOMMATE_SORT = { createdAt: -1, id: -1 };
+
+// Public fields shown on a shared profile page. `version` and `updatedAt`
+// identify the revision for ETags.
+const PUBLIC_PROFILE_PROJECTION = {
+  _id: 0,
+  id: 1,
+  username: 1,
+  displayName: 1,
+  avatarUrl: 1,
+  avatarVariants: 1,
+  bio: 1,
+  platforms: 1,
+  niches: 1,
+  games: 1,
+  city: 1,
+  timeZone: 1,
+  hasSchedule: 1,
+  schedule: 1,
+  totalPoints: 1,
+  points: 1,
+  createdAt: 1,
+  updatedAt: 1,
+  version: 1,
+};
+
+// Public fields shown on roommate cards and other user lists
+const USER_CARD_PROJECTION = {
+  _id: 0,
+  id: 1,
+  displayName: 1,
+  username: 1,
+  avatarUrl: 1,
+  avatarVariants: 1,
+  platforms: 1,
+  niches: 1,
+  games: 1,
+  city: 1,
+  timeZone: 1,
+  bio: 1,
+  createdAt: 1,
+};
+
+// Users and fields the roommate ranking index is built from
+// (lib/roommate-ranker.js)
+const ROOMMATE_FEATURE_FILTER = {
+  roommateOptIn: true,
+  city: { $nin: [null, ""] },
+};
+const ROOMMATE_FEATURE_PROJECTION = {
+  _id: 0,
+  id: 1,
+  platforms: 1,
+  niches: 1,
+  games: 1,
+  city: 1,
+  timeZone: 1,
+  createdAt: 1,
+};
+
+// Display-name suggestions are answered from the prefix index alone
+// (a covered query), so every projected field must be in that index.
+const AUTOCOMPLETE_PROJECTION = {
+  _id: 0,
+  id: 1,
+  username: 1,
+  displayName: 1,
+  avatarUrl: 1,
+};
+
+// Leaderboard rows, served from the points_rank index order
+const LEADERBOARD_PROJECTION = {
+  _id: 0,
+  id: 1,
+  username: 1,
+  displayName: 1,
+  avatarUrl: 1,
+  avatarVariants: 1,
+  totalPoints: 1,
+};
+
+const LEADERBOARD_SORT = { totalPoints: -1, id: 1 };
+
+// Point categories kept in the `points` breakdown; totalPoints is their sum
+export const POINT_KINDS = ["engage", "clip", "collab"];
+
+// Text matches are ranked and capped before facets are counted, so a broad
+// term costs at most this many documents.
+export const MAX_SEARCH_MATCHES = 5000;
+const FACET_LIMIT = 10;
+
+// Inserts retried when another signup claims the allocated name first, and
+// candidate names checked per allocation lookup.
+const USERNAME_ATTEMPTS = 5;
+const USERNAME_BATCH = 10;
+
+function escapeRegExp(value) {
+  return value.replace(/[.*+?^${}()|[\]\\]/g, "\\$&");
+}
+
+function isDuplicateKey(error, field) {
+  return error?.code === 11000 && Boolean(error.keyPattern?.[field]);
+}
+
+// Every write bumps the document's version, which profile ETags are built on.
+// displayNameLower backs the autocomplete prefix index.
+function versioned(updates) {
+  const set = { ...updates, updatedAt: new Date().toISOString() };
+  if (typeof updates.displayName === "string") {
+    set.displayNameLower = updates.displayName.toLowerCase();
+  }
+
+  return { $set: set, $inc: { version: 1 } };
+}
+
+// Search filters are exact values, compared case-insensitively. Without a
+// text query the roommate indexes' collation does that; $text can't take a
+// collation, so there it's an anchored case-insensitive regex instead.
+function exactMatch(value, withText) {
+  return withText ? new RegExp(`^${escapeRegExp(value)}$`, "i") : value;
+}
+
+function facet(field) {
+  return [
+    { $unwind: `$${field}` },
+    { $match: { [field]: { $nin: [null, ""] } } },
+    { $group: { _id: `$${field}`, count: { $sum: 1 } } },
+    { $sort: { count: -1, _id: 1 } },
+    { $limit: FACET_LIMIT },
+    { $project: { _id: 0, value: "$_id", count: 1 } },
+  ];
+}
+
+const USER_INDEXES = [
+  { key: { id: 1 }, options: { name: "id_unique", unique: true } },
+  { key: { email: 1 }, options: { name: "email_unique", unique: true } },
+  { key: { username: 1 }, options: { name: "username_unique", unique: true } },
+  {
+    key: { roommateOptIn: 1, ...ROOMMATE_SORT },
+    options: { name: "roommate_recent", collation: CASE_INSENSITIVE },
+  },
+  {
+    key: { roommateOptIn: 1, city: 1, ...ROOMMATE_SORT },
+    options: { name: "roommate_city", collation: CASE_INSENSITIVE },
+  },
+  {
+    key: { roommateOptIn: 1, timeZone: 1, ...ROOMMATE_SORT },
+    options: { name: "roommate_timezone", collation: CASE_INSENSITIVE },
+  },
+  {
+    key: { roommateOptIn: 1, niches: 1, ...ROOMMATE_SORT },
+    options: { name: "roommate_niches", collation: CASE_INSENSITIVE },
+  },
+  {
+    key: { roommateOptIn: 1, platforms: 1, ...ROOMMATE_SORT },
+    options: { name: "roommate_platforms", collation: CASE_INSENSITIVE },
+  },
+  {
+    key: { roommateOptIn: 1, games: 1, ...ROOMMATE_SORT },
+    options: { name: "roommate_games", collation: CASE_INSENSITIVE },
+  },
+  // searchUsers filters everyone unless ?roommates=true, so each filter also
+  // needs an index that doesn't start with roommateOptIn
+  {
+    key: { city: 1, ...ROOMMATE_SORT },
+    options: { name: "search_city", collation: CASE_INSENSITIVE },
+  },
+  {
+    key: { niches: 1, ...ROOMMATE_SORT },
+    options: { name: "search_niches", collation: CASE_INSENSITIVE },
+  },
+  {
+    key: { platforms: 1, ...ROOMMATE_SORT },
+    options: { name: "search_platforms", collation: CASE_INSENSITIVE },
+  },
+  {
+    key: { games: 1, ...ROOMMATE_SORT },
+    options: { name: "search_games", collation: CASE_INSENSITIVE },
+  },
+  {
+    key: { displayName: "text", games: "text", niches: "text", bio: "text" },
+    options: {
+      name: "profile_text",
+      weights: { displayName: 10, games: 5, niches: 5, bio: 1 },
+    },
+  },
+  {
+    key: {
+      displayNameLower: 1,
+      displayName: 1,
+      username: 1,
+      id: 1,
+      avatarUrl: 1,
+    },
+    options: { name: "display_name_prefix" },
+  },
+  { key: LEADERBOARD_SORT, options: { name: "points_rank" } },
+];
 
 export class MongoUserRepository {
   constructor() {
     this.collectionName = "users";
+    this.collection = null;
+    this.indexesPromise = null;
+    this.changeStream = null;
+
+    // Change events only carry _id, so keep a reverse map to find cache keys.
+    // The generation counter stops a read that raced a write from caching
+    // the pre-write document.
+    this.userIdsByObjectId = new Map();
+    this.cacheGeneration = 0;
+    this.invalidationListeners = [];
+    this.userCache = new LRUCache({
+      max: USER_CACHE_MAX,
+      ttlMs: USER_CACHE_TTL_MS,
+      onRemove: (id, user) => this.userIdsByObjectId.delete(String(user._id)),
+    });
   }
 
   async getCollection() {
-    const db = await getDb();
-    return db.collection(this.collectionName);
+    if (!this.collection) {
+      const db = await getDb();
+      this.collection = db.collection(this.collectionName);
+    }
+    const collection = this.collection;
+
+    if (!this.indexesPromise) {
+      // Index builds run in the background; requests don't wait on them.
+      this.indexesPromise = this.ensureIndexes(collection);
+    }
+
+    if (USER_CACHE_CHANGE_STREAM && USER_CACHE_MAX > 0 && !this.changeStream) {
+      this.watchForChanges(collection);
+    }
+
+    return collection;
+  }
+
+  watchForChanges(collection) {
+    this.changeStream = collection.watch([
+      { $match: { operationType: { $in: ["update", "replace", "delete"] } } },
+    ]);
+
+    this.changeStream.on("change", (change) => {
+      const id = this.userIdsByObjectId.get(String(change.documentKey._id));
+      if (id) this.invalidateUser(id);
+    });
+
+    this.changeStream.on("error", (error) => {
+      console.error("MongoDB: User change stream error:", error);
+      // Writes may have been missed; drop everything and reconnect on the
+      // next repository call.
+      this.changeStream.close().catch(() => {});
+      this.changeStream = null;
+      this.invalidateAll();
+    });
+  }
+
+  cacheUser(user, generation) {
+    // With caching off, set() stores nothing and onRemove never fires, so
+    // the reverse map would only grow.
+    if (this.userCache.max <= 0) return;
+    if (generation !== this.cacheGeneration) return;
+
+    this.userCache.set(user.id, user);
+    this.userIdsByObjectId.set(String(user._id), user.id);
+  }
+
+  invalidateUser(id) {
+    this.cacheGeneration++;
+    this.userCache.delete(id);
+    this.invalidationListeners.forEach((listener) => listener(id));
+  }
+
+  invalidateAll() {
+    this.cacheGeneration++;
+    this.userCache.clear();
+    this.invalidationListeners.forEach((listener) => listener(null));
+  }
+
+  // Lets caches derived from user documents follow the same invalidations,
+  // including change-stream events from other instances. The listener gets
+  // the user id, or null when every user may have changed.
+  onInvalidate(listener) {
+    this.invalidationListeners.push(listener);
+  }
+
+  getCacheStats() {
+    return {
+      ...this.userCache.stats(),
+      changeStream: Boolean(this.changeStream),
+    };
+  }
+
+  async ensureIndexes(collection) {
+    const results = await Promise.allSettled(
+      USER_INDEXES.map(({ key, options }) =>
+        collection.createIndex(key, options),
+      ),
+    );
+
+    results.forEach((result, i) => {
+      if (result.status === "rejected") {
+        console.error(
+          "MongoDB: Error creating index:",
+          USER_INDEXES[i].options.name,
+          result.reason,
+        );
+      }
+    });
+  }
+
+  async insertUser(userData) {
+    const collection = await this.getCollection();
+
+    const now = new Date().toISOString();
+    const user = {
+      id: uuidv4(),
+      ...userData,
+      displayNameLower: userData.displayName?.toLowerCase(),
+      createdAt: now,
+      updatedAt: now,
+      version: 1,
+      avatarUrl: null,
+      totalPoints: 0,
+      roommateOptIn: true, // Default privacy setting ON
+      roommatePlatforms: [],
+      roommateNiche: null,
+      roommateTimezone: null,
+      roommateRegion: null,
+      roommateExperience: null,
+    };
+
+    await collection.insertOne(user);
+    logger.debug("user created", { userId: user.id });
+
+    // Nothing is cached for a new id, but derived indexes need to hear of it
+    this.invalidateUser(user.id);
+
+    return user;
   }
 
   async createUser(userData) {
     try {
-      const collection = await this.getCollection();
+      return await this.insertUser(userData);
+    } catch (error) {
+      console.error("MongoDB: Error creating user:", error);
+      return null;
+    }
+  }
 
-      const user = {
-        id: uuidv4(),
-        ...userData,
-        createdAt: new Date().toISOString(),
-        avatarUrl: null,
-        totalPoints: 0,
-        roommateOptIn: true, // Default privacy setting ON
-        roommatePlatforms: [],
-        roommateNiche: null,
-        roommateTimezone: null,
-        roommateRegion: null,
-        roommateExperience: null,
-      };
+  // Picks the first free name among baseUsername, baseUsername1 ...
+  // baseUsername9 with one bounded $in lookup on the unique index. If all of
+  // those are taken, tries a batch of random numeric suffixes the same way,
+  // so a popular base costs two index lookups, not a scan of every name it
+  // has produced. Returns null if every candidate was taken.
+  async allocateUsername(baseUsername) {
+    const collection = await this.getCollection();
+    const base = baseUsername.toLowerCase();
 
-      await collection.insertOne(user);
-      console.log("MongoDB: Created user:", user.email);
+    const sequential = [base];
+    for (let i = 1; i < USERNAME_BATCH; i++) sequential.push(`${base}${i}`);
+    const random = Array.from(
+      { length: USERNAME_BATCH },
+      () => `${base}${randomInt(USERNAME_BATCH, 1000000)}`,
+    );
 
-      return user;
+    for (const candidates of [sequential, random]) {
+      const taken = await collection
+        .find(
+          { username: { $in: candidates } },
+          { projection: { _id: 0, username: 1 } },
+        )
+        .limit(candidates.length)
+        .toArray();
+      const takenNames = new Set(taken.map((u) => u.username));
+
+      const free = candidates.find((name) => !takenNames.has(name));
+      if (free) return free;
+    }
+
+    return null;
+  }
+
+  // Inserts the user under a freshly allocated username, retrying if another
+  // signup claims the same name between allocation and insert.
+  async createUserWithUsername(userData, baseUsername) {
+    try {
+      for (let attempt = 0; attempt < USERNAME_ATTEMPTS; attempt++) {
+        const username = await this.allocateUsername(baseUsername);
+        if (!username) continue;
+
+        try {
+          return await this.insertUser({ ...userData, username });
+        } catch (error) {
+          if (!isDuplicateKey(error, "username")) throw error;
+        }
+      }
+
+      console.error("MongoDB: Could not allocate username for:", baseUsername);
+      return null;
     } catch (error) {
       console.error("MongoDB: Error creating user:", error);
       return null;
     }
   }
 
-  async getUserById(id) {
+  // Returns a shared cached document; callers must not mutate it. With a
+  // projection, a cached document is trimmed in memory; otherwise only the
+  // projected fields are read, and the partial result isn't cached.
+  async getUserById(id, { projection } = {}) {
     try {
+      const cached = this.userCache.get(id);
+      if (cached) {
+        return projection ? applyProjection(cached, projection) : cached;
+      }
+
+      const generation = this.cacheGeneration;
       const collection = await this.getCollection();
-      const user = await collection.findOne({ id });
+      const user = await collection.findOne({ id }, { projection });
+
+      if (user && !projection) this.cacheUser(user, generation);
+
       return user;
     } catch (error) {
       console.error("MongoDB: Error getting user by ID:", error);
@@ -50,10 +452,26 @@ export class MongoUserRepository {
     }
   }
 
-  async getUserByEmail(email) {
+  // Batched read for list views; only the projected fields are returned.
+  // Returns null if the read failed, so callers can tell it from no users.
+  async getUsersByIds(ids, projection = USER_CARD_PROJECTION) {
+    if (ids.length === 0) return [];
+
+    try {
+      const collection = await this.getCollection();
+      return await collection
+        .find({ id: { $in: ids } }, { projection })
+        .toArray();
+    } catch (error) {
+      console.error("MongoDB: Error getting users by ID:", error);
+      return null;
+    }
+  }
+
+  async getUserByEmail(email, { projection } = {}) {
     try {
       const collection = await this.getCollection();
-      const user = await collection.findOne({ email });
+      const user = await collection.findOne({ email }, { projection });
       return user;
     } catch (error) {
       console.error("MongoDB: Error getting user by email:", error);
@@ -61,12 +479,28 @@ export class MongoUserRepository {
     }
   }
 
-  async getUserByUsername(username) {
+  async getPublicProfile(username) {
     try {
       const collection = await this.getCollection();
-      const user = await collection.findOne({
-        username: { $regex: new RegExp(`^${username}$`, "i") },
-      });
+      return await collection.findOne(
+        { username: username.toLowerCase() },
+        { projection: PUBLIC_PROFILE_PROJECTION },
+      );
+    } catch (error) {
+      console.error("MongoDB: Error getting public profile:", error);
+      return null;
+    }
+  }
+
+  // Signup lowercases usernames, so case-insensitive lookups are exact
+  // matches on the stored value and can use a plain unique index.
+  async getUserByUsername(username, { projection } = {}) {
+    try {
+      const collection = await this.getCollection();
+      const user = await collection.findOne(
+        { username: username.toLowerCase() },
+        { projection },
+      );
       return user;
     } catch (error) {
       console.error("MongoDB: Error getting user by username:", error);
@@ -74,20 +508,33 @@ export class MongoUserRepository {
     }
   }
 
-  async updateUser(id, updates) {
+  // Applies the update and returns the post-image in one round trip. Pass a
+  // projection to return only the fields the caller needs; only full
+  // documents are written through to the cache. Returns false if no user
+  // has the id, or null if the update failed.
+  async updateUser(id, updates, { projection } = {}) {
     try {
       const collection = await this.getCollection();
 
-      const result = await collection.updateOne({ id }, { $set: updates });
+      this.invalidateUser(id);
+      const generation = this.cacheGeneration;
 
-      if (result.matchedCount === 0) {
+      const updatedUser = await collection.findOneAndUpdate(
+        { id },
+        versioned(updates),
+        { returnDocument: "after", projection },
+      );
+
+      if (!updatedUser) {
         console.error("MongoDB: User not found for update:", id);
-        return null;
+        return false;
       }
 
-      // Return updated user
-      const updatedUser = await collection.findOne({ id });
-      console.log("MongoDB: Updated user:", updatedUser.email);
+      if (projection) {
+        this.invalidateUser(id);
+      } else {
+        this.cacheUser(updatedUser, generation);
+      }
 
       return updatedUser;
     } catch (error) {
@@ -96,21 +543,498 @@ export class MongoUserRepository {
     }
   }
 
-  async getAllUsers() {
+  // Applies many updates in one bulkWrite. Each operation is either
+  // { id, updates } for a single user or { filter, updates } for every
+  // matching user, e.g. a privacy-default migration.
+  async bulkUpdateUsers(operations) {
+    if (operations.length === 0) return { matchedCount: 0, modifiedCount: 0 };
+
+    try {
+      const collection = await this.getCollection();
+
+      let result;
+      try {
+        result = await collection.bulkWrite(
+          operations.map(({ id, filter, updates }) =>
+            filter
+              ? { updateMany: { filter, update: versioned(updates) } }
+              : { updateOne: { filter: { id }, update: versioned(updates) } },
+          ),
+          { ordered: false },
+        );
+      } finally {
+        // Unordered writes can partially apply before failing, so always
+        // invalidate.
+        if (operations.some((op) => op.filter)) {
+          this.invalidateAll();
+        } else {
+          operations.forEach((op) => this.invalidateUser(op.id));
+        }
+      }
+
+      logger.debug("users bulk updated", {
+        matched: result.matchedCount,
+        modified: result.modifiedCount,
+      });
+
+      return {
+        matchedCount: result.matchedCount,
+        modifiedCount: result.modifiedCount,
+      };
+    } catch (error) {
+      console.error("MongoDB: Error bulk updating users:", error);
+      return null;
+    }
+  }
+
+  // Yields every matching user in _id order from a batched cursor, so bulk
+  // jobs hold one batch at a time however large the collection is. The next
+  // batch is only fetched once the caller has consumed this one, and
+  // returning early (break, or return() on the iterator) closes the cursor.
+  // Errors are thrown to the caller, since a partial stream can't be
+  // reported as an empty result.
+  async *iterateUsers({
+    filter = {},
+    projection = { _id: 0 },
+    batchSize = 1000,
+  } = {}) {
+    const collection = await this.getCollection();
+    const cursor = collection.find(filter, {
+      projection,
+      sort: { _id: 1 },
+      batchSize,
+    });
+
+    try {
+      for await (const user of cursor) {
+        yield user;
+      }
+    } finally {
+      await cursor.close();
+    }
+  }
+
+  // Writes one chunk of imported users in an unordered bulkWrite, so a bad
+  // document doesn't stop the rest. By default existing users (same id,
+  // email or username) are skipped; with `replace` the supplied fields are
+  // set on the user with the same id, or a new user is inserted. Fields the
+  // file leaves out are kept, so re-importing an export made without
+  // password hashes doesn't wipe them. Returns { inserted, replaced, skipped, failed, errors }
+  // where errors lists failed chunk positions, or null if the write could
+  // not be attempted.
+  async importUsers(users, { replace = false } = {}) {
+    if (users.length === 0) {
+      return { inserted: 0, replaced: 0, skipped: 0, failed: 0, errors: [] };
+    }
+
+    try {
+      const collection = await this.getCollection();
+
+      let result;
+      let writeErrors = [];
+      try {
+        result = await collection.bulkWrite(
+          users.map((user) => {
+            if (!replace) return { insertOne: { document: user } };
+
+            const { _id, ...fields } = user;
+            return {
+              updateOne: {
+                filter: { id: user.id },
+                update: { $set: fields },
+                upsert: true,
+              },
+            };
+          }),
+          { ordered: false },
+        );
+      } catch (error) {
+        if (!(error instanceof MongoBulkWriteError)) throw error;
+        result = error.result;
+        writeErrors = [].concat(error.writeErrors || []);
+      } finally {
+        // Unordered writes can partially apply before failing
+        users.forEach((user) => this.invalidateUser(user.id));
+      }
+
+      // Only an insert treats a duplicate key as "already there"
+      const isSkip = (e) => !replace && e.code === 11000;
+      const duplicates = writeErrors.filter(isSkip);
+      const failures = writeErrors.filter((e) => !isSkip(e));
+
+      return {
+        inserted: result.insertedCount + result.upsertedCount,
+        replaced: result.matchedCount,
+        skipped: duplicates.length,
+        failed: failures.length,
+        errors: failures.map((e) => ({ index: e.index, error: e.errmsg })),
+      };
+    } catch (error) {
+      console.error("MongoDB: Error importing users:", error);
+      return null;
+    }
+  }
+
+  // A projection other than the card default must keep id and createdAt,
+  // which the page cursor is built from.
+  async searchRoommates({
+    excludeUserId = null,
+    city = null,
+    timeZone = null,
+    niche = null,
+    platform = null,
+    interests = [],
+    after = null,
+    limit = 20,
+    withTotal = false,
+    projection = USER_CARD_PROJECTION,
+  } = {}) {
+    try {
+      const collection = await this.getCollection();
+
+      const query = {
+        roommateOptIn: true,
+        city: city || { $nin: [null, ""] },
+      };
+      const clauses = [];
+
+      if (excludeUserId) query.id = { $ne: excludeUserId };
+      if (timeZone) query.timeZone = timeZone;
+      if (niche) query.niches = niche;
+      if (platform) query.platforms = platform;
+
+      if (interests.length > 0) {
+        clauses.push({
+          $or: [
+            { niches: { $in: interests } },
+            { games: { $in: interests } },
+            { platforms: { $in: interests } },
+          ],
+        });
+      }
+
+      const filter = clauses.length > 0 ? { ...query, $and: clauses } : query;
+
+      const pageFilter = after
+        ? {
+            ...query,
+            $and: [
+              ...clauses,
+              {
+                $or: [
+                  { createdAt: { $lt: after[0] } },
+                  { createdAt: after[0], id: { $lt: after[1] } },
+                ],
+              },
+            ],
+          }
+        : filter;
+
+      const [users, total] = await Promise.all([
+        collection
+          .find(pageFilter, {
+            projection,
+            sort: ROOMMATE_SORT,
+            limit: limit + 1,
+            collation: CASE_INSENSITIVE,
+          })
+          .toArray(),
+        withTotal
+          ? collection.countDocuments(filter, { collation: CASE_INSENSITIVE })
+          : null,
+      ]);
+
+      const hasMore = users.length > limit;
+      const page = hasMore ? users.slice(0, limit) : users;
+      const last = page[page.length - 1];
+
+      return {
+        users: page,
+        nextCursor: hasMore ? encodeCursor([last.createdAt, last.id]) : null,
+        total,
+      };
+    } catch (error) {
+      console.error("MongoDB: Error searching roommates:", error);
+      return null;
+    }
+  }
+
+  // Fills displayNameLower on users created before it existed. Runs at
+  // warmup; a no-op once every document has it.
+  async backfillDisplayNameLower() {
+    try {
+      const collection = await this.getCollection();
+      const result = await collection.updateMany(
+        {
+          displayNameLower: { $exists: false },
+          displayName: { $type: "string" },
+        },
+        [{ $set: { displayNameLower: { $toLower: "$displayName" } } }],
+      );
+      if (result.modifiedCount > 0) {
+        logger.info("display names backfilled", {
+          users: result.modifiedCount,
+        });
+      }
+      return result.modifiedCount;
+    } catch (error) {
+      console.error("MongoDB: Error backfilling display names:", error);
+      return 0;
+    }
+  }
+
+  // Display-name suggestions for a typed prefix, in name order
+  async autocompleteUsers(prefix, limit = 8) {
+    const normalized = prefix.trim().toLowerCase();
+    if (!normalized) return [];
+
     try {
       const collection = await this.getCollection();
-      const users = await collection.find({}).toArray();
-      return users;
+      return await collection
+        .find(
+          { displayNameLower: { $regex: `^${escapeRegExp(normalized)}` } },
+          {
+            projection: AUTOCOMPLETE_PROJECTION,
+            sort: { displayNameLower: 1 },
+            limit,
+            hint: "display_name_prefix",
+          },
+        )
+        .toArray();
     } catch (error) {
-      console.error("MongoDB: Error getting all users:", error);
+      console.error("MongoDB: Error autocompleting users:", error);
       return [];
     }
   }
 
+  // Keyword search over display names, games, niches and bios, plus exact
+  // filters, with platform, niche and city facet counts for the same matches
+  // in one aggregation. Needs a text term or at least one filter. Results
+  // are by relevance with text, newest first without.
+  async searchUsers({
+    text = null,
+    platform = null,
+    niche = null,
+    game = null,
+    city = null,
+    roommatesOnly = false,
+    excludeUserId = null,
+    offset = 0,
+    limit = 20,
+  } = {}) {
+    try {
+      const collection = await this.getCollection();
+
+      const match = {};
+      if (text) match.$text = { $search: text };
+      if (roommatesOnly) match.roommateOptIn = true;
+      if (excludeUserId) match.id = { $ne: excludeUserId };
+      if (platform) match.platforms = exactMatch(platform, text);
+      if (niche) match.niches = exactMatch(niche, text);
+      if (game) match.games = exactMatch(game, text);
+      if (city) match.city = exactMatch(city, text);
+
+      const pipeline = [{ $match: match }];
+      if (text) {
+        pipeline.push(
+          { $addFields: { score: { $meta: "textScore" } } },
+          { $sort: { score: -1, ...ROOMMATE_SORT } },
+        );
+      } else {
+        pipeline.push({ $sort: ROOMMATE_SORT });
+      }
+      pipeline.push(
+        { $limit: MAX_SEARCH_MATCHES },
+        {
+          $facet: {
+            users: [
+              { $skip: offset },
+              { $limit: limit + 1 },
+              {
+                $project: {
+                  ...USER_CARD_PROJECTION,
+                  ...(text ? { score: 1 } : {}),
+                },
+              },
+            ],
+            total: [{ $count: "count" }],
+            platforms: facet("platforms"),
+            niches: facet("niches"),
+            cities: facet("city"),
+          },
+        },
+      );
+
+      const [result] = await collection
+        .aggregate(pipeline, text ? {} : { collation: CASE_INSENSITIVE })
+        .toArray();
+
+      const total = result.total[0]?.count || 0;
+      const hasMore = result.users.length > limit;
+
+      return {
+        users: hasMore ? result.users.slice(0, limit) : result.users,
+        total,
+        totalCapped: total >= MAX_SEARCH_MATCHES,
+        hasMore,
+        facets: {
+          platforms: result.platforms,
+          niches: result.niches,
+          cities: result.cities,
+        },
+      };
+    } catch (error) {
+      console.error("MongoDB: Error searching users:", error);
+      return null;
+    }
+  }
+
+  // Ranking features for opted-in roommates with a city, the same set
+  // searchRoommates lists, for the given ids. Ids missing from the result
+  // have left that set.
+  async getRoommateFeatures(ids) {
+    try {
+      const collection = await this.getCollection();
+      return await collection
+        .find(
+          { ...ROOMMATE_FEATURE_FILTER, id: { $in: ids } },
+          { projection: ROOMMATE_FEATURE_PROJECTION },
+        )
+        .toArray();
+    } catch (error) {
+      console.error("MongoDB: Error getting roommate features:", error);
+      return null;
+    }
+  }
+
+  // Yields the features of every opted-in roommate from a batched cursor,
+  // for a full rebuild of the ranking index, so only one batch of raw
+  // documents is held at a time. Errors are thrown to the caller, as in
+  // iterateUsers.
+  async *iterateRoommateFeatures({ batchSize = 5000 } = {}) {
+    const collection = await this.getCollection();
+    const cursor = collection.find(ROOMMATE_FEATURE_FILTER, {
+      projection: ROOMMATE_FEATURE_PROJECTION,
+      batchSize,
+    });
+
+    try {
+      for await (const user of cursor) {
+        yield user;
+      }
+    } finally {
+      await cursor.close();
+    }
+  }
+
+  // Adds `amount` to one point category and to totalPoints in a single
+  // atomic update, so concurrent awards never lose an increment. Returns
+  // { id, totalPoints, points } after the update, or null.
+  async awardPoints(id, kind, amount) {
+    try {
+      const collection = await this.getCollection();
+      const update = versioned({});
+      update.$inc = {
+        ...update.$inc,
+        totalPoints: amount,
+        [`points.${kind}`]: amount,
+      };
+
+      const user = await collection.findOneAndUpdate({ id }, update, {
+        returnDocument: "after",
+        projection: { _id: 0, id: 1, totalPoints: 1, points: 1 },
+      });
+
+      if (user) this.invalidateUser(id);
+      return user;
+    } catch (error) {
+      console.error("MongoDB: Error awarding points:", error);
+      return null;
+    }
+  }
+
+  // Highest totalPoints first, keyset-paginated on (totalPoints, id) over the
+  // points_rank index, so any page costs an index seek plus `limit` entries
+  async getLeaderboardPage({ after = null, limit = 20 } = {}) {
+    try {
+      const collection = await this.getCollection();
+
+      const filter = after
+        ? {
+            $or: [
+              { totalPoints: { $lt: after[0] } },
+              { totalPoints: after[0], id: { $gt: after[1] } },
+            ],
+          }
+        : {};
+
+      const users = await collection
+        .find(filter, {
+          projection: LEADERBOARD_PROJECTION,
+          sort: LEADERBOARD_SORT,
+          limit: limit + 1,
+        })
+        .toArray();
+
+      const hasMore = users.length > limit;
+      const page = hasMore ? users.slice(0, limit) : users;
+      const last = page[page.length - 1];
+
+      return {
+        users: page,
+        nextCursor: hasMore ? encodeCursor([last.totalPoints, last.id]) : null,
+      };
+    } catch (error) {
+      console.error("MongoDB: Error getting leaderboard:", error);
+      return null;
+    }
+  }
+
+  async getLeaderboardUsers(ids) {
+    return this.getUsersByIds(ids, LEADERBOARD_PROJECTION);
+  }
+
+  // Users strictly ahead of `points`, counted over the points_rank index
+  // (no documents are read). Used until the in-memory rank tree is loaded.
+  async countUsersAbove(points) {
+    try {
+      const collection = await this.getCollection();
+      return await collection.countDocuments({ totalPoints: { $gt: points } });
+    } catch (error) {
+      console.error("MongoDB: Error counting leaderboard rank:", error);
+      return null;
+    }
+  }
+
+  // Yields every user's id and totalPoints from a batched cursor, for
+  // building lib/leaderboard.js. Answered from the points_rank index alone,
+  // so it must exist first. Errors are thrown to the caller, as in
+  // iterateUsers.
+  async *iteratePointsSnapshot({ batchSize = 10000 } = {}) {
+    const collection = await this.getCollection();
+    const cursor = collection.find(
+      {},
+      {
+        projection: { _id: 0, id: 1, totalPoints: 1 },
+        hint: "points_rank",
+        batchSize,
+      },
+    );
+
+    try {
+      for await (const user of cursor) {
+        yield user;
+      }
+    } finally {
+      await cursor.close();
+    }
+  }
+
   async deleteUser(id) {
     try {
       const collection = await this.getCollection();
       const result = await collection.deleteOne({ id });
+      this.invalidateUser(id);
       return result.deletedCount > 0;
     } catch (error) {
       console.error("MongoDB: Error deleting user:", error);
@@ -0,0 +1,159 @@
+import { AsyncLocalStorage } from "node:async_hooks";
+import { logger } from "./logger.js";
+import { metrics, METRICS_ENABLED } from "./metrics.js";
+
+// Per-request phase timing for API routes.
+//
+// Wrap a route handler with withTiming() and time its phases with
+// measure("jwt" | "mongo" | "bcrypt" | "storage", fn). The timings are
+// reported two ways:
+//
+//   SERVER_TIMING=true          adds a Server-Timing header to every response
+//   REQUEST_LOG_SAMPLE_RATE=0.05 logs 5% of requests (and every 5xx) as JSON
+//                                at info level, see lib/logger.js
+//
+// Request counts and latencies also feed /api/metrics (lib/metrics.js),
+// which only needs the total, so phase tracking stays off unless one of the
+// two options above is set. With everything off, withTiming() returns the
+// handler unchanged and measure() is a single AsyncLocalStorage lookup.
+//
+// Phases that run concurrently each report their own wall time, so their
+// sum can exceed the request total.
+
+const SERVER_TIMING = process.env.SERVER_TIMING === "true";
+const SAMPLE_RATE = Math.min(
+  1,
+  Math.max(0, parseFloat(process.env.REQUEST_LOG_SAMPLE_RATE || "0") || 0),
+);
+const LOG_REQUESTS = SAMPLE_RATE > 0 && logger.enabled("info");
+
+const requestContext = new AsyncLocalStorage();
+
+function record(timing, phase, ms) {
+  const entry = timing.phases.get(phase);
+  if (entry) {
+    entry.ms += ms;
+    entry.count++;
+  } else {
+    timing.phases.set(phase, { ms, count: 1 });
+  }
+}
+
+// Runs fn, adding its duration (sync or async) to the current request's
+// phase. Outside a timed request it just calls fn.
+export function measure(phase, fn) {
+  const timing = requestContext.getStore();
+  if (!timing) return fn();
+
+  const startedAt = performance.now();
+  const done = () => record(timing, phase, performance.now() - startedAt);
+
+  let result;
+  try {
+    result = fn();
+  } catch (error) {
+    done();
+    throw error;
+  }
+
+  if (typeof result?.then === "function") {
+    return result.finally(done);
+  }
+
+  done();
+  return result;
+}
+
+function serverTimingHeader(timing, totalMs) {
+  const metrics = [];
+  for (const [phase, { ms, count }] of timing.phases) {
+    metrics.push(
+      count > 1
+        ? `${phase};dur=${ms.toFixed(1)};desc="${count} calls"`
+        : `${phase};dur=${ms.toFixed(1)}`,
+    );
+  }
+  metrics.push(`total;dur=${totalMs.toFixed(1)}`);
+  return metrics.join(", ");
+}
+
+function logRequest(timing, request, status, totalMs, error) {
+  const phases = {};
+  for (const [phase, { ms, count }] of timing.phases) {
+    phases[phase] = { ms: Math.round(ms * 10) / 10, count };
+  }
+
+  const fields = {
+    route: timing.route,
+    method: request.method,
+    status,
+    durationMs: Math.round(totalMs * 10) / 10,
+    phases,
+  };
+  if (error) fields.error = error;
+
+  if (status >= 500) {
+    logger.error("request", fields);
+  } else {
+    logger.info("request", fields);
+  }
+}
+
+function observe(route, request, status, totalMs) {
+  if (METRICS_ENABLED) {
+    metrics.observeRequest(route, request.method, status, totalMs / 1000);
+  }
+}
+
+// Wraps an app router handler: export const GET = withTiming("name", fn)
+export function withTiming(route, handler) {
+  if (!SERVER_TIMING && !LOG_REQUESTS) {
+    if (!METRICS_ENABLED) return handler;
+
+    return async (request, context) => {
+      const startedAt = performance.now();
+      let status = 500;
+      try {
+        const response = await handler(request, context);
+        status = response.status;
+        return response;
+      } finally {
+        observe(route, request, status, performance.now() - startedAt);
+      }
+    };
+  }
+
+  return (request, context) => {
+    const timing = { route, phases: new Map() };
+    const sampled = LOG_REQUESTS && Math.random() < SAMPLE_RATE;
+
+    return requestContext.run(timing, async () => {
+      const startedAt = performance.now();
+
+      try {
+        const response = await handler(request, context);
+        const totalMs = performance.now() - startedAt;
+        observe(route, request, response.status, totalMs);
+
+        if (SERVER_TIMING) {
+          response.headers.set(
+            "Server-Timing",
+            serverTimingHeader(timing, totalMs),
+          );
+        }
+        if (sampled || (LOG_REQUESTS && response.status >= 500)) {
+          logRequest(timing, request, response.status, totalMs);
+        }
+
+        return response;
+      } catch (error) {
+        const totalMs = performance.now() - startedAt;
+        observe(route, request, 500, totalMs);
+        if (LOG_REQUESTS) {
+          logRequest(timing, request, 500, totalMs, error);
+        }
+        throw error;
+      }
+    });
+  };
+}
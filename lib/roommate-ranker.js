@@ -0,0 +1,606 @@
+import { mongoUserRepo } from "./repositories/mongodb-user.js";
+import { logger } from "./logger.js";
+
+// In-memory compatibility index over opted-in roommates, so ranked search
+// scores a bounded set of candidates instead of every user.
+//
+// Each user is reduced to a compact feature record: sorted term ids for
+// platforms, niches and games, a UTC offset in hours and a city term. An
+// inverted index maps every term (plus city, time zone and offset-hour
+// buckets) to the users that have it. A query collects candidates from the
+// searcher's own terms, rarest first, until ROOMMATE_RANK_MAX_CANDIDATES is
+// reached, scores only those and keeps the best in a bounded heap.
+//
+// The index is streamed from a batched cursor in the background from boot
+// (lib/warmup.js); until it is ready, ranked search lists newest first. It
+// is then refreshed incrementally from the user repository's invalidations,
+// batched every ROOMMATE_INDEX_REFRESH_MS. ROOMMATE_INDEX_REBUILD_MS sets a
+// periodic full rebuild that picks up writes made by other instances.
+
+const MAX_CANDIDATES = parseInt(
+  process.env.ROOMMATE_RANK_MAX_CANDIDATES || "5000",
+  10,
+);
+const REFRESH_DELAY_MS = parseInt(
+  process.env.ROOMMATE_INDEX_REFRESH_MS || "100",
+  10,
+);
+const REBUILD_INTERVAL_MS = parseInt(
+  process.env.ROOMMATE_INDEX_REBUILD_MS || "600000",
+  10,
+);
+
+// Deepest result a page can reach; the heap holds offset + limit entries
+export const MAX_RANK_DEPTH = 500;
+
+// Per-signal weights; a perfect match on everything scores 1
+const WEIGHTS = {
+  platforms: 0.2,
+  niches: 0.3,
+  games: 0.2,
+  timeZone: 0.2,
+  city: 0.1,
+};
+
+// Time-zone closeness falls to zero at this many hours apart, and users
+// within TZ_NEIGHBOUR_HOURS are pulled in as candidates.
+const TZ_FALLOFF_HOURS = 4;
+const TZ_NEIGHBOUR_HOURS = 2;
+
+// Ids refetched per query during an incremental refresh
+const REFRESH_BATCH_SIZE = 1000;
+
+function normalize(value) {
+  return typeof value === "string" ? value.trim().toLowerCase() : "";
+}
+
+const offsetCache = new Map();
+
+// Current UTC offset of an IANA zone in hours, or null if it's unknown
+function utcOffsetHours(timeZone) {
+  if (!timeZone) return null;
+  if (offsetCache.has(timeZone)) return offsetCache.get(timeZone);
+
+  let offset = null;
+  try {
+    const name = new Intl.DateTimeFormat("en-US", {
+      timeZone,
+      timeZoneName: "shortOffset",
+    })
+      .formatToParts(new Date())
+      .find((part) => part.type === "timeZoneName")?.value;
+    const match = /^GMT(?:([+-])(\d{1,2})(?::(\d{2}))?)?$/.exec(name || "");
+    if (match) {
+      const hours = Number(match[2] || 0) + Number(match[3] || 0) / 60;
+      offset = match[1] === "-" ? -hours : hours;
+    }
+  } catch (error) {
+    // Not a valid zone name
+  }
+
+  offsetCache.set(timeZone, offset);
+  return offset;
+}
+
+// Counts common ids in two sorted arrays
+function overlap(a, b) {
+  let count = 0;
+  let i = 0;
+  let j = 0;
+  while (i < a.length && j < b.length) {
+    if (a[i] === b[j]) {
+      count++;
+      i++;
+      j++;
+    } else if (a[i] < b[j]) {
+      i++;
+    } else {
+      j++;
+    }
+  }
+  return count;
+}
+
+function jaccard(a, b) {
+  if (a.length === 0 || b.length === 0) return 0;
+  const common = overlap(a, b);
+  return common / (a.length + b.length - common);
+}
+
+export function compatibility(a, b) {
+  let score =
+    WEIGHTS.platforms * jaccard(a.platforms, b.platforms) +
+    WEIGHTS.niches * jaccard(a.niches, b.niches) +
+    WEIGHTS.games * jaccard(a.games, b.games);
+
+  if (a.tzOffset !== null && b.tzOffset !== null) {
+    const hours = Math.abs(a.tzOffset - b.tzOffset);
+    score += WEIGHTS.timeZone * Math.max(0, 1 - hours / TZ_FALLOFF_HOURS);
+  }
+  if (a.city !== -1 && a.city === b.city) score += WEIGHTS.city;
+
+  return score;
+}
+
+// Values two users have in common per category, for display
+export function sharedAttributes(a, b) {
+  const shared = {};
+  for (const key of ["platforms", "niches", "games"]) {
+    const theirs = new Set((b[key] || []).map(normalize));
+    shared[key] = (a[key] || []).filter((value) =>
+      theirs.has(normalize(value)),
+    );
+  }
+  return shared;
+}
+
+// Higher score first, then newer, then id, so pages are stable
+function ranksBelow(a, b) {
+  if (a.score !== b.score) return a.score < b.score;
+  if (a.createdAt !== b.createdAt) return a.createdAt < b.createdAt;
+  return a.id < b.id;
+}
+
+// Keeps the k best entries; the root is the worst one kept
+class TopK {
+  constructor(k) {
+    this.k = k;
+    this.heap = [];
+  }
+
+  accepts(score) {
+    return this.heap.length < this.k || score >= this.heap[0].score;
+  }
+
+  push(entry) {
+    const heap = this.heap;
+    if (heap.length < this.k) {
+      heap.push(entry);
+      this.siftUp(heap.length - 1);
+    } else if (ranksBelow(heap[0], entry)) {
+      heap[0] = entry;
+      this.siftDown(0);
+    }
+  }
+
+  siftUp(i) {
+    const heap = this.heap;
+    while (i > 0) {
+      const parent = (i - 1) >> 1;
+      if (!ranksBelow(heap[i], heap[parent])) break;
+      [heap[i], heap[parent]] = [heap[parent], heap[i]];
+      i = parent;
+    }
+  }
+
+  siftDown(i) {
+    const heap = this.heap;
+    for (;;) {
+      const left = 2 * i + 1;
+      const right = left + 1;
+      let lowest = i;
+      if (left < heap.length && ranksBelow(heap[left], heap[lowest])) {
+        lowest = left;
+      }
+      if (right < heap.length && ranksBelow(heap[right], heap[lowest])) {
+        lowest = right;
+      }
+      if (lowest === i) break;
+      [heap[i], heap[lowest]] = [heap[lowest], heap[i]];
+      i = lowest;
+    }
+  }
+
+  // Best first
+  sorted() {
+    return [...this.heap].sort((a, b) =>
+      ranksBelow(a, b) ? 1 : ranksBelow(b, a) ? -1 : 0,
+    );
+  }
+}
+
+class RoommateIndex {
+  constructor() {
+    // Term strings ("p:twitch", "c:austin, tx") are interned to small ints
+    this.termIds = new Map();
+    // term id -> Set of slots
+    this.postings = new Map();
+    // slot -> feature record, or null once the slot is freed
+    this.records = [];
+    this.slotsById = new Map();
+    this.freeSlots = [];
+  }
+
+  get size() {
+    return this.slotsById.size;
+  }
+
+  intern(term) {
+    let id = this.termIds.get(term);
+    if (id === undefined) {
+      id = this.termIds.size;
+      this.termIds.set(term, id);
+    }
+    return id;
+  }
+
+  termList(prefix, values) {
+    const ids = new Set();
+    for (const value of Array.isArray(values) ? values : []) {
+      const normalized = normalize(value);
+      if (normalized) ids.add(this.intern(`${prefix}:${normalized}`));
+    }
+    return Int32Array.from(ids).sort();
+  }
+
+  // Builds the feature record for a user document. Also used for the
+  // searcher, who need not be in the index.
+  features(user) {
+    const city = normalize(user.city);
+    const timeZone = normalize(user.timeZone);
+    const tzOffset = utcOffsetHours(user.timeZone);
+
+    const record = {
+      id: user.id,
+      createdAt: user.createdAt || "",
+      platforms: this.termList("p", user.platforms),
+      niches: this.termList("n", user.niches),
+      games: this.termList("g", user.games),
+      city: city ? this.intern(`c:${city}`) : -1,
+      tzOffset,
+      terms: [],
+    };
+
+    record.terms.push(...record.platforms, ...record.niches, ...record.games);
+    if (city) record.terms.push(record.city);
+    if (tzOffset !== null) {
+      record.terms.push(this.intern(`t:${Math.round(tzOffset)}`));
+    }
+    if (timeZone) record.terms.push(this.intern(`z:${timeZone}`));
+
+    return record;
+  }
+
+  upsert(user) {
+    this.remove(user.id);
+
+    const record = this.features(user);
+    const slot = this.freeSlots.length
+      ? this.freeSlots.pop()
+      : this.records.length;
+
+    this.records[slot] = record;
+    this.slotsById.set(user.id, slot);
+
+    for (const term of record.terms) {
+      let posting = this.postings.get(term);
+      if (!posting) {
+        posting = new Set();
+        this.postings.set(term, posting);
+      }
+      posting.add(slot);
+    }
+  }
+
+  remove(id) {
+    const slot = this.slotsById.get(id);
+    if (slot === undefined) return;
+
+    for (const term of this.records[slot].terms) {
+      const posting = this.postings.get(term);
+      posting.delete(slot);
+      if (posting.size === 0) this.postings.delete(term);
+    }
+
+    this.records[slot] = null;
+    this.slotsById.delete(id);
+    this.freeSlots.push(slot);
+  }
+
+  // Lookup without interning, so query strings don't grow the term table
+  posting(term) {
+    const id = this.termIds.get(term);
+    return (id !== undefined && this.postings.get(id)) || null;
+  }
+
+  // Each filter becomes a list of postings a candidate must appear in at
+  // least one of. Returns null if some filter matches nobody.
+  filterPostings({ city, timeZone, niche, platform, interests = [] }) {
+    const terms = [];
+    if (city) terms.push([`c:${normalize(city)}`]);
+    if (timeZone) terms.push([`z:${normalize(timeZone)}`]);
+    if (niche) terms.push([`n:${normalize(niche)}`]);
+    if (platform) terms.push([`p:${normalize(platform)}`]);
+    if (interests.length > 0) {
+      terms.push(
+        interests.flatMap((interest) =>
+          ["n", "g", "p"].map((prefix) => `${prefix}:${normalize(interest)}`),
+        ),
+      );
+    }
+
+    const filters = [];
+    for (const alternatives of terms) {
+      const postings = alternatives
+        .map((term) => this.posting(term))
+        .filter(Boolean);
+      if (postings.length === 0) return null;
+      filters.push(postings);
+    }
+    return filters;
+  }
+
+  // Candidate slots for a query, capped at MAX_CANDIDATES. With filters,
+  // walks the smallest filter and keeps slots that pass the rest. Without,
+  // unions the postings of the searcher's terms and nearby offset buckets,
+  // rarest first, so an uncommon shared game outranks the most common
+  // platform when the budget runs out.
+  candidates(searcher, filters, excludeSlot) {
+    const candidates = new Set();
+    let truncated = false;
+
+    const add = (slot) => {
+      if (slot === excludeSlot || candidates.has(slot)) return true;
+      if (candidates.size >= MAX_CANDIDATES) {
+        truncated = true;
+        return false;
+      }
+      candidates.add(slot);
+      return true;
+    };
+
+    if (filters.length > 0) {
+      const sizeOf = (postings) =>
+        postings.reduce((sum, posting) => sum + posting.size, 0);
+      const [smallest, ...rest] = [...filters].sort(
+        (a, b) => sizeOf(a) - sizeOf(b),
+      );
+      const passes = (slot) =>
+        rest.every((postings) => postings.some((p) => p.has(slot)));
+
+      for (const posting of smallest) {
+        for (const slot of posting) {
+          if (passes(slot) && !add(slot)) return { candidates, truncated };
+        }
+      }
+      return { candidates, truncated };
+    }
+
+    const terms = [
+      ...searcher.platforms,
+      ...searcher.niches,
+      ...searcher.games,
+    ].map((id) => this.postings.get(id));
+    if (searcher.city !== -1) terms.push(this.postings.get(searcher.city));
+    if (searcher.tzOffset !== null) {
+      const hour = Math.round(searcher.tzOffset);
+      for (let d = -TZ_NEIGHBOUR_HOURS; d <= TZ_NEIGHBOUR_HOURS; d++) {
+        terms.push(this.posting(`t:${hour + d}`));
+      }
+    }
+
+    const postings = terms.filter(Boolean).sort((a, b) => a.size - b.size);
+    for (const posting of postings) {
+      for (const slot of posting) {
+        if (!add(slot)) return { candidates, truncated };
+      }
+    }
+    return { candidates, truncated };
+  }
+}
+
+class RoommateRanker {
+  constructor() {
+    this.index = null;
+    this.started = false;
+    this.firstBuild = null;
+    this.rebuildTimer = null;
+
+    // Pending incremental work, applied one batch at a time on this.work
+    this.dirtyIds = new Set();
+    this.rebuildPending = false;
+    this.refreshTimer = null;
+    this.work = Promise.resolve();
+
+    this.rebuilds = 0;
+    this.lastRebuildMs = 0;
+    this.refreshed = 0;
+    this.queries = 0;
+    this.truncated = 0;
+    this.lastQueryMs = 0;
+  }
+
+  // Loads the index and schedules periodic rebuilds. Returns the first
+  // build; later calls are no-ops.
+  start() {
+    if (this.started) return this.firstBuild;
+    this.started = true;
+
+    this.rebuildPending = true;
+    this.firstBuild = this.enqueue();
+
+    if (REBUILD_INTERVAL_MS > 0) {
+      this.rebuildTimer = setInterval(() => {
+        this.rebuildPending = true;
+        this.enqueue();
+      }, REBUILD_INTERVAL_MS);
+      this.rebuildTimer.unref?.();
+    }
+
+    return this.firstBuild;
+  }
+
+  get ready() {
+    return this.index !== null;
+  }
+
+  // id is a user that may have changed, or null for everyone
+  invalidate(id) {
+    if (!this.started) return;
+
+    if (id) {
+      this.dirtyIds.add(id);
+    } else {
+      this.rebuildPending = true;
+    }
+
+    if (!this.refreshTimer) {
+      this.refreshTimer = setTimeout(() => {
+        this.refreshTimer = null;
+        this.enqueue();
+      }, REFRESH_DELAY_MS);
+      this.refreshTimer.unref?.();
+    }
+  }
+
+  enqueue() {
+    this.work = this.work.then(() => this.applyPending());
+    return this.work;
+  }
+
+  async applyPending() {
+    try {
+      if (this.rebuildPending || !this.index) {
+        await this.rebuild();
+      } else if (this.dirtyIds.size > 0) {
+        await this.refresh();
+      }
+    } catch (error) {
+      console.error("Roommate index update error:", error);
+    }
+  }
+
+  async rebuild() {
+    // Writes from here on are queued again and applied after the swap
+    this.rebuildPending = false;
+    this.dirtyIds.clear();
+
+    const startedAt = performance.now();
+    offsetCache.clear();
+    const index = new RoommateIndex();
+
+    try {
+      for await (const user of mongoUserRepo.iterateRoommateFeatures()) {
+        index.upsert(user);
+      }
+    } catch (error) {
+      console.error("MongoDB: Error loading roommate features:", error);
+      // Keep serving the old index; the next invalidation or tick retries
+      this.rebuildPending = true;
+      return;
+    }
+
+    this.index = index;
+    this.rebuilds++;
+    this.lastRebuildMs = Math.round(performance.now() - startedAt);
+
+    logger.info("roommate index built", {
+      users: index.size,
+      terms: index.termIds.size,
+      durationMs: this.lastRebuildMs,
+    });
+  }
+
+  async refresh() {
+    const ids = [...this.dirtyIds].slice(0, REFRESH_BATCH_SIZE);
+    ids.forEach((id) => this.dirtyIds.delete(id));
+
+    const users = await mongoUserRepo.getRoommateFeatures(ids);
+
+    if (!users) {
+      ids.forEach((id) => this.dirtyIds.add(id));
+      return;
+    }
+
+    const index = this.index;
+    const found = new Set();
+    for (const user of users) {
+      index.upsert(user);
+      found.add(user.id);
+    }
+    for (const id of ids) {
+      if (!found.has(id)) index.remove(id);
+    }
+    this.refreshed += ids.length;
+
+    if (this.dirtyIds.size > 0) this.enqueue();
+  }
+
+  // Ranks indexed users against the searcher's document. Returns null until
+  // the index is loaded, otherwise { results, total, truncated } where
+  // results are the entries at [offset, offset + limit) as { id, score }
+  // and total is the number of candidates scored.
+  rank(searcher, { filters = {}, offset = 0, limit = 20 } = {}) {
+    if (!this.started) this.start();
+    const index = this.index;
+    if (!index) return null;
+
+    const startedAt = performance.now();
+    const query = index.features(searcher);
+
+    const filterPostings = index.filterPostings(filters);
+    if (!filterPostings) {
+      return { results: [], total: 0, truncated: false };
+    }
+
+    const { candidates, truncated } = index.candidates(
+      query,
+      filterPostings,
+      index.slotsById.get(searcher.id),
+    );
+
+    const top = new TopK(Math.min(MAX_RANK_DEPTH, offset + limit));
+    for (const slot of candidates) {
+      const record = index.records[slot];
+      const score = compatibility(query, record);
+      if (top.accepts(score)) {
+        top.push({ id: record.id, createdAt: record.createdAt, score });
+      }
+    }
+
+    this.queries++;
+    if (truncated) this.truncated++;
+    this.lastQueryMs = performance.now() - startedAt;
+
+    return {
+      results: top
+        .sorted()
+        .slice(offset, offset + limit)
+        .map(({ id, score }) => ({ id, score })),
+      total: candidates.size,
+      truncated,
+    };
+  }
+
+  stats() {
+    return {
+      ready: this.ready,
+      users: this.index?.size || 0,
+      terms: this.index?.termIds.size || 0,
+      pending: this.dirtyIds.size,
+      rebuilds: this.rebuilds,
+      lastRebuildMs: this.lastRebuildMs,
+      refreshed: this.refreshed,
+      queries: this.queries,
+      truncated: this.truncated,
+      lastQueryMs: Math.round(this.lastQueryMs * 100) / 100,
+      maxCandidates: MAX_CANDIDATES,
+    };
+  }
+}
+
+// In development, keep one index (and its timers) across HMR reloads.
+let ranker;
+if (process.env.NODE_ENV === "development") {
+  if (!global._roommateRanker) {
+    global._roommateRanker = new RoommateRanker();
+  }
+  ranker = global._roommateRanker;
+} else {
+  ranker = new RoommateRanker();
+}
+
+// Subscribed per module load so it follows the current repository instance
+mongoUserRepo.onInvalidate((id) => ranker.invalidate(id));
+
+export const roommateRanker = ranker;
@@ -28,11 +28,14 @@ class StorageAdapter {
   private s3Client: S3Client | null = null;
   private bucketName: string;
   private region: string;
+  private endpoint: string | undefined;
   private useCloudinary: boolean;
 
   constructor() {
     this.region = process.env.AWS_REGION || "us-east-1";
     this.bucketName = process.env.S3_BUCKET_NAME || "stream-house-uploads";
+    // Set S3_ENDPOINT to point at an S3-compatible server such as MinIO
+    this.endpoint = process.env.S3_ENDPOINT || undefined;
     
     // Check if AWS credentials are available
     const hasAWSCredentials = !!(process.env.AWS_ACCESS_KEY_ID && process.env.AWS_SECRET_ACCESS_KEY);
@@ -43,6 +46,8 @@ class StorageAdapter {
     if (hasAWSCredentials) {
       this.s3Client = new S3Client({
         region: this.region,
+        endpoint: this.endpoint,
+        forcePathStyle: Boolean(this.endpoint),
         credentials: {
           accessKeyId: process.env.AWS_ACCESS_KEY_ID!,
           secretAccessKey: process.env.AWS_SECRET_ACCESS_KEY!,
@@ -76,10 +81,8 @@ class StorageAdapter {
 
       await this.s3Client.send(command);
 
-      const url = `https://${this.bucketName}.s3.${this.region}.amazonaws.com/${key}`;
-
       return {
-        url,
+        url: this.getObjectUrl(key),
         key,
         size: file.length,
         contentType,
@@ -155,6 +158,13 @@ class StorageAdapter {
       const publicId = key.replace(/\.[^/.]+$/, ""); // Remove file extension
       return cloudinary.url(publicId, { secure: true });
     }
+    return this.getObjectUrl(key);
+  }
+
+  private getObjectUrl(key: string): string {
+    if (this.endpoint) {
+      return `${this.endpoint.replace(/\/$/, "")}/${this.bucketName}/${key}`;
+    }
     return `https://${this.bucketName}.s3.${this.region}.amazonaws.com/${key}`;
   }
 
@@ -237,8 +247,10 @@ export class MockStorageAdapter {
   }
 }
 
-// Export appropriate adapter based on environment
+// Export appropriate adapter based on environment. A custom S3_ENDPOINT
+// (e.g. a local MinIO) opts into the real adapter outside production.
 export const storage =
-  process.env.NODE_ENV === "production" && process.env.AWS_ACCESS_KEY_ID
+  (process.env.NODE_ENV === "production" || process.env.S3_ENDPOINT) &&
+  process.env.AWS_ACCESS_KEY_ID
     ? storageAdapter
     : new MockStorageAdapter();
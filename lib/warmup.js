@@ -0,0 +1,50 @@
+import { warmPool } from "./mongodb.js";
+import { healthProbe } from "./health-probe.js";
+import { mongoUserRepo } from "./repositories/mongodb-user.js";
+import { mongoHouseRepo } from "./repositories/mongodb-house.js";
+import { mongoMessageRepo } from "./repositories/mongodb-message.js";
+import { roommateRanker } from "./roommate-ranker.js";
+import { leaderboard } from "./leaderboard.js";
+import { logger } from "./logger.js";
+
+// Runs once per server process from instrumentation.js, before the first
+// request: starts the background health probe, fills the connection pool to
+// minPoolSize, waits for every repository's indexes to exist and backfills
+// derived user fields. The roommate ranking index and the leaderboard (once
+// its index exists, since it reads it) load in the background without
+// holding up boot. Failures are logged, not thrown, so a database
+// outage at boot doesn't stop the server from starting.
+export async function warmup() {
+  const startedAt = performance.now();
+  healthProbe.start();
+  // Loads in the background; roommate search lists newest first until then
+  roommateRanker.start();
+
+  try {
+    const [connections] = await Promise.all([
+      warmPool(),
+      mongoUserRepo
+        .getCollection()
+        .then(() =>
+          Promise.all([
+            // Not awaited: ranks fall back to an indexed count until then
+            mongoUserRepo.indexesPromise.then(() => {
+              leaderboard.start();
+            }),
+            mongoUserRepo.backfillDisplayNameLower(),
+          ]),
+        ),
+      mongoHouseRepo.getCollection().then(() => mongoHouseRepo.indexesPromise),
+      mongoMessageRepo
+        .getCollections()
+        .then(() => mongoMessageRepo.indexesPromise),
+    ]);
+
+    logger.info("mongo warmup complete", {
+      connections,
+      durationMs: Math.round(performance.now() - startedAt),
+    });
+  } catch (error) {
+    logger.error("mongo warmup failed", { error });
+  }
+}
@@ -0,0 +1,129 @@
+import { Worker } from "worker_threads";
+
+// A bounded pool of worker threads running one CommonJS source (evaluated,
+// so nothing extra has to be bundled). Workers are spawned on demand up to
+// `size`, and jobs beyond that wait in a queue of at most `maxQueue`.
+//
+// The worker receives { id, ...task } messages and must answer each with
+// { id, result } or { id, error }.
+
+export class WorkerPool {
+  constructor({ name, source, size, maxQueue, queueFullError }) {
+    this.name = name;
+    this.source = source;
+    this.size = size;
+    this.maxQueue = maxQueue;
+    this.queueFullError = queueFullError;
+    this.workers = [];
+    this.idle = [];
+    this.queue = [];
+    this.nextJobId = 1;
+
+    this.completed = 0;
+    this.failed = 0;
+    this.rejected = 0;
+    this.totalWaitMs = 0;
+    this.totalRunMs = 0;
+  }
+
+  async run(task) {
+    if (this.queue.length >= this.maxQueue) {
+      this.rejected++;
+      throw this.queueFullError();
+    }
+
+    return new Promise((resolve, reject) => {
+      this.queue.push({ task, resolve, reject, enqueuedAt: performance.now() });
+      this.drain();
+    });
+  }
+
+  drain() {
+    while (this.queue.length > 0) {
+      const worker = this.idle.pop() || this.spawn();
+      if (!worker) return;
+
+      const job = this.queue.shift();
+      job.id = this.nextJobId++;
+      job.startedAt = performance.now();
+      this.totalWaitMs += job.startedAt - job.enqueuedAt;
+
+      worker.job = job;
+      worker.postMessage({ id: job.id, ...job.task });
+    }
+  }
+
+  spawn() {
+    if (this.workers.length >= this.size) return null;
+
+    const worker = new Worker(this.source, { eval: true });
+    worker.job = null;
+
+    worker.on("message", ({ id, result, error }) => {
+      const job = worker.job;
+      if (!job || job.id !== id) return;
+
+      worker.job = null;
+      this.totalRunMs += performance.now() - job.startedAt;
+
+      if (error) {
+        this.failed++;
+        job.reject(new Error(error));
+      } else {
+        this.completed++;
+        job.resolve(result);
+      }
+
+      this.idle.push(worker);
+      this.drain();
+    });
+
+    worker.on("error", (error) => {
+      console.error(`${this.name} worker error:`, error);
+      this.retire(worker, error);
+    });
+
+    worker.on("exit", (code) => {
+      if (this.workers.includes(worker)) {
+        this.retire(worker, new Error(`Worker exited with code ${code}`));
+      }
+    });
+
+    // Idle workers shouldn't keep the process alive. Unref after attaching
+    // listeners, since adding a message listener re-refs the port.
+    worker.unref();
+
+    this.workers.push(worker);
+    return worker;
+  }
+
+  retire(worker, error) {
+    this.workers = this.workers.filter((w) => w !== worker);
+    this.idle = this.idle.filter((w) => w !== worker);
+
+    if (worker.job) {
+      this.failed++;
+      worker.job.reject(error);
+      worker.job = null;
+    }
+
+    this.drain();
+  }
+
+  getStats() {
+    const finished = this.completed + this.failed;
+
+    return {
+      poolSize: this.size,
+      workers: this.workers.length,
+      active: this.workers.length - this.idle.length,
+      queueDepth: this.queue.length,
+      maxQueue: this.maxQueue,
+      completed: this.completed,
+      failed: this.failed,
+      rejected: this.rejected,
+      avgWaitMs: finished > 0 ? this.totalWaitMs / finished : 0,
+      avgRunMs: finished > 0 ? this.totalRunMs / finished : 0,
+    };
+  }
+}
@@ -20,6 +20,25 @@ const nextConfig = {
   experimental: {
     // Remove if not using Server Components
     serverComponentsExternalPackages: ["mongodb"],
+    // Runs instrumentation.js at startup to warm the MongoDB pool
+    instrumentationHook: true,
+    // bcryptjs and sharp are only required inside the hashing and avatar
+    // workers' eval'd source, so output tracing cannot see them. Copy them
+    // into the standalone build for the routes that start those workers.
+    outputFileTracingIncludes: {
+      "/api/auth/login": ["./node_modules/bcryptjs/**/*"],
+      "/api/auth/signup": ["./node_modules/bcryptjs/**/*"],
+      "/api/upload/avatar": [
+        "./node_modules/sharp/**/*",
+        "./node_modules/@img/**/*",
+        "./node_modules/color/**/*",
+        "./node_modules/color-string/**/*",
+        "./node_modules/simple-swizzle/**/*",
+        "./node_modules/is-arrayish/**/*",
+        "./node_modules/detect-libc/**/*",
+        "./node_modules/semver/**/*",
+      ],
+    },
   },
   webpack(config, { dev }) {
     if (dev) {